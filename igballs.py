@@ -2,19 +2,71 @@
 
 import argparse
 import configparser
+import contextlib
+import glob
+import hashlib
 import logging
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
 
-import igballs_fault
 import json
 import pprint
 
 logger = logging.getLogger(__name__)
 
+# igballs_fault / igballs_export (y con ellos plotly) se importan solo al
+# construir o exportar una figura, para que --help y --validate-only arranquen
+# rápido y un error de configuración aparezca sin esperar a plotly.
+
+# Valores admitidos por las opciones con un conjunto cerrado de valores
+CHOICES = {
+    "ball_style": ("surface", "icosphere"),
+    "plotlyjs": ("cdn", "inline", "shared"),
+    "animation": ("frames", "client"),
+}
+# Parámetros que no cambian el HTML de un evento: no invalidan la caché del
+# servicio ni el manifiesto del modo --watch
+NON_RENDER_PARAMS = {"output_html", "workers", "output_dir",
+                     "polarity_cache_dir", "polarity_cache_mb",
+                     "video_fps", "video_workers", "video_width", "video_height",
+                     "service_host", "service_port", "service_workers",
+                     "service_cache_dir", "service_memory_mb", "service_disk_mb"}
+
+MANIFEST_NAME = ".igballs-manifest.json"
+MANIFEST_VERSION = 1
+
+EVENT_KEYS = ("title", "datetime", "latitude", "longitude", "depth", "magnitude",
+              "nodal_planes", "plate_a", "plate_b")
+# Componentes de moment_tensor (las de igballs_mechanism.TENSOR_KEYS, sin importar numpy)
+TENSOR_KEYS = ("mrr", "mtt", "mpp", "mrt", "mrp", "mtp")
+
 def load_event_json(event_path: str) -> dict:
     """Load earthquake event data from a JSON file."""
     with open(event_path, 'r') as f:
         event = json.load(f)
     logger.info("Evento sísmico cargado desde %s", event_path)
+    return complete_event(event)
+
+
+def complete_event(event: dict) -> dict:
+    """Fill in what can be derived of an event, in place.
+
+    An event with a valid ``moment_tensor`` and no ``nodal_planes`` gets the
+    planes of its best double couple, and one with a single valid plane gets
+    the conjugate plane.  numpy is only imported if something is missing.
+    """
+    tensor = event.get("moment_tensor")
+    planes = event.get("nodal_planes")
+    if (not planes and isinstance(tensor, dict)
+            and all(isinstance(tensor.get(key), (int, float)) for key in TENSOR_KEYS)):
+        import igballs_mechanism
+        igballs_mechanism.fill_tensor_planes(event)
+    elif (isinstance(planes, dict) and len(planes) == 1
+            and set(planes) <= {"plane_1", "plane_2"} and not validate_event(event)):
+        import igballs_mechanism
+        igballs_mechanism.fill_auxiliary_plane(event)
     return event
 
 def load_config(cfg_path: str) -> dict:
@@ -23,7 +75,7 @@ def load_config(cfg_path: str) -> dict:
     config.read(cfg_path)
 
     
-    pprint.pprint({s: dict(config.items(s)) for s in config.sections()})
+    pprint.pprint({s: dict(config.items(s)) for s in config.sections()}, stream=sys.stderr)
     eye_dict_raw = json.loads( config["ANIMATION"]["eye_dict"])
     eye_dict = {k: float(v) for k, v in eye_dict_raw.items()}
 
@@ -34,13 +86,42 @@ def load_config(cfg_path: str) -> dict:
         "radius": config.getfloat("BALL","radius",fallback=3.3),
         "resolution": config.getint("BALL","resolution",fallback=333),
         "invert_colors": config.getboolean("BALL","invert_colors",fallback=False),
+        "ball_style": config.get("BALL", "style", fallback="surface"),
+        "subdivisions": config.getint("BALL", "subdivisions", fallback=4),
+        "refine_levels": config.getint("BALL", "refine_levels", fallback=0),
+        "nodal_lines": config.getboolean("BALL", "nodal_lines", fallback=False),
+        "split_nodal": config.getboolean("BALL", "split_nodal", fallback=False),
+        "polarity_cache_dir": config.get("BALL", "polarity_cache", fallback=None),
+        "polarity_cache_mb": config.getfloat("BALL", "polarity_cache_mb", fallback=256),
         "move_block" : config.get("ANIMATION","move_block", fallback="east"),        
         "steps": config.getint("ANIMATION", "steps", fallback=25),
         "speed": config.getfloat("ANIMATION", "speed", fallback=0.333),
+        "animation": config.get("ANIMATION", "mode", fallback="frames"),
+
+        "coastline_path": config.get("COASTLINE", "path",
+                                     fallback=config.get("COASTLINE", "csv", fallback=None)),
+        "boundaries_path": config.get("BOUNDARIES", "path", fallback=None),
+        "coastline_window": config.getfloat("COASTLINE", "window", fallback=1.0),
+        "coastline_tolerance": config.getfloat("COASTLINE", "tolerance", fallback=0.0),
 
         "eye_dict":eye_dict,
-        "output_html":config.get("ANIMATION","output_html",fallback="./moving_blocks.html")
-        
+        "output_html":config.get("ANIMATION","output_html",fallback="./moving_blocks.html"),
+        "workers": config.getint("BATCH", "workers", fallback=os.cpu_count() or 1),
+        "output_dir": config.get("BATCH", "output_dir", fallback=""),
+        "video_fps": config.getfloat("VIDEO", "fps", fallback=10),
+        "video_workers": config.getint("VIDEO", "workers", fallback=os.cpu_count() or 1),
+        "video_width": config.getint("VIDEO", "width", fallback=960),
+        "video_height": config.getint("VIDEO", "height", fallback=720),
+        "plotlyjs": config.get("EXPORT", "plotlyjs", fallback="cdn"),
+        "asset_dir": config.get("EXPORT", "asset_dir", fallback=None),
+        "compact_arrays": config.getboolean("EXPORT", "compact_arrays", fallback=False),
+        "service_host": config.get("SERVICE", "host", fallback="127.0.0.1"),
+        "service_port": config.getint("SERVICE", "port", fallback=8765),
+        "service_workers": config.getint("SERVICE", "workers", fallback=os.cpu_count() or 1),
+        "service_cache_dir": config.get("SERVICE", "cache_dir", fallback="./cache/pages"),
+        "service_memory_mb": config.getfloat("SERVICE", "memory_mb", fallback=256),
+        "service_disk_mb": config.getfloat("SERVICE", "disk_mb", fallback=2048),
+
     }
 
     logger.info("Configuration loaded from %s", cfg_path)
@@ -48,6 +129,478 @@ def load_config(cfg_path: str) -> dict:
     return params
 
 
+def validate_config(params: dict) -> list:
+    """Check the loaded parameters and return a list of error messages."""
+    errors = []
+    for key, choices in CHOICES.items():
+        if params[key] not in choices:
+            errors.append(f"{key} = {params[key]!r}: debe ser uno de {', '.join(choices)}")
+    for key in ("width", "height", "radius", "resolution", "steps", "subdivisions", "video_fps",
+                "polarity_cache_mb"):
+        if params[key] <= 0:
+            errors.append(f"{key} = {params[key]!r}: debe ser positivo")
+    for key in ("refine_levels", "speed", "coastline_window", "coastline_tolerance"):
+        if params[key] < 0:
+            errors.append(f"{key} = {params[key]!r}: no puede ser negativo")
+    for key in ("coastline_path", "boundaries_path"):
+        if params[key] and not os.path.exists(params[key]):
+            errors.append(f"{key} = {params[key]!r}: no existe")
+    return errors
+
+
+def validate_event(event: dict, plane: str = None) -> list:
+    """Check an event dictionary and return a list of error messages."""
+    # Sin planos nodales basta el tensor: se completan con complete_event
+    required = [key for key in EVENT_KEYS
+                if key != "nodal_planes" or "moment_tensor" not in event]
+    errors = [f"falta la clave {key!r}" for key in required if key not in event]
+    for key, low, high in (("latitude", -90, 90), ("longitude", -180, 360)):
+        if key in event and (not isinstance(event[key], (int, float))
+                             or not low <= event[key] <= high):
+            errors.append(f"{key} = {event[key]!r} fuera de [{low}, {high}]")
+    if "depth" in event and not isinstance(event["depth"], (int, float)):
+        errors.append(f"depth = {event['depth']!r}: debe ser un número")
+    # Los catálogos pueden no traer magnitud: solo se muestra en el recuadro
+    if event.get("magnitude") is not None and not isinstance(event["magnitude"], (int, float)):
+        errors.append(f"magnitude = {event['magnitude']!r}: debe ser un número o null")
+    nodal_planes = event.get("nodal_planes", {})
+    if not isinstance(nodal_planes, dict) or not all(isinstance(p, dict) for p in nodal_planes.values()):
+        errors.append("nodal_planes debe ser un objeto con plane_1/plane_2 como objetos")
+        nodal_planes = {}
+    for name, nodal_plane in nodal_planes.items():
+        for key, low, high in (("strike", 0, 360), ("dip", 0, 90), ("rake", -180, 180)):
+            value = nodal_plane.get(key)
+            if not isinstance(value, (int, float)) or not low <= value <= high:
+                errors.append(f"{name}.{key} = {value!r} fuera de [{low}, {high}]")
+    tensor = event.get("moment_tensor")
+    if tensor is not None and not isinstance(tensor, dict):
+        errors.append(f"moment_tensor debe tener las claves {', '.join(TENSOR_KEYS)}")
+    elif tensor is not None:
+        for key in TENSOR_KEYS:
+            if not isinstance(tensor.get(key), (int, float)):
+                errors.append(f"moment_tensor.{key} = {tensor.get(key)!r}: debe ser un número")
+    if plane and nodal_planes and plane not in nodal_planes:
+        errors.append(f"el evento no tiene el plano nodal {plane!r}")
+    return errors
+
+
+def validate(cfg_path: str, event_paths: list, events=()) -> list:
+    """Validate a configuration file and event files without loading plotly.
+
+    ``events`` are already loaded events with an ``id`` (e.g. from a
+    catalog).  Returns a list of ``"<file or id>: <message>"`` errors (empty
+    if all is valid).
+    """
+    if not os.path.exists(cfg_path):
+        return [f"{cfg_path}: no existe"]
+    try:
+        params = load_config(cfg_path)
+    except (KeyError, ValueError, configparser.Error) as exc:
+        return [f"{cfg_path}: {type(exc).__name__}: {exc}"]
+    errors = [f"{cfg_path}: {error}" for error in validate_config(params)]
+    for event_path in event_paths:
+        try:
+            event = load_event_json(event_path)
+        except (OSError, ValueError) as exc:
+            errors.append(f"{event_path}: {exc}")
+            continue
+        errors.extend(f"{event_path}: {error}" for error in validate_event(event, params["plane"]))
+    for event in events:
+        errors.extend(f"{event['id']}: {error}" for error in validate_event(event, params["plane"]))
+    return errors
+
+
+def build_figure(event_data: dict, params: dict, profiler=None):
+    """Create the animated figure of one event with the loaded parameters."""
+    import igballs_fault
+
+    polarity_cache = None
+    if params["polarity_cache_dir"]:
+        import igballs_polarity
+        polarity_cache = igballs_polarity.open_cache(
+            params["polarity_cache_dir"], int(params["polarity_cache_mb"] * 2**20))
+
+    return igballs_fault.create_figure(
+
+        event_data,
+        params["plane" ],
+        params["move_block"],
+        params["width"],
+        params["height"],
+        params["steps"],
+        params["speed"],
+        params["eye_dict"],
+        params["radius"],
+        params["resolution"],
+        params["invert_colors"],
+        ball_style=params["ball_style"],
+        subdivisions=params["subdivisions"],
+        refine_levels=params["refine_levels"],
+        nodal_lines=params["nodal_lines"],
+        split_nodal=params["split_nodal"],
+        coastline_path=params["coastline_path"],
+        coastline_window=params["coastline_window"],
+        coastline_tolerance=params["coastline_tolerance"],
+        boundaries_path=params["boundaries_path"],
+        animation=params["animation"],
+        polarity_cache=polarity_cache,
+        profiler=profiler,
+    )
+
+
+def export_figure(fig, output_html: str, params: dict) -> None:
+    """Write the figure to HTML with the export options of the config."""
+    import igballs_export
+
+    igballs_export.write_html(
+        fig, output_html,
+        plotlyjs=params["plotlyjs"],
+        asset_dir=params["asset_dir"],
+        compact=params["compact_arrays"],
+    )
+
+
+def batch_params(params: dict, output_dir: str) -> dict:
+    """Parameters of a batch run: a shared plotly.js goes to ``output_dir/assets``
+    unless ``asset_dir`` is set, so pages in subdirectories share one copy."""
+    if params["plotlyjs"] == "shared" and not params["asset_dir"]:
+        return {**params, "asset_dir": os.path.join(output_dir, "assets")}
+    return params
+
+
+def render_event(event_path: str, params: dict, output_html: str, event_data: dict = None) -> dict:
+    """Render one event JSON to HTML and return a summary record.
+
+    ``event_data`` is the already loaded event (e.g. from a catalog); then
+    ``event_path`` only names the event in the record.  Errors are caught
+    and reported in the record so that a single bad event does not stop a
+    batch run.
+    """
+    start = time.perf_counter()
+    record = {"event": event_path, "output": output_html}
+    try:
+        if event_data is None:
+            event_data = load_event_json(event_path)
+        fig = build_figure(event_data, params)
+        export_figure(fig, output_html, params)
+    except Exception as exc:
+        logger.error("Error al renderizar %s: %s", event_path, exc)
+        record.update(status="error", error=f"{type(exc).__name__}: {exc}")
+    else:
+        record.update(status="ok", error=None)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def render_catalog(events, params: dict, output_dir: str, workers: int) -> list:
+    """Render events from an iterable (e.g. igballs_catalog) as they arrive.
+
+    At most ``2 * workers`` events are queued at a time, so the catalog is
+    consumed at the pace of the renders and rendering starts on the first
+    event.  Pages are named ``<event id>.html`` (``<event id>-2.html``, ...
+    for repeated ids); records are returned in catalog order.  Events that
+    fail :func:`validate_event` are not rendered and get an error record
+    with its messages.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    params = batch_params(params, output_dir)
+    records = []
+    pending = {}
+    names = set()
+
+    def collect(done):
+        for future in done:
+            record = future.result()
+            logger.info("[%s] %s (%.2f s)", record["status"], record["event"], record["seconds"])
+            records.append((pending.pop(future), record))
+
+    logger.info("Renderizando el catálogo con %d procesos", workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, event in enumerate(events):
+            if len(pending) >= 2 * workers:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            name, copy = str(event["id"]), 1
+            while name in names:
+                copy += 1
+                name = f"{event['id']}-{copy}"
+            if copy > 1:
+                logger.warning("Id de evento repetido %s: se exporta como %s.html", event["id"], name)
+            names.add(name)
+            output = os.path.join(output_dir, f"{name}.html")
+            errors = validate_event(event, params["plane"])
+            if errors:
+                # Se registra como error del evento sin mandarlo al pool
+                logger.error("Evento %s no válido: %s", event["id"], "; ".join(errors))
+                records.append((index, dict(event=event["id"], output=output, status="error",
+                                            error="; ".join(errors), seconds=0.0)))
+                continue
+            pending[pool.submit(render_event, event["id"], params, output, event)] = index
+        collect(wait(pending).done)
+    return [record for _, record in sorted(records, key=lambda item: item[0])]
+
+
+def collect_event_paths(events_dir: str = None, events_glob: str = None) -> list:
+    """Return the sorted event JSON paths selected by a directory and/or glob."""
+    paths = set()
+    if events_dir:
+        paths.update(glob.glob(os.path.join(events_dir, "*.json")))
+    if events_glob:
+        paths.update(glob.glob(events_glob, recursive=True))
+    return sorted(paths)
+
+
+def event_root(events_dir: str = None, events_glob: str = None) -> str:
+    """Directory the batch output names are relative to.
+
+    The fixed (wildcard-free) leading directory of ``events_glob``, the
+    ``events_dir``, or their common parent when both are given.
+    """
+    roots = []
+    if events_dir:
+        roots.append(events_dir)
+    if events_glob:
+        prefix = os.path.dirname(events_glob)
+        while glob.has_magic(prefix):
+            prefix = os.path.dirname(prefix)
+        roots.append(prefix)
+    if not roots:
+        return None
+    return os.path.commonpath([os.path.abspath(root) for root in roots])
+
+
+def batch_output_path(event_path: str, output_dir: str, root: str = None) -> str:
+    """Name the HTML output of an event after its JSON file.
+
+    With a ``root`` the page keeps the path of the JSON below it
+    (``root/a/x.json`` -> ``output_dir/a/x.html``), so events with the same
+    file name in different subdirectories do not overwrite each other.
+    """
+    name = os.path.basename(event_path)
+    if root is not None:
+        relative = os.path.relpath(os.path.abspath(event_path), os.path.abspath(root))
+        if not relative.startswith(os.pardir + os.sep):
+            name = relative
+    return os.path.join(output_dir, os.path.splitext(name)[0] + ".html")
+
+
+def render_batch(event_paths: list, params: dict, output_dir: str, workers: int,
+                 root: str = None) -> list:
+    """Render many events over a process pool, sharing the loaded config.
+
+    Pages are named by :func:`batch_output_path`; two events that would
+    write the same page raise ValueError before anything is rendered.
+    Returns one summary record per event, in the order of ``event_paths``.
+    """
+    jobs = {path: batch_output_path(path, output_dir, root) for path in event_paths}
+    owners = {}
+    for path, output in jobs.items():
+        if output in owners:
+            raise ValueError(f"{owners[output]} y {path} se exportarían al mismo archivo {output}")
+        owners[output] = path
+    for output_subdir in {os.path.dirname(output) for output in jobs.values()} | {output_dir}:
+        os.makedirs(output_subdir, exist_ok=True)
+    params = batch_params(params, output_dir)
+    records = {}
+    workers = max(1, min(workers, len(event_paths) or 1))
+    logger.info("Renderizando %d eventos con %d procesos", len(event_paths), workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_event, path, params, output): path
+            for path, output in jobs.items()
+        }
+        for future in as_completed(futures):
+            record = future.result()
+            records[futures[future]] = record
+            logger.info("[%s] %s (%.2f s)", record["status"], record["event"], record["seconds"])
+
+    return [records[path] for path in event_paths]
+
+
+def render_params(params: dict) -> dict:
+    """Parameters that change the rendered page (see NON_RENDER_PARAMS)."""
+    return {k: v for k, v in params.items() if k not in NON_RENDER_PARAMS}
+
+
+def params_hash(params: dict) -> str:
+    """SHA-256 of the render parameters as canonical JSON."""
+    payload = json.dumps(render_params(params), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(output_dir: str) -> dict:
+    """Manifest of the last incremental run in ``output_dir`` (empty if none)."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {"version": MANIFEST_VERSION, "events": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        logger.warning("Manifiesto %s de otra versión: se re-renderiza todo", path)
+        return {"version": MANIFEST_VERSION, "events": {}}
+    return manifest
+
+
+def save_manifest(manifest: dict, output_dir: str) -> None:
+    """Write the manifest atomically (temporary file + rename)."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def stale_events(event_paths: list, manifest: dict, config_hash: str, output_dir: str,
+                 root: str = None) -> dict:
+    """Events whose JSON or render parameters changed since the manifest.
+
+    An entry whose file size and modification time match the manifest is
+    skipped without reading the file; otherwise the content hash decides.
+    Events that failed to render are skipped the same way, so a broken event
+    is retried only once its file or the parameters change.  Files removed
+    since they were listed are skipped.  Returns ``{path: input_hash}`` of
+    the events to render and refreshes the stat of the entries that only
+    had their timestamp touched.
+    """
+    stale = {}
+    for path in event_paths:
+        entry = manifest["events"].get(path)
+        output = batch_output_path(path, output_dir, root)
+        fresh = (entry is not None and entry["config_hash"] == config_hash
+                 and entry["output"] == output
+                 and (entry["status"] != "ok" or os.path.exists(output)))
+        try:
+            stat = os.stat(path)
+            if fresh and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            with open(path, "rb") as f:
+                input_hash = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            logger.debug("Evento borrado durante la pasada: %s", path)
+            continue
+        if fresh and entry["input_hash"] == input_hash:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            continue
+        stale[path] = input_hash
+    return stale
+
+
+def sync_events(event_paths: list, params: dict, output_dir: str, workers: int,
+                root: str = None) -> list:
+    """Render only the events that changed since the last run in ``output_dir``.
+
+    The manifest in ``output_dir`` keeps, per event JSON, its stat, content
+    hash, the hash of the render parameters and the output path.  Events
+    removed from the input are dropped from the manifest (their pages are
+    kept).  Returns the records of the events rendered in this pass.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    before = json.dumps(manifest, sort_keys=True)
+    config_hash = params_hash(params)
+    for path in set(manifest["events"]) - set(event_paths):
+        logger.info("Evento eliminado del directorio: %s", path)
+        del manifest["events"][path]
+
+    stale = stale_events(event_paths, manifest, config_hash, output_dir, root)
+    if not stale:
+        if json.dumps(manifest, sort_keys=True) != before:
+            save_manifest(manifest, output_dir)
+        logger.debug("%d eventos sin cambios", len(event_paths))
+        return []
+    records = render_batch(list(stale), params, output_dir, workers, root)
+    for record in records:
+        try:
+            stat = os.stat(record["event"])
+        except FileNotFoundError:
+            continue
+        manifest["events"][record["event"]] = dict(
+            input_hash=stale[record["event"]],
+            config_hash=config_hash,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            output=record["output"],
+            status=record["status"],
+            rendered_at=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+    save_manifest(manifest, output_dir)
+    logger.info("%d eventos re-renderizados, %d sin cambios",
+                len(records), len(event_paths) - len(records))
+    return records
+
+
+def watch_events(cfg_path: str, events_dir: str, events_glob: str, output_dir: str,
+                 workers: int, interval: float, overrides: dict = None) -> None:
+    """Poll the event directory/glob and the config, re-rendering what changed.
+
+    The configuration is re-read when its file changes; events are
+    re-rendered only if the change affects the render parameters.  A
+    configuration that cannot be read or does not validate is logged and
+    the last valid one is kept until the file changes again.
+    """
+    config_mtime = None
+    params = None
+    root = event_root(events_dir, events_glob)
+    while True:
+        try:
+            mtime = os.stat(cfg_path).st_mtime_ns
+            if mtime != config_mtime:
+                config_mtime = mtime
+                new_params = {**load_config(cfg_path), **(overrides or {})}
+                errors = validate_config(new_params)
+                if errors:
+                    raise ValueError("; ".join(errors))
+                params = new_params
+        except (OSError, KeyError, ValueError, configparser.Error) as exc:
+            logger.error("No se pudo cargar %s (%s): se mantiene la configuración anterior",
+                         cfg_path, exc)
+        if params is None:
+            time.sleep(interval)
+            continue
+        event_paths = collect_event_paths(events_dir, events_glob)
+        records = sync_events(event_paths, params, output_dir, workers, root)
+        if records:
+            print_batch_summary(records)
+        time.sleep(interval)
+
+
+def print_batch_summary(records: list) -> None:
+    """Print the per-event status and timing table of a batch run."""
+    for record in records:
+        line = f"{record['status']:5s} {record['seconds']:8.2f} s  {record['event']} -> {record['output']}"
+        if record["error"]:
+            line += f"  ({record['error']})"
+        print(line)
+    failed = sum(record["status"] != "ok" for record in records)
+    total = sum(record["seconds"] for record in records)
+    print(f"{len(records) - failed} ok, {failed} con error, {total:.2f} s de render acumulado")
+
+
+def profile_memory(profiler, event_data: dict, params: dict, export: bool = True) -> None:
+    """Re-run the figure (and the export, to a temporary file) with allocation
+    tracing, so the timed run is not slowed down by it."""
+    import tempfile
+
+    with profiler.memory_pass():
+        with profiler.stage("figure"):
+            fig = build_figure(event_data, params, profiler)
+        if export:
+            with tempfile.TemporaryDirectory() as tmp_dir, profiler.stage("write"):
+                export_figure(fig, os.path.join(tmp_dir, "page.html"), params)
+
+
+def write_profile(profiler, fig, report_path: str, output: str) -> None:
+    """Add the payload breakdown and output size to the profile and write it."""
+    profiler.measure_payload(fig)
+    profiler.extra["output"] = output
+    if output != "-" and os.path.exists(output):
+        profiler.extra["output_bytes"] = os.path.getsize(output)
+    profiler.write(report_path)
+    if report_path != "-":
+        logger.info("Perfil escrito en %s", report_path)
+
+
 def main() -> None:
     """Parse command line arguments and show the figure."""
     parser = argparse.ArgumentParser(
@@ -63,6 +616,100 @@ def main() -> None:
         default="./data/event_igepn2016hnmu.json",
         help="Path to configuration file with event parameters",
     )
+    parser.add_argument(
+        "--output",
+        help="HTML output path, or - for stdout (default: [ANIMATION] output_html)",
+    )
+    parser.add_argument(
+        "--video",
+        help="Render the animation to this .gif or .mp4 file instead of HTML (no browser needed)",
+    )
+    parser.add_argument(
+        "--plotlyjs",
+        choices=["cdn", "inline", "shared"],
+        help="How pages load plotly.js (default: [EXPORT] plotlyjs)",
+    )
+    parser.add_argument(
+        "--animation",
+        choices=CHOICES["animation"],
+        help="Precomputed animation frames or blocks moved in the browser "
+             "(default: [ANIMATION] mode)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Embed geometry as float32/uint8 typed arrays (default: [EXPORT] compact_arrays)",
+    )
+    parser.add_argument(
+        "--events-dir",
+        help="Batch mode: render every *.json event in this directory",
+    )
+    parser.add_argument(
+        "--events-glob",
+        help="Batch mode: render every event JSON matching this glob pattern",
+    )
+    parser.add_argument(
+        "--catalog",
+        help="Batch mode: render every focal mechanism of a QuakeML, CSV or psmeca catalog",
+    )
+    parser.add_argument(
+        "--catalog-format",
+        default="auto",
+        choices=["auto", "quakeml", "csv", "psmeca"],
+        help="Catalog format (default: from the file extension)",
+    )
+    parser.add_argument(
+        "--psmeca-layout",
+        default="a",
+        choices=["a", "c", "m"],
+        help="Catalog mode: columns of a psmeca file, as its -S option (default: a)",
+    )
+    parser.add_argument(
+        "--plates",
+        nargs=2,
+        default=("", ""),
+        metavar=("PLATE_A", "PLATE_B"),
+        help="Catalog mode: plate labels of the two blocks",
+    )
+    parser.add_argument(
+        "--sequence",
+        action="store_true",
+        help="Catalog mode: draw all mechanisms in one page (--output) instead of one page each",
+    )
+    parser.add_argument(
+        "--output-dir",
+        help="Batch mode: directory for the HTML outputs (default: [BATCH] output_dir)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Batch mode: number of worker processes (default: [BATCH] workers)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Batch mode: keep polling the events and config, re-rendering only what changed",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Watch mode: seconds between polls (default: 5)",
+    )
+    parser.add_argument(
+        "--summary",
+        help="Batch mode: write the per-event summary as JSON to this path",
+    )
+    parser.add_argument(
+        "--profile",
+        help="Write a JSON report of per-stage timings, allocation peaks and "
+             "per-trace/per-frame bytes to this path (- for stderr)",
+    )
+    parser.add_argument(
+        "--validate-only",
+        action="store_true",
+        help="Check the configuration and event files and exit, without rendering",
+    )
     parser.add_argument(
         "--log-level",
         default="INFO",
@@ -75,84 +722,150 @@ def main() -> None:
     logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(message)s")
 
     logger.info("Using configuration file %s", args.config)
-    params = load_config(args.config)
-
-    event_data = load_event_json(args.event)
-    '''
-    params["strike_angle_deg"],
-    params["dip_angle_deg"],
-    params["rake_angle_deg"],
-    params["latitude"],
-    params["longitude"],
-    params["depth"],
-    params["plate_a"],
-    params["plate_b"],
-    '''
-
-    fig = igballs_fault.create_figure(
-
-        event_data,
-        params["plane" ],
-        params["move_block"],
-        params["width"],
-        params["height"],
-        params["steps"],
-        params["speed"],
-        params["eye_dict"],
-        params["radius"],
-        params["resolution"],
-        params["invert_colors"]
-        
-    )
-    logger.info("Showing figure")
-
-
-    # Exportar HTML completo
-    fig.write_html(params["output_html"], include_plotlyjs="cdn", full_html=True, config={"responsive": True}   )
-
-    
-    # Insertar el CSS justo antes de </head>
-    with open(params["output_html"], "r") as f:
-        html = f.read()
-
-        mobile_style = """
-        <style>
-        html, body {
-            margin: 0;
-            padding: 0;
-            height: 100%;
-            width: 100%;
-            overflow: hidden;
-        }
-
-    .plotly-graph-div {
-        height: 100% !important;
-        width: 100% !important;
-        position: absolute !important;
-        top: 0;
-        left: 0;
-    }
-
-        .modebar-btn {
-            transform: scale(1.8);
-            margin: 8px;
-        }
-        </style>
-        """
-
-
-        html = html.replace("<head>", f"<head>{mobile_style}", 1)
-
-    with open(params["output_html"], "w") as f:
-        f.write(html)
-
-    print(f"HTML exportado a: {params['output_html']}")   
+    if args.validate_only:
+        event_paths, events = [], []
+        if args.catalog:
+            import igballs_catalog
+            events = list(igballs_catalog.iter_catalog(args.catalog, args.catalog_format,
+                                                       *args.plates, args.psmeca_layout))
+        elif args.events_dir or args.events_glob:
+            event_paths = collect_event_paths(args.events_dir, args.events_glob)
+        else:
+            event_paths = [args.event]
+        errors = validate(args.config, event_paths, events)
+        for error in errors:
+            print(error, file=sys.stderr)
+        if errors:
+            raise SystemExit(1)
+        print(f"Configuración válida ({len(event_paths) + len(events)} eventos)")
+        return
+
+    if args.profile and (args.catalog or args.events_dir or args.events_glob):
+        parser.error("--profile works on a single --event, not in batch mode")
+    profiler = None
+    if args.profile:
+        import igballs_profile
+        profiler = igballs_profile.Profiler()
+
+    def stage(name):
+        return profiler.stage(name) if profiler else contextlib.nullcontext()
+
+    with stage("config"):
+        params = load_config(args.config)
+    if args.plotlyjs:
+        params["plotlyjs"] = args.plotlyjs
+    if args.compact:
+        params["compact_arrays"] = True
+    if args.animation:
+        params["animation"] = args.animation
+    if args.video:
+        # El video se rasteriza a partir de los cuadros de la figura
+        params["animation"] = "frames"
+
+    if args.watch:
+        if not (args.events_dir or args.events_glob):
+            parser.error("--watch needs --events-dir or --events-glob")
+        output_dir = (args.output_dir or params["output_dir"]
+                      or os.path.dirname(params["output_html"]) or ".")
+        overrides = {key: params[key] for key, flag in
+                     (("plotlyjs", args.plotlyjs), ("compact_arrays", args.compact),
+                      ("animation", args.animation)) if flag}
+        logger.info("Vigilando eventos cada %.1f s (Ctrl+C para salir)", args.interval)
+        try:
+            watch_events(args.config, args.events_dir, args.events_glob, output_dir,
+                         args.workers or params["workers"], args.interval, overrides)
+        except KeyboardInterrupt:
+            pass
+        return
+
+    if args.catalog and args.sequence:
+        import igballs_catalog
+        import igballs_fault
+        events = []
+        for event in igballs_catalog.iter_catalog(args.catalog, args.catalog_format,
+                                                  *args.plates, args.psmeca_layout):
+            errors = validate_event(event, params["plane"])
+            if errors:
+                logger.error("Evento %s no válido, se omite: %s", event["id"], "; ".join(errors))
+            else:
+                events.append(event)
+        if not events:
+            parser.error(f"no valid focal mechanisms found in {args.catalog}")
+        fig = igballs_fault.create_sequence_figure(
+            events, params["plane"], eye_dict=params["eye_dict"],
+            invert_colors=params["invert_colors"], title=os.path.basename(args.catalog))
+        output_html = args.output or params["output_html"]
+        export_figure(fig, output_html, params)
+        if output_html != "-":
+            print(f"HTML exportado a: {output_html}")
+        return
+
+    if args.catalog or args.events_dir or args.events_glob:
+        output_dir = (args.output_dir or params["output_dir"]
+                      or os.path.dirname(params["output_html"]) or ".")
+        workers = args.workers or params["workers"]
+        if args.catalog:
+            import igballs_catalog
+            events = igballs_catalog.iter_catalog(args.catalog, args.catalog_format,
+                                                  *args.plates, args.psmeca_layout)
+            records = render_catalog(events, params, output_dir, workers)
+        else:
+            event_paths = collect_event_paths(args.events_dir, args.events_glob)
+            if not event_paths:
+                parser.error("no event JSON files matched --events-dir/--events-glob")
+            try:
+                records = render_batch(event_paths, params, output_dir, workers,
+                                       event_root(args.events_dir, args.events_glob))
+            except ValueError as exc:
+                parser.error(str(exc))
+        print_batch_summary(records)
+        if args.summary:
+            with open(args.summary, "w") as f:
+                json.dump(records, f, indent=2)
+        if any(record["status"] != "ok" for record in records):
+            raise SystemExit(1)
+        return
+
+    with stage("event"):
+        event_data = load_event_json(args.event)
+
+    with stage("import"):
+        # plotly se carga aquí; en el perfil queda separado de la figura
+        import igballs_fault  # noqa: F401
+
+    with stage("figure"):
+        fig = build_figure(event_data, params, profiler)
+
+    if args.video:
+        import igballs_video
+        with stage("video"):
+            igballs_video.export_video(
+                fig, args.video,
+                fps=params["video_fps"],
+                workers=params["video_workers"],
+                width=params["video_width"],
+                height=params["video_height"],
+            )
+        if profiler:
+            profile_memory(profiler, event_data, params, export=False)
+            write_profile(profiler, fig, args.profile, args.video)
+        print(f"Video exportado a: {args.video}")
+        return
+
+    output_html = args.output or params["output_html"]
+    with stage("write"):
+        export_figure(fig, output_html, params)
+    if profiler:
+        profile_memory(profiler, event_data, params)
+        write_profile(profiler, fig, args.profile, output_html)
+    if output_html == "-":
+        return
+
+    print(f"HTML exportado a: {output_html}")   
     
+    logger.info("Showing figure")
     fig.show()
 
 
-
 if __name__ == "__main__":
     main()
-
-
@@ -1,45 +1,104 @@
+import functools
+from collections import namedtuple
+
 import numpy as np
 import plotly.graph_objects as go
 
-def create_beach_ball(center, strike_vec, dip_vec, normal_vec,
-                      rake_deg, radius=2.5, resolution=300,
-                      invert_colors=False):
 
+SphereGrid = namedtuple("SphereGrid", "x y z xx yy zz xy xz yz")
+
+
+@functools.lru_cache(maxsize=4)
+def unit_sphere_grid(resolution):
+    """Return the lat/long unit-sphere grid for ``resolution`` (cached).
+
+    Besides the ``x, y, z`` components, the six quadratic products used by
+    :func:`polarity` are precomputed.  All arrays are read-only because they
+    are shared between calls.
+    """
+    u = np.linspace(0, 2*np.pi, resolution)
+    v = np.linspace(0,     np.pi, resolution)
+    u, v = np.meshgrid(u, v)
+    sin_v = np.sin(v)
+    x = sin_v*np.cos(u)
+    y = sin_v*np.sin(u)
+    z = np.cos(v)
+    grid = SphereGrid(x, y, z, x*x, y*y, z*z, 2*x*y, 2*x*z, 2*y*z)
+    for component in grid:
+        component.flags.writeable = False
+    return grid
+
+
+def polarity(M, grid):
+    """Radial displacement ``x·M·x`` of a symmetric tensor on a sphere grid.
+
+    Evaluated as the six-term quadratic form on the cached products, which
+    avoids the reshaped copy and the generic ``einsum`` contraction.
+    """
+    ur = M[0, 0]*grid.xx
+    ur += M[1, 1]*grid.yy
+    ur += M[2, 2]*grid.zz
+    ur += M[0, 1]*grid.xy
+    ur += M[0, 2]*grid.xz
+    ur += M[1, 2]*grid.yz
+    return ur
+
+
+def double_couple(strike_vec, dip_vec, normal_vec, rake_deg):
+    """Return ``(slip_vec, normal_vec, M)`` of a shear double couple.
+
+    ``slip_vec`` is the motion of the hanging wall and ``normal_vec`` points
+    from the footwall into it (Aki & Richards convention), both normalised;
+    ``M`` is the 3×3 moment tensor expressed in the same frame as the input
+    vectors.
+    """
     # -- 1. Unit vectors of the local basis -------------------------------
     v1 = strike_vec / np.linalg.norm(strike_vec)   # strike axis  (x)
     v2 = dip_vec    / np.linalg.norm(dip_vec)      # down‑dip     (y)
     v3 = normal_vec / np.linalg.norm(normal_vec)   # fault normal (z)
 
     # -- 2. Slip vector from rake -----------------------------------------
+    #   v2 points down-dip and v3 = v1 × v2 into the footwall: a positive
+    #   rake moves the hanging wall up-dip, along -v2, and its normal is -v3
     rake = np.deg2rad(rake_deg)
-    slip_vec = np.cos(rake)*v1 + np.sin(rake)*v2
+    slip_vec = np.cos(rake)*v1 - np.sin(rake)*v2
     slip_vec /= np.linalg.norm(slip_vec)
+    v3 = -v3
 
     # -- 3. Moment tensor for a sheer double couple -----------------------
     #   M_ij = s_i n_j + s_j n_i   (Aki & Richards, eq. 4.89)
     M = np.outer(slip_vec, v3) + np.outer(v3, slip_vec)   # 3×3
+    return slip_vec, v3, M
 
-    # -- 4. Points on a unit sphere ---------------------------------------
-    u = np.linspace(0, 2*np.pi, resolution)
-    v = np.linspace(0,     np.pi, resolution)
-    u, v = np.meshgrid(u, v)
-    x = np.sin(v)*np.cos(u)
-    y = np.sin(v)*np.sin(u)
-    z = np.cos(v)
-    xyz = np.stack([x, y, z], axis=-1).reshape(-1, 3)
+
+def create_beach_ball(center, strike_vec, dip_vec, normal_vec,
+                      rake_deg, radius=2.5, resolution=300,
+                      invert_colors=False, M=None, polarity_cache=None):
+
+    # -- 1‑3. Slip, normal and moment tensor ------------------------------
+    #     A full moment tensor M (x este, y norte, z arriba) replaces the
+    #     double couple of the plane
+    if M is None:
+        _, _, M = double_couple(strike_vec, dip_vec, normal_vec, rake_deg)
+
+    # -- 4. Points on a unit sphere (cached per resolution) ----------------
+    grid = unit_sphere_grid(resolution)
 
     # -- 5. Radial displacement sign --------------------------------------
     #     sign > 0  → compression,  sign < 0 → dilatation
-    ur = np.einsum('...i,ij,...j->...', xyz, M, xyz)
-    colors = (ur < 0).astype(int)                   # 0 = blue (C), 1 = white (T)
+    #     (igballs_polarity.PolarityCache keeps the grids across runs)
+    if polarity_cache is not None:
+        colors = polarity_cache.colors(M, resolution, lambda: polarity(M, grid) < 0).astype(int)
+    else:
+        colors = (polarity(M, grid) < 0).astype(int)    # 0 = blue (C), 1 = white (T)
     if invert_colors:
         colors = 1 - colors
 
     # -- 6. Scale and translate to the desired centre ---------------------
-    x_final = x*radius + center[0]
-    y_final = y*radius + center[1]
-    z_final = z*radius + center[2]
-    color_final = colors.reshape(u.shape)
+    x_final = grid.x*radius + center[0]
+    y_final = grid.y*radius + center[1]
+    z_final = grid.z*radius + center[2]
+    color_final = colors
 
     return go.Surface(
         x=x_final, y=y_final, z=z_final,
@@ -50,3 +109,448 @@ def create_beach_ball(center, strike_vec, dip_vec, normal_vec,
         name='Beachball'
     )
 
+
+
+# ---------------------------------------------------------------------------
+#  Icosphere beachball
+# ---------------------------------------------------------------------------
+
+def _subdivide(vertices, faces):
+    """Split every face in four, pushing the edge midpoints onto the sphere.
+
+    Returns the extended vertex array and the new faces.  Midpoints are
+    shared between the faces of ``faces`` that have the same edge.
+    """
+    a, b, c = faces.T
+    edges = np.sort(np.concatenate([
+        np.stack([a, b], axis=1),
+        np.stack([b, c], axis=1),
+        np.stack([c, a], axis=1),
+    ]), axis=1)
+    unique, inverse = np.unique(edges, axis=0, return_inverse=True)
+    midpoints = vertices[unique[:, 0]] + vertices[unique[:, 1]]
+    midpoints /= np.linalg.norm(midpoints, axis=1, keepdims=True)
+
+    m_ab, m_bc, m_ca = inverse.reshape(3, -1) + len(vertices)
+    new_faces = np.concatenate([
+        np.stack([a, m_ab, m_ca], axis=1),
+        np.stack([b, m_bc, m_ab], axis=1),
+        np.stack([c, m_ca, m_bc], axis=1),
+        np.stack([m_ab, m_bc, m_ca], axis=1),
+    ])
+    return np.concatenate([vertices, midpoints]), new_faces
+
+
+def _refine_faces(vertices, faces, marked):
+    """Red-green refinement of the ``marked`` faces of a sphere mesh.
+
+    Marked faces are split in four as in :func:`_subdivide`.  A face with
+    two or more split edges is split in four as well (repeated until no
+    such face is left), and a face with a single split edge is bisected
+    through its midpoint, so every new vertex is shared by all the faces
+    around it and the mesh has no T-junctions.  Edges are matched by vertex
+    position, which also joins the seam and the poles of the lat/long mesh.
+    Returns the extended ``(vertices, faces)``.
+    """
+    _, welded = np.unique(np.round(vertices, 12), axis=0, return_inverse=True)
+    welded = welded.ravel()
+    corners = np.stack([faces, np.roll(faces, -1, axis=1)], axis=-1)   # aristas ab, bc, ca
+    edges, edge_ids = np.unique(np.sort(welded[corners], axis=-1).reshape(-1, 2),
+                                axis=0, return_inverse=True)
+    edge_ids = edge_ids.reshape(-1, 3)
+
+    marked = np.asarray(marked, dtype=bool).copy()
+    while True:
+        split = np.zeros(len(edges), dtype=bool)
+        split[edge_ids[marked]] = True
+        closure = ~marked & (split[edge_ids].sum(axis=1) >= 2)
+        if not closure.any():
+            break
+        marked |= closure
+
+    # Un punto medio por arista partida, a partir de los vértices de una cara
+    first = np.zeros(len(edges), dtype=int)
+    first[edge_ids.ravel()] = np.arange(edge_ids.size)
+    ends = corners.reshape(-1, 2)[first[split]]
+    midpoints = vertices[ends[:, 0]] + vertices[ends[:, 1]]
+    midpoints /= np.linalg.norm(midpoints, axis=1, keepdims=True)
+    mid_index = np.full(len(edges), -1)
+    mid_index[split] = np.arange(len(midpoints)) + len(vertices)
+
+    a, b, c = faces[marked].T
+    m_ab, m_bc, m_ca = mid_index[edge_ids[marked]].T
+    red = [
+        np.stack([a, m_ab, m_ca], axis=1),
+        np.stack([b, m_bc, m_ab], axis=1),
+        np.stack([c, m_ca, m_bc], axis=1),
+        np.stack([m_ab, m_bc, m_ca], axis=1),
+    ]
+
+    # Caras verdes: se rotan para que la arista partida sea ab
+    green = ~marked & split[edge_ids].any(axis=1)
+    edge = np.argmax(split[edge_ids[green]], axis=1)
+    order = (edge[:, None] + np.arange(3)) % 3
+    a, b, c = np.take_along_axis(faces[green], order, axis=1).T
+    m = mid_index[np.take_along_axis(edge_ids[green], edge[:, None], axis=1)[:, 0]]
+    new_faces = np.concatenate([
+        faces[~marked & ~green],
+        *red,
+        np.stack([a, m, c], axis=1),
+        np.stack([m, b, c], axis=1),
+    ])
+    return np.concatenate([vertices, midpoints]), new_faces
+
+
+@functools.lru_cache(maxsize=8)
+def icosphere(subdivisions):
+    """Return ``(vertices, faces)`` of a unit icosphere (cached, read-only).
+
+    Level 0 is the icosahedron (12 vertices, 20 faces); every level splits
+    each face in four, so level ``n`` has ``20·4ⁿ`` faces.
+    """
+    t = (1 + np.sqrt(5)) / 2
+    vertices = np.array([
+        [-1,  t,  0], [ 1,  t,  0], [-1, -t,  0], [ 1, -t,  0],
+        [ 0, -1,  t], [ 0,  1,  t], [ 0, -1, -t], [ 0,  1, -t],
+        [ t,  0, -1], [ t,  0,  1], [-t,  0, -1], [-t,  0,  1],
+    ], dtype=float)
+    vertices /= np.linalg.norm(vertices, axis=1, keepdims=True)
+    faces = np.array([
+        [0, 11, 5], [0, 5, 1], [0, 1, 7], [0, 7, 10], [0, 10, 11],
+        [1, 5, 9], [5, 11, 4], [11, 10, 2], [10, 7, 6], [7, 1, 8],
+        [3, 9, 4], [3, 4, 2], [3, 2, 6], [3, 6, 8], [3, 8, 9],
+        [4, 9, 5], [2, 4, 11], [6, 2, 10], [8, 6, 7], [9, 8, 1],
+    ])
+    for _ in range(subdivisions):
+        vertices, faces = _subdivide(vertices, faces)
+    vertices.flags.writeable = False
+    faces.flags.writeable = False
+    return vertices, faces
+
+
+def polarity_at(M, points):
+    """Radial displacement ``x·M·x`` at an ``(N, 3)`` array of unit vectors."""
+    x, y, z = points.T
+    return (M[0, 0]*x*x + M[1, 1]*y*y + M[2, 2]*z*z
+            + 2*(M[0, 1]*x*y + M[0, 2]*x*z + M[1, 2]*y*z))
+
+
+def _boundary_faces(M, vertices, faces):
+    """Mask of the faces crossed by a nodal line (mixed polarity signs)."""
+    centroids = vertices[faces].sum(axis=1)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    signs = np.concatenate([
+        polarity_at(M, vertices)[faces] < 0,
+        (polarity_at(M, centroids) < 0)[:, None],
+    ], axis=1)
+    return signs.any(axis=1) & ~signs.all(axis=1)
+
+
+@functools.lru_cache(maxsize=4)
+def latlong_mesh(resolution):
+    """Triangulate the lat/long grid of :func:`unit_sphere_grid` (cached).
+
+    Returns read-only ``(vertices, faces)``; each grid cell becomes two
+    triangles, so the grid can go through the same splitting as the icosphere.
+    """
+    grid = unit_sphere_grid(resolution)
+    vertices = np.stack([grid.x, grid.y, grid.z], axis=-1).reshape(-1, 3)
+    idx = np.arange(resolution*resolution).reshape(resolution, resolution)
+    a = idx[:-1, :-1].ravel()
+    b = idx[:-1, 1:].ravel()
+    c = idx[1:, 1:].ravel()
+    d = idx[1:, :-1].ravel()
+    faces = np.concatenate([np.stack([a, b, c], axis=1),
+                            np.stack([a, c, d], axis=1)])
+    vertices.flags.writeable = False
+    faces.flags.writeable = False
+    return vertices, faces
+
+
+def split_faces_on_plane(vertices, faces, plane_normal):
+    """Cut the faces crossed by the plane through the origin ``⟂ plane_normal``.
+
+    Every crossing triangle is replaced by three triangles whose new vertices
+    lie exactly on the great circle of the plane (the cut points are pushed
+    back onto the sphere, which keeps them in the plane).  Returns the
+    extended ``(vertices, faces)``.
+    """
+    side = vertices @ plane_normal >= 0
+    face_side = side[faces]
+    crossing = face_side.any(axis=1) & ~face_side.all(axis=1)
+    if not crossing.any():
+        return vertices, faces
+
+    cut = faces[crossing]
+    cut_side = face_side[crossing]
+    # Rotate each triangle so that its lone vertex (the one alone on its side
+    # of the plane) comes first; rotation keeps the winding order.
+    lone = np.where(cut_side.sum(axis=1) == 1,
+                    np.argmax(cut_side, axis=1), np.argmin(cut_side, axis=1))
+    order = (lone[:, None] + np.arange(3)) % 3
+    a, b, c = np.take_along_axis(cut, order, axis=1).T
+
+    dist = vertices @ plane_normal
+    def cut_point(p, q):
+        t = dist[p] / (dist[p] - dist[q])
+        point = vertices[p] + t[:, None]*(vertices[q] - vertices[p])
+        return point / np.linalg.norm(point, axis=1, keepdims=True)
+
+    n = len(vertices)
+    m = len(a)
+    ab = np.arange(n, n + m)
+    ac = np.arange(n + m, n + 2*m)
+    vertices = np.concatenate([vertices, cut_point(a, b), cut_point(a, c)])
+    faces = np.concatenate([
+        faces[~crossing],
+        np.stack([a, ab, ac], axis=1),
+        np.stack([ab, b, c], axis=1),
+        np.stack([ab, c, ac], axis=1),
+    ])
+    return vertices, faces
+
+
+def beach_ball_mesh(M, subdivisions=4, refine_levels=0, split_planes=(),
+                    resolution=None):
+    """Sphere vertices, faces and per-face polarity for tensor ``M``.
+
+    The base mesh is the icosphere of level ``subdivisions``, or the
+    triangulated lat/long grid when ``resolution`` is given.  Faces crossed
+    by a nodal line are subdivided ``refine_levels`` extra times (red-green,
+    without T-junctions), so the vertex budget is spent only where the
+    colour changes.  The faces are
+    then cut along each plane normal in ``split_planes``; for a double
+    couple these are the nodal planes and the coloured boundary becomes
+    exact whatever the base resolution.
+    Returns ``(vertices, faces, colors)`` with ``colors`` 0 = compression
+    and 1 = dilatation, evaluated at each face centroid.
+    """
+    if resolution is None:
+        vertices, faces = icosphere(subdivisions)
+    else:
+        vertices, faces = latlong_mesh(resolution)
+    for _ in range(refine_levels):
+        boundary = _boundary_faces(M, vertices, faces)
+        if not boundary.any():
+            break
+        vertices, faces = _refine_faces(vertices, faces, boundary)
+    for plane_normal in split_planes:
+        vertices, faces = split_faces_on_plane(vertices, faces, plane_normal)
+
+    centroids = vertices[faces].sum(axis=1)
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+    colors = (polarity_at(M, centroids) < 0).astype(int)
+    return vertices, faces, colors
+
+
+def create_beach_ball_mesh(center, strike_vec, dip_vec, normal_vec,
+                           rake_deg, radius=2.5, subdivisions=4,
+                           invert_colors=False, refine_levels=0,
+                           split_nodal=False, resolution=None, M=None):
+    """Beachball as a single ``Mesh3d`` with per-face colour.
+
+    Same arguments as :func:`create_beach_ball`, with the icosphere
+    ``subdivisions`` level and the number of extra ``refine_levels`` near the
+    nodal lines.  ``split_nodal`` cuts the boundary faces along the two nodal
+    planes; ``resolution`` switches the base mesh to the lat/long grid.
+    With a full tensor ``M`` the nodal surfaces are cones, not planes, so
+    ``split_nodal`` is ignored and only ``refine_levels`` sharpens them.
+    """
+    slip_vec, normal_unit, dc = double_couple(strike_vec, dip_vec, normal_vec, rake_deg)
+    split_planes = (normal_unit, slip_vec) if split_nodal and M is None else ()
+    M = dc if M is None else M
+    vertices, faces, colors = beach_ball_mesh(
+        M, subdivisions, refine_levels, split_planes, resolution)
+    if invert_colors:
+        colors = 1 - colors
+
+    x, y, z = (vertices*radius + np.asarray(center)).T
+    i, j, k = faces.T
+    return go.Mesh3d(
+        x=x, y=y, z=z, i=i, j=j, k=k,
+        intensity=colors, intensitymode='cell',
+        colorscale=[[0, 'blue'], [1, 'white']],
+        cmin=0, cmax=1,
+        showscale=False,
+        flatshading=True,
+        name='Beachball'
+    )
+
+
+# ---------------------------------------------------------------------------
+#  Nodal lines
+# ---------------------------------------------------------------------------
+
+def nodal_great_circles(slip_vec, normal_vec, n_points=181):
+    """Great circles of the fault and auxiliary planes on the unit sphere.
+
+    The fault plane is normal to ``normal_vec`` and the auxiliary plane is
+    normal to ``slip_vec``; both contain the null axis ``normal × slip``.
+    Returns two ``(n_points, 3)`` arrays of unit vectors.
+    """
+    t = np.linspace(0, 2*np.pi, n_points)[:, None]
+    null_axis = np.cross(normal_vec, slip_vec)
+    fault = np.cos(t)*slip_vec + np.sin(t)*null_axis
+    auxiliary = np.cos(t)*normal_vec + np.sin(t)*null_axis
+    return fault, auxiliary
+
+
+def create_nodal_lines(center, strike_vec, dip_vec, normal_vec,
+                       rake_deg, radius=2.5, n_points=181,
+                       color='black', width=4):
+    """Both nodal planes drawn as exact curves on the beachball surface.
+
+    Returns a single ``Scatter3d`` with the two great circles separated by
+    ``None``.  The curves sit slightly above the sphere so that they are not
+    hidden by the surface.
+    """
+    slip_vec, normal_unit, _ = double_couple(strike_vec, dip_vec, normal_vec, rake_deg)
+    fault, auxiliary = nodal_great_circles(slip_vec, normal_unit, n_points)
+    points = np.concatenate([fault, np.full((1, 3), np.nan), auxiliary])
+    points = points*radius*1.005 + np.asarray(center)
+    x, y, z = (np.where(np.isnan(c), None, c).tolist() for c in points.T)
+    return go.Scatter3d(
+        x=x, y=y, z=z,
+        mode='lines',
+        line=dict(color=color, width=width),
+        hoverinfo='none',
+        name='Planos nodales'
+    )
+
+
+# ---------------------------------------------------------------------------
+#  Beachball field (many mechanisms in one trace)
+# ---------------------------------------------------------------------------
+
+def fault_vectors(strike_deg, dip_deg):
+    """Strike, down-dip and normal unit vectors for arrays of angles.
+
+    Same frame as ``igballs_fault`` (x este, y norte, z arriba); returns three
+    ``(N, 3)`` arrays.
+    """
+    strike = np.radians(np.asarray(strike_deg, dtype=float))
+    dip = np.radians(np.asarray(dip_deg, dtype=float))
+    strike_vec = np.stack([np.sin(strike), np.cos(strike), np.zeros_like(strike)], axis=-1)
+    dip_vec = np.stack([np.cos(strike)*np.cos(dip), -np.sin(strike)*np.cos(dip),
+                        -np.sin(dip)], axis=-1)
+    return strike_vec, dip_vec, np.cross(strike_vec, dip_vec)
+
+
+def double_couples(strike_deg, dip_deg, rake_deg):
+    """``(N, 3, 3)`` double-couple tensors, as :func:`double_couple` per event."""
+    strike_vec, dip_vec, normal_vec = fault_vectors(strike_deg, dip_deg)
+    rake = np.radians(np.asarray(rake_deg, dtype=float))[:, None]
+    # Deslizamiento del bloque colgante y normal hacia él (ver double_couple)
+    slip_vec = np.cos(rake)*strike_vec - np.sin(rake)*dip_vec
+    normal_vec = -normal_vec
+    return (slip_vec[:, :, None]*normal_vec[:, None, :]
+            + normal_vec[:, :, None]*slip_vec[:, None, :])
+
+
+@functools.lru_cache(maxsize=8)
+def _face_quadratics(subdivisions):
+    """``(6, F)`` quadratic products at the face centroids of an icosphere.
+
+    Row order matches :func:`_tensor_terms`, so the polarity of all faces of
+    many tensors is one matrix product.
+    """
+    vertices, faces = icosphere(subdivisions)
+    c = vertices[faces].sum(axis=1)
+    c /= np.linalg.norm(c, axis=1, keepdims=True)
+    x, y, z = c.T
+    products = np.stack([x*x, y*y, z*z, 2*x*y, 2*x*z, 2*y*z])
+    products.flags.writeable = False
+    return products
+
+
+def _tensor_terms(M):
+    """``(N, 6)`` independent components of ``(N, 3, 3)`` symmetric tensors."""
+    return np.stack([M[:, 0, 0], M[:, 1, 1], M[:, 2, 2],
+                     M[:, 0, 1], M[:, 0, 2], M[:, 1, 2]], axis=1)
+
+
+def magnitude_radii(magnitudes, min_radius=1.0, max_radius=5.0):
+    """Radii growing linearly with magnitude between ``min_radius`` and ``max_radius``.
+
+    Events without a magnitude (None/NaN) get ``min_radius`` and do not
+    take part in the scaling.
+    """
+    magnitudes = np.asarray(magnitudes, dtype=float)
+    known = np.isfinite(magnitudes)
+    if not known.any():
+        return np.full(magnitudes.shape, max_radius)
+    low, high = np.nanmin(magnitudes), np.nanmax(magnitudes)
+    if high == low:
+        return np.where(known, max_radius, min_radius)
+    radii = min_radius + (magnitudes - low) / (high - low) * (max_radius - min_radius)
+    return np.where(known, radii, min_radius)
+
+
+def lod_levels(radii, max_subdivisions=4, min_subdivisions=1):
+    """Icosphere level per ball: one level less each time the radius halves.
+
+    A level has four times the faces of the previous one, so the faces keep
+    about the same size on screen for every ball.
+    """
+    radii = np.asarray(radii, dtype=float)
+    drop = np.floor(np.log2(radii.max() / radii))
+    return np.clip(max_subdivisions - drop, min_subdivisions, max_subdivisions).astype(int)
+
+
+def beach_ball_field(centers, M, radii, levels):
+    """Vertices, faces and per-face polarity of many beachballs at once.
+
+    ``centers`` is ``(N, 3)``, ``M`` the ``(N, 3, 3)`` tensors, ``radii`` and
+    ``levels`` (icosphere subdivisions) length-``N`` arrays.  Balls that share
+    a level share the cached icosphere, and their polarities are computed
+    with one matrix product.  Returns ``(vertices, faces, colors)`` like
+    :func:`beach_ball_mesh`.
+    """
+    centers = np.asarray(centers, dtype=float)
+    radii = np.asarray(radii, dtype=float)
+    levels = np.asarray(levels)
+    terms = _tensor_terms(np.asarray(M, dtype=float))
+    all_vertices, all_faces, all_colors = [], [], []
+    offset = 0
+    for level in np.unique(levels):
+        index = np.flatnonzero(levels == level)
+        vertices, faces = icosphere(int(level))
+        ur = terms[index] @ _face_quadratics(int(level))          # (n, F)
+        placed = vertices[None]*radii[index, None, None] + centers[index, None, :]
+        all_vertices.append(placed.reshape(-1, 3))
+        starts = offset + np.arange(len(index))*len(vertices)
+        all_faces.append((faces[None] + starts[:, None, None]).reshape(-1, 3))
+        all_colors.append((ur < 0).astype(np.uint8).ravel())
+        offset += len(index)*len(vertices)
+    return np.concatenate(all_vertices), np.concatenate(all_faces), np.concatenate(all_colors)
+
+
+def create_beach_ball_field(centers, strike_deg, dip_deg, rake_deg, radii,
+                            max_subdivisions=3, min_subdivisions=1,
+                            invert_colors=False, name='Beachballs', M=None):
+    """Many mechanisms as a single ``Mesh3d`` with per-face colour.
+
+    Each ball uses an icosphere level chosen from its radius (see
+    :func:`lod_levels`), so small events cost few faces.  ``M`` are
+    ``(N, 3, 3)`` tensors used instead of the double couples of
+    strike/dip/rake (e.g. full moment tensors); they go through the same
+    batched polarity product.
+    """
+    if M is None:
+        M = double_couples(strike_deg, dip_deg, rake_deg)
+    levels = lod_levels(radii, max_subdivisions, min_subdivisions)
+    vertices, faces, colors = beach_ball_field(centers, M, radii, levels)
+    if invert_colors:
+        colors = 1 - colors
+    x, y, z = vertices.T
+    i, j, k = faces.T
+    return go.Mesh3d(
+        x=x, y=y, z=z, i=i, j=j, k=k,
+        intensity=colors, intensitymode='cell',
+        colorscale=[[0, 'blue'], [1, 'white']],
+        cmin=0, cmax=1,
+        showscale=False,
+        flatshading=True,
+        hoverinfo='none',
+        name=name
+    )
@@ -0,0 +1,311 @@
+"""Benchmarks for the beachball, the animation frames, the HTML export, the
+polarity cache and startup.
+
+Each case is timed ``repeat`` times (best and median wall time are kept),
+then run once more under ``tracemalloc`` for the peak of Python/NumPy
+allocations.  Results are appended as JSON lines, one per case, with the
+commit and library versions of the run, so that runs can be compared with
+``--compare``::
+
+    python igballs_bench.py --suite all --out bench/results.jsonl
+    python igballs_bench.py --suite beachball --compare bench/results.jsonl
+"""
+
+import argparse
+import copy
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+logger = logging.getLogger(__name__)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EVENT_PATH = os.path.join(HERE, "data", "event_igepn2016hnmu.json")
+
+# Mecanismos sintéticos (strike, dip, rake) además de los dos planos del evento
+MECHANISMS = {
+    "strike_slip": (30.0, 90.0, 0.0),
+    "normal": (120.0, 45.0, -90.0),
+    "reverse": (200.0, 30.0, 90.0),
+    "oblique": (75.0, 60.0, 135.0),
+}
+
+# Barridos completos y reducidos (--quick)
+SWEEPS = {
+    "full": dict(resolutions=(60, 111, 222, 333, 500), steps=(25, 100, 400),
+                 blocks=((10, 5), (20, 10), (40, 20)),
+                 polarity_resolutions=(60, 222, 500, 1000, 2000), repeat=3),
+    "quick": dict(resolutions=(60, 222), steps=(25, 100),
+                  blocks=((10, 5),), polarity_resolutions=(60, 1000), repeat=1),
+}
+
+# Presupuesto (s) de arranque: importar igballs y `igballs.py --validate-only`
+STARTUP_BUDGET = 0.5
+
+# Parámetros de escena comunes a todos los casos
+SCENE = dict(move_block="east", speed=0.333, eye_dict=dict(x=-1, y=-3, z=2),
+             radius=3.3, invert_colors=False)
+
+
+def load_events() -> dict:
+    """Bundled Pedernales event (both planes) plus the synthetic mechanisms.
+
+    Every event is returned with the mechanism as ``plane_1``.
+    """
+    with open(EVENT_PATH) as f:
+        base = json.load(f)
+    events = {}
+    for plane in ("plane_1", "plane_2"):
+        event = copy.deepcopy(base)
+        event["nodal_planes"]["plane_1"] = base["nodal_planes"][plane]
+        events[f"pedernales_{plane}"] = event
+    for name, (strike, dip, rake) in MECHANISMS.items():
+        event = copy.deepcopy(base)
+        event["title"] = f"Sintético: {name}"
+        event["nodal_planes"]["plane_1"] = dict(strike=strike, dip=dip, rake=rake)
+        events[name] = event
+    return events
+
+
+def run_metadata() -> dict:
+    """Commit, interpreter and library versions of this run."""
+    import numpy
+    import plotly
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                                capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return dict(
+        timestamp=datetime.datetime.now().isoformat(timespec="seconds"),
+        commit=commit,
+        python=platform.python_version(),
+        numpy=numpy.__version__,
+        plotly=plotly.__version__,
+        machine=platform.machine(),
+        cpus=os.cpu_count(),
+    )
+
+
+def measure(func, repeat: int = 3) -> dict:
+    """Time ``func`` and measure its allocation peak.
+
+    ``func`` returns the size in bytes of what it produced (or None).
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return dict(
+        wall_s=round(min(times), 6),
+        wall_median_s=round(statistics.median(times), 6),
+        peak_mb=round(peak / 2**20, 3),
+        bytes=size,
+    )
+
+
+def _json_bytes(data=(), frames=()) -> int:
+    """Size of the traces/frames as serialised into the page."""
+    import plotly.graph_objects as go
+
+    return len(go.Figure(data=list(data), frames=list(frames)).to_json())
+
+
+def bench_beachball(events: dict, sweep: dict):
+    """``create_beach_ball`` over resolutions and mechanisms."""
+    import igballs_balls
+    import igballs_fault
+
+    for name, event in events.items():
+        scene = igballs_fault.FaultScene(event, **SCENE)
+        basis = scene.basis()
+        rake = event["nodal_planes"]["plane_1"]["rake"]
+        for resolution in sweep["resolutions"]:
+            def run(resolution=resolution):
+                return _json_bytes(data=[igballs_balls.create_beach_ball(
+                    basis["center"], basis["strike_unit"], basis["dip_unit"],
+                    basis["normal_unit"], rake, SCENE["radius"], resolution)])
+            yield dict(event=name, resolution=resolution), run
+
+
+def bench_frames(events: dict, sweep: dict):
+    """Full ``create_figure`` over steps and block sizes (payload = frames)."""
+    import igballs_fault
+
+    event = events["pedernales_plane_1"]
+    for steps in sweep["steps"]:
+        for block_width, height in sweep["blocks"]:
+            def run(steps=steps, block_width=block_width, height=height):
+                fig = igballs_fault.create_figure(
+                    event, "plane_1", SCENE["move_block"], block_width, height, steps,
+                    SCENE["speed"], SCENE["eye_dict"], SCENE["radius"], 60, False)
+                return _json_bytes(frames=fig.frames)
+            yield dict(event="pedernales_plane_1", steps=steps, block_width=block_width,
+                       height=height), run
+
+
+def bench_export(events: dict, sweep: dict):
+    """HTML page bytes and render time over resolutions, steps and encodings."""
+    import igballs_export
+    import igballs_fault
+
+    event = events["pedernales_plane_1"]
+    for resolution in sweep["resolutions"]:
+        for steps in sweep["steps"]:
+            fig = igballs_fault.create_figure(
+                event, "plane_1", SCENE["move_block"], 10, 5, steps, SCENE["speed"],
+                SCENE["eye_dict"], SCENE["radius"], resolution, False)
+
+            for compact in (False, True):
+                def run(fig=fig, compact=compact):
+                    return len(igballs_export.render_html_bytes(fig, compact=compact))
+                yield dict(event="pedernales_plane_1", resolution=resolution, steps=steps,
+                           compact=compact), run
+
+
+def bench_polarity(events: dict, sweep: dict):
+    """Polarity grid of a surface ball: evaluated vs read from a warm PolarityCache."""
+    import tempfile
+
+    import igballs_balls
+    import igballs_polarity
+
+    with tempfile.TemporaryDirectory(prefix="igballs-bench-") as directory:
+        cache = igballs_polarity.PolarityCache(directory, 2**30)
+        for name, event in events.items():
+            plane = event["nodal_planes"]["plane_1"]
+            M = igballs_balls.double_couples([plane["strike"]], [plane["dip"]],
+                                             [plane["rake"]])[0]
+            for resolution in sweep["polarity_resolutions"]:
+                grid = igballs_balls.unit_sphere_grid(resolution)
+
+                def compute(M=M, grid=grid):
+                    return igballs_balls.polarity(M, grid) < 0
+
+                cache.colors(M, resolution, compute)
+                for cached in (False, True):
+                    def run(M=M, resolution=resolution, compute=compute, cached=cached):
+                        colors = cache.colors(M, resolution, compute) if cached else compute()
+                        return colors.nbytes
+                    yield dict(event=name, resolution=resolution, cached=cached), run
+
+
+def bench_startup(events: dict, sweep: dict):
+    """Wall time of fresh interpreters importing igballs / validating a config."""
+    config = os.path.join(HERE, "config", "EXAMPLE.igballs.cfg")
+    commands = {
+        "import": [sys.executable, "-c", "import igballs"],
+        "validate_only": [sys.executable, os.path.join(HERE, "igballs.py"), "--config", config,
+                          "--event", EVENT_PATH, "--validate-only", "--log-level", "ERROR"],
+    }
+    for name, command in commands.items():
+        def run(command=command):
+            subprocess.run(command, cwd=HERE, check=True,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        yield dict(command=name), run
+
+
+SUITES = {
+    "beachball": bench_beachball,
+    "frames": bench_frames,
+    "export": bench_export,
+    "polarity": bench_polarity,
+    "startup": bench_startup,
+}
+
+
+def run_suites(names: list, sweep: dict) -> list:
+    """Run the selected suites and return one record per case."""
+    events = load_events()
+    meta = run_metadata()
+    records = []
+    for suite in names:
+        for case, func in SUITES[suite](events, sweep):
+            record = dict(suite=suite, case=case, **measure(func, sweep["repeat"]), **meta)
+            logger.info("%-9s %s: %.4f s, %.1f MB, %s bytes", suite, case,
+                        record["wall_s"], record["peak_mb"], record["bytes"])
+            records.append(record)
+    return records
+
+
+def case_key(record: dict) -> str:
+    return record["suite"] + " " + json.dumps(record["case"], sort_keys=True)
+
+
+def compare(records: list, baseline_path: str) -> None:
+    """Print the wall time and size of each case relative to the latest
+    matching record of a previous results file."""
+    baseline = {}
+    with open(baseline_path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                baseline[case_key(record)] = record
+    for record in records:
+        old = baseline.get(case_key(record))
+        if old is None:
+            print(f"{case_key(record)}: sin referencia")
+            continue
+        line = f"{case_key(record)}: {old['wall_s']:.4f} -> {record['wall_s']:.4f} s " \
+               f"({record['wall_s'] / old['wall_s']:.2f}x)"
+        if record["bytes"] and old["bytes"]:
+            line += f", {old['bytes']} -> {record['bytes']} bytes"
+        print(line)
+
+
+def main() -> None:
+    """Run the benchmark suites and store the results as JSON lines."""
+    parser = argparse.ArgumentParser(description="Benchmark igballs rendering stages")
+    parser.add_argument("--suite", action="append", choices=[*SUITES, "all"],
+                        help="Suite to run (repeatable; default: all)")
+    parser.add_argument("--quick", action="store_true", help="Reduced sweep, one repetition")
+    parser.add_argument("--repeat", type=int, help="Timed repetitions per case")
+    parser.add_argument("--out", help="Append the results to this JSON-lines file")
+    parser.add_argument("--compare", help="Compare with the results in this JSON-lines file")
+    parser.add_argument("--check-startup", action="store_true",
+                        help=f"Exit with an error if startup exceeds {STARTUP_BUDGET} s")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(message)s")
+    sys.path.insert(0, HERE)
+    names = [*SUITES] if not args.suite or "all" in args.suite else args.suite
+    sweep = dict(SWEEPS["quick" if args.quick else "full"])
+    if args.repeat:
+        sweep["repeat"] = args.repeat
+
+    records = run_suites(names, sweep)
+    if args.compare:
+        compare(records, args.compare)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "a") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        logger.info("%d resultados añadidos a %s", len(records), args.out)
+
+    slow = [r for r in records if r["suite"] == "startup" and r["wall_s"] > STARTUP_BUDGET]
+    for record in slow:
+        logger.error("Arranque '%s' en %.3f s supera el presupuesto de %.1f s",
+                     record["case"]["command"], record["wall_s"], STARTUP_BUDGET)
+    if args.check_startup and slow:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,419 @@
+"""Stream earthquake catalogs (QuakeML, CSV, psmeca) as igballs events.
+
+Every reader is a generator that yields one event dictionary at a time in
+the layout of the event JSON files (``title``, ``datetime``, ``latitude``,
+``longitude``, ``depth``, ``magnitude``, ``nodal_planes``, ``plate_a``,
+``plate_b``, and ``moment_tensor`` when the catalog has one) plus an ``id``
+for naming outputs.  Files are read incrementally and already-parsed
+records are discarded, so memory stays constant and rendering can start on
+the first event.  Events without a focal mechanism are skipped; events with
+only a moment tensor get the nodal planes of its best double couple.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+
+logger = logging.getLogger(__name__)
+
+# Alias de columnas aceptados en los CSV (en minúsculas)
+CSV_COLUMNS = {
+    "id": ("id", "eventid", "event_id", "publicid"),
+    "title": ("title", "place", "name", "region", "description"),
+    "datetime": ("datetime", "time", "origin_time", "date"),
+    "latitude": ("latitude", "lat", "latitud"),
+    "longitude": ("longitude", "lon", "long", "longitud"),
+    "depth": ("depth", "depth_km", "profundidad"),
+    "magnitude": ("magnitude", "mag", "mw", "magnitud"),
+    "strike1": ("strike1", "strike_1", "np1_strike", "strike"),
+    "dip1": ("dip1", "dip_1", "np1_dip", "dip"),
+    "rake1": ("rake1", "rake_1", "np1_rake", "rake"),
+    "strike2": ("strike2", "strike_2", "np2_strike"),
+    "dip2": ("dip2", "dip_2", "np2_dip"),
+    "rake2": ("rake2", "rake_2", "np2_rake"),
+    "plate_a": ("plate_a",),
+    "plate_b": ("plate_b",),
+    "mrr": ("mrr",),
+    "mtt": ("mtt",),
+    "mpp": ("mpp",),
+    "mrt": ("mrt",),
+    "mrp": ("mrp",),
+    "mtp": ("mtp",),
+}
+
+# Componentes del tensor de momento (marco USE), como igballs_mechanism.TENSOR_KEYS
+TENSOR_KEYS = ("mrr", "mtt", "mpp", "mrt", "mrp", "mtp")
+
+FORMATS = ("quakeml", "csv", "psmeca")
+
+# Columnas numéricas de cada formato psmeca (-Sa, -Sc, -Sm) antes de las
+# opcionales [plon plat] [título]
+PSMECA_LAYOUTS = {"a": 7, "c": 11, "m": 10}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def safe_id(text: str) -> str:
+    """Event identifier usable as a file name."""
+    return re.sub(r"[^\w.-]+", "_", text).strip("_") or "event"
+
+
+def make_event(event_id, title, datetime, latitude, longitude, depth, magnitude,
+               planes, plate_a="", plate_b="", tensor=None) -> dict:
+    """Event dictionary in the igballs JSON layout.
+
+    ``planes`` is a list of one or two ``(strike, dip, rake)`` tuples and
+    ``tensor`` the six USE components ``(mrr, mtt, mpp, mrt, mrp, mtp)``;
+    without planes, those of the tensor are used, and a single plane is
+    completed with its conjugate.
+    """
+    if not title:
+        year = f" ({datetime[:4]})" if datetime else ""
+        title = f"M {magnitude:.1f}{year}" if magnitude is not None else f"Evento {event_id}"
+    elif magnitude is not None and not title.startswith("M "):
+        title = f"M {magnitude:.1f} - {title}"
+    event = {
+        "id": safe_id(str(event_id)),
+        "title": title,
+        "datetime": datetime or "",
+        "latitude": latitude,
+        "longitude": longitude,
+        "depth": depth,
+        "magnitude": magnitude,
+        "nodal_planes": {
+            f"plane_{n}": dict(strike=strike, dip=dip, rake=rake)
+            for n, (strike, dip, rake) in enumerate(planes, start=1)
+        },
+        "plate_a": plate_a,
+        "plate_b": plate_b,
+    }
+    if tensor is not None or len(planes) == 1:
+        import igballs_mechanism
+
+        if tensor is not None:
+            event["moment_tensor"] = dict(zip(TENSOR_KEYS, tensor))
+            igballs_mechanism.fill_tensor_planes(event)
+        igballs_mechanism.fill_auxiliary_plane(event)
+    return event
+
+
+# ---------------------------------------------------------------------------
+#  QuakeML
+# ---------------------------------------------------------------------------
+
+def _children(elem, name: str) -> list:
+    return [child for child in elem if _local_name(child.tag) == name]
+
+
+def _path(elem, *names):
+    for name in names:
+        if elem is None:
+            return None
+        found = _children(elem, name)
+        elem = found[0] if found else None
+    return elem
+
+
+def _text(elem, *names):
+    elem = _path(elem, *names)
+    return elem.text.strip() if elem is not None and elem.text else None
+
+
+def _number(elem, *names):
+    text = _text(elem, *names)
+    return float(text) if text not in (None, "") else None
+
+
+def _preferred(event, name: str):
+    """Preferred origin/magnitude/focalMechanism of an event (or the first)."""
+    candidates = _children(event, name)
+    preferred_id = _text(event, f"preferred{name[0].upper()}{name[1:]}ID")
+    for candidate in candidates:
+        if candidate.get("publicID") == preferred_id:
+            return candidate
+    return candidates[0] if candidates else None
+
+
+def quakeml_event(event, plate_a: str = "", plate_b: str = ""):
+    """igballs event from a QuakeML ``<event>`` element, or None if it has
+    no nodal planes."""
+    mechanism = _preferred(event, "focalMechanism")
+    tensor = None
+    components = _path(mechanism, "momentTensor", "tensor")
+    if components is not None:
+        values = [_number(components, key[0].upper() + key[1:], "value") for key in TENSOR_KEYS]
+        tensor = values if None not in values else None
+    planes = []
+    for name in ("nodalPlane1", "nodalPlane2"):
+        plane = _path(mechanism, "nodalPlanes", name)
+        if plane is not None:
+            values = [_number(plane, key, "value") for key in ("strike", "dip", "rake")]
+            if None not in values:
+                planes.append(tuple(values))
+    if not planes and tensor is None:
+        return None
+
+    origin = _preferred(event, "origin")
+    magnitude = _preferred(event, "magnitude")
+    depth_m = _number(origin, "depth", "value")
+    time_text = _text(origin, "time", "value")
+    return make_event(
+        event_id=(event.get("publicID") or "event").rstrip("/").rsplit("/", 1)[-1],
+        title=_text(event, "description", "text"),
+        datetime=time_text[:19].replace("T", " ") if time_text else "",
+        latitude=_number(origin, "latitude", "value"),
+        longitude=_number(origin, "longitude", "value"),
+        depth=round(depth_m / 1000, 3) if depth_m is not None else None,
+        magnitude=_number(magnitude, "mag", "value"),
+        planes=planes,
+        plate_a=plate_a,
+        plate_b=plate_b,
+        tensor=tensor,
+    )
+
+
+def iter_quakeml(path: str, plate_a: str = "", plate_b: str = ""):
+    """Stream the events with focal mechanism (nodal planes or moment
+    tensor) of a QuakeML file."""
+    parent = None
+    skipped = 0
+    for action, elem in ET.iterparse(path, events=("start", "end")):
+        name = _local_name(elem.tag)
+        if action == "start":
+            if name == "eventParameters":
+                parent = elem
+            continue
+        if name != "event":
+            continue
+        try:
+            event = quakeml_event(elem, plate_a, plate_b)
+        except ValueError as exc:
+            logger.warning("%s: evento %s: %s, se omite", path, elem.get("publicID"), exc)
+            event = None
+        if event is None:
+            skipped += 1
+        else:
+            yield event
+        # Eventos ya procesados: se liberan del árbol
+        elem.clear()
+        if parent is not None:
+            parent.clear()
+    if skipped:
+        logger.info("%d eventos sin mecanismo focal omitidos en %s", skipped, path)
+
+
+# ---------------------------------------------------------------------------
+#  CSV y psmeca
+# ---------------------------------------------------------------------------
+
+def _column_map(header: list) -> dict:
+    lower = {name.strip().lower(): name for name in header}
+    mapping = {}
+    for key, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in lower:
+                mapping[key] = lower[alias]
+                break
+    return mapping
+
+
+def iter_csv(path: str, plate_a: str = "", plate_b: str = ""):
+    """Stream the events of a CSV catalog with one mechanism per row.
+
+    Column names are matched case-insensitively against ``CSV_COLUMNS``;
+    each row needs the first nodal plane or the six tensor components
+    ``mrr … mtp``, the second plane is optional.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        columns = _column_map(reader.fieldnames or [])
+        mechanism = ("strike1", "dip1", "rake1")
+        if all(key in columns for key in TENSOR_KEYS) and not all(k in columns for k in mechanism):
+            mechanism = ()
+        missing = [key for key in ("latitude", "longitude", "depth", *mechanism)
+                   if key not in columns]
+        if missing:
+            raise ValueError(f"{path}: faltan las columnas {', '.join(missing)}")
+
+        def get(row, key, cast=float):
+            value = row.get(columns.get(key, ""), "")
+            value = value.strip() if value else ""
+            return cast(value) if value else None
+
+        for number, row in enumerate(reader, start=1):
+            try:
+                planes = [(get(row, f"strike{n}"), get(row, f"dip{n}"), get(row, f"rake{n}"))
+                          for n in (1, 2)]
+                planes = [plane for plane in planes if None not in plane]
+                tensor = [get(row, key) for key in TENSOR_KEYS]
+                tensor = tensor if None not in tensor else None
+                if not planes and tensor is None:
+                    continue
+                event = make_event(
+                    event_id=get(row, "id", str) or f"{os.path.basename(path)}-{number}",
+                    title=get(row, "title", str),
+                    datetime=(get(row, "datetime", str) or "")[:19].replace("T", " "),
+                    latitude=get(row, "latitude"),
+                    longitude=get(row, "longitude"),
+                    depth=get(row, "depth"),
+                    magnitude=get(row, "magnitude"),
+                    planes=planes,
+                    plate_a=get(row, "plate_a", str) or plate_a,
+                    plate_b=get(row, "plate_b", str) or plate_b,
+                    tensor=tensor,
+                )
+            except ValueError as exc:
+                logger.warning("%s:%d: %s, se omite la fila", path, reader.line_num, exc)
+                continue
+            yield event
+
+
+def _leading_numbers(tokens: list) -> list:
+    numbers = []
+    for token in tokens:
+        try:
+            numbers.append(float(token))
+        except ValueError:
+            break
+    return numbers
+
+
+def iter_psmeca(path: str, plate_a: str = "", plate_b: str = "", layout: str = "a"):
+    """Stream a GMT psmeca / GCMT-style text catalog.
+
+    ``layout`` is the psmeca convention of the file, as in its ``-S``
+    option: ``"a"`` (lon lat depth strike dip rake mag [plon plat]
+    [title]), ``"m"`` (lon lat depth mrr mtt mpp mrt mrp mtp exponent
+    [plon plat] [title]) or ``"c"`` (lon lat depth strike1 dip1 rake1
+    strike2 dip2 rake2 mantissa exponent [plon plat] [title]).  Scalar
+    moments in dyn·cm are converted to Mw.  Lines with too few numbers or
+    invalid values are logged and skipped.
+    """
+    if layout not in PSMECA_LAYOUTS:
+        raise ValueError(f"Formato psmeca desconocido: {layout!r} ({', '.join(PSMECA_LAYOUTS)})")
+    need = PSMECA_LAYOUTS[layout]
+    warned = False
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            tokens = line.split()
+            if not tokens or tokens[0].startswith(("#", ">")):
+                continue
+            values = _leading_numbers(tokens)
+            if len(values) < need:
+                logger.warning("%s:%d: línea psmeca -S%s incompleta (%d de %d números), se omite",
+                               path, number, layout, len(values), need)
+                continue
+            if len(values) > need + 2 and not warned:
+                logger.warning("%s:%d: %d números en una línea -S%s; revise el formato psmeca",
+                               path, number, len(values), layout)
+                warned = True
+            title_at = need + 2 if len(values) >= need + 2 else need
+            title = " ".join(tokens[title_at:])
+            tensor, planes = None, []
+            try:
+                if layout == "m":
+                    lon, lat, depth, *tensor, exponent = values[:need]
+                    # Momento escalar: norma de Frobenius del tensor / √2
+                    moment = math.sqrt((sum(c * c for c in tensor[:3])
+                                        + 2 * sum(c * c for c in tensor[3:])) / 2) * 10 ** exponent
+                    magnitude = round(2 / 3 * math.log10(moment) - 10.7, 2)
+                elif layout == "c":
+                    lon, lat, depth, s1, d1, r1, s2, d2, r2, mantissa, exponent = values[:need]
+                    planes = [(s1, d1, r1), (s2, d2, r2)]
+                    magnitude = round(2 / 3 * math.log10(mantissa * 10 ** exponent) - 10.7, 2)
+                else:
+                    lon, lat, depth, s1, d1, r1, magnitude = values[:need]
+                    planes = [(s1, d1, r1)]
+                event = make_event(
+                    event_id=title or f"{os.path.basename(path)}-{number}",
+                    title=title,
+                    datetime="",
+                    latitude=lat,
+                    longitude=lon,
+                    depth=depth,
+                    magnitude=magnitude,
+                    planes=planes,
+                    plate_a=plate_a,
+                    plate_b=plate_b,
+                    tensor=tensor,
+                )
+            except ValueError as exc:
+                logger.warning("%s:%d: %s, se omite la línea", path, number, exc)
+                continue
+            yield event
+
+
+def unique_ids(events):
+    """Append ``-2``, ``-3``, ... to repeated event ids, with a warning, so
+    that outputs named after the id do not overwrite each other."""
+    seen = set()
+    for event in events:
+        event_id, copy = event["id"], 1
+        while event["id"] in seen:
+            copy += 1
+            event["id"] = f"{event_id}-{copy}"
+        if copy > 1:
+            logger.warning("Id de evento repetido %s: se usa %s", event_id, event["id"])
+        seen.add(event["id"])
+        yield event
+
+
+def detect_format(path: str) -> str:
+    """Catalog format from the file extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xml", ".quakeml", ".qml"):
+        return "quakeml"
+    if ext == ".csv":
+        return "csv"
+    return "psmeca"
+
+
+def iter_catalog(path: str, fmt: str = "auto", plate_a: str = "", plate_b: str = "",
+                 psmeca_layout: str = "a"):
+    """Stream the events of a catalog file of format ``fmt`` (or detected).
+
+    ``psmeca_layout`` is the ``-S`` convention of psmeca files (see
+    :func:`iter_psmeca`).  Event ids are unique within the catalog.
+    """
+    fmt = detect_format(path) if fmt == "auto" else fmt
+    if fmt == "psmeca":
+        return unique_ids(iter_psmeca(path, plate_a, plate_b, psmeca_layout))
+    readers = {"quakeml": iter_quakeml, "csv": iter_csv}
+    if fmt not in readers:
+        raise ValueError(f"Formato de catálogo desconocido: {fmt!r} ({', '.join(FORMATS)})")
+    return unique_ids(readers[fmt](path, plate_a, plate_b))
+
+
+def main() -> None:
+    """Split a catalog into one event JSON per mechanism."""
+    parser = argparse.ArgumentParser(description="Convert a catalog into igballs event JSON files")
+    parser.add_argument("catalog", help="QuakeML, CSV or psmeca catalog")
+    parser.add_argument("out_dir", help="Directory for the event JSON files")
+    parser.add_argument("--format", default="auto", choices=["auto", *FORMATS],
+                        help="Catalog format (auto: from the extension)")
+    parser.add_argument("--psmeca-layout", default="a", choices=[*PSMECA_LAYOUTS],
+                        help="Columns of a psmeca file, as its -S option (default: a)")
+    parser.add_argument("--plates", nargs=2, default=("", ""), metavar=("PLATE_A", "PLATE_B"),
+                        help="Plate labels for the two blocks")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(message)s")
+    os.makedirs(args.out_dir, exist_ok=True)
+    count = 0
+    for event in iter_catalog(args.catalog, args.format, *args.plates, args.psmeca_layout):
+        with open(os.path.join(args.out_dir, f"{event['id']}.json"), "w", encoding="utf-8") as f:
+            json.dump(event, f, indent=4, ensure_ascii=False)
+        count += 1
+    logger.info("%d eventos escritos en %s", count, args.out_dir)
+
+
+if __name__ == "__main__":
+    main()
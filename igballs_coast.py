@@ -0,0 +1,474 @@
+"""Coastline layer: load, clip and simplify polylines for the 3D scene."""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Aproximación esférica: 1° de latitud ≈ 111.19 km
+KM_PER_DEGREE = 111.19
+
+
+def load_coastline_csv(csv_path: str) -> np.ndarray:
+    """Read a coastline CSV with ``latitud``/``longitud`` columns.
+
+    Returns an ``(N, 2)`` array of ``[lat, lon]`` rows where rows of NaN
+    separate the segments, as in the source file.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, usecols=["latitud", "longitud"])
+    return df.to_numpy(dtype=float)
+
+
+def split_segments(points: np.ndarray, keep: np.ndarray = None) -> list:
+    """Split a NaN-separated polyline array into a list of segments.
+
+    Only the runs of rows where ``keep`` is true are returned (by default
+    the rows that are not NaN); runs shorter than two points are dropped
+    because they cannot be drawn as lines.
+    """
+    if keep is None:
+        keep = ~np.isnan(points).any(axis=1)
+    change = np.flatnonzero(np.diff(np.concatenate([[0], keep.view(np.int8), [0]])))
+    starts, stops = change[0::2], change[1::2]
+    return [points[a:b] for a, b in zip(starts, stops) if b - a >= 2]
+
+
+def view_box(latitude: float, longitude: float, window: float) -> tuple:
+    """Return ``(lat_min, lat_max, lon_min, lon_max)`` of ± ``window`` degrees."""
+    return latitude - window, latitude + window, longitude - window, longitude + window
+
+
+def clip_points(points: np.ndarray, box: tuple) -> list:
+    """Clip a NaN-separated polyline array to a lat/lon box.
+
+    Points inside the box are kept together with their immediate neighbours,
+    so the lines reach the edge of the box instead of stopping short of it.
+    Returns the list of clipped segments.
+    """
+    lat_min, lat_max, lon_min, lon_max = box
+    lat, lon = points[:, 0], points[:, 1]
+    with np.errstate(invalid="ignore"):
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    keep = inside.copy()
+    keep[1:] |= inside[:-1]
+    keep[:-1] |= inside[1:]
+    keep &= ~np.isnan(points).any(axis=1)
+    return split_segments(points, keep)
+
+
+def simplify_line(points: np.ndarray, tolerance: float) -> np.ndarray:
+    """Douglas-Peucker simplification of one segment (tolerance in degrees)."""
+    if tolerance <= 0 or len(points) < 3:
+        return points
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        chord = points[last] - points[first]
+        rel = points[first + 1:last] - points[first]
+        norm = np.hypot(chord[0], chord[1])
+        if norm == 0:
+            dist = np.hypot(rel[:, 0], rel[:, 1])
+        else:
+            dist = np.abs(chord[0]*rel[:, 1] - chord[1]*rel[:, 0]) / norm
+        idx = int(np.argmax(dist))
+        if dist[idx] > tolerance:
+            mid = first + 1 + idx
+            keep[mid] = True
+            stack.append((first, mid))
+            stack.append((mid, last))
+    return points[keep]
+
+
+# ---------------------------------------------------------------------------
+#  Tiled index on disk
+# ---------------------------------------------------------------------------
+#
+# An index is a directory with ``index.json`` (metadata) and raw little-endian
+# arrays that are opened with ``np.memmap``:
+#
+#   points.f4         float32 (N, 2)  lat, lon of every point
+#   segments.i8       int64   (S, 2)  start, stop of each segment in points
+#   bbox.f4           float32 (S, 4)  lat_min, lat_max, lon_min, lon_max
+#   tile_keys.i8      int64   (T,)    sorted keys of the non-empty tiles
+#   tile_ranges.i8    int64   (T, 2)  start, stop of each tile in tile_segments
+#   tile_segments.i4  int32   (K,)    segment ids, grouped by tile
+#
+# Segments are cut into chunks of at most ``max_points`` points so that their
+# bounding boxes, and therefore the tiles they are listed in, stay small.
+
+INDEX_VERSION = 1
+
+_INDEX_ARRAYS = {
+    "points": ("points.f4", "<f4", 2),
+    "segments": ("segments.i8", "<i8", 2),
+    "bbox": ("bbox.f4", "<f4", 4),
+    "tile_keys": ("tile_keys.i8", "<i8", None),
+    "tile_ranges": ("tile_ranges.i8", "<i8", 2),
+    "tile_segments": ("tile_segments.i4", "<i4", None),
+}
+
+
+def _tile_rows_cols(tile_deg: float) -> tuple:
+    return int(np.ceil(180 / tile_deg)), int(np.ceil(360 / tile_deg))
+
+
+def _tile_index(lat, lon, tile_deg: float) -> tuple:
+    rows, cols = _tile_rows_cols(tile_deg)
+    row = np.clip(np.floor((np.asarray(lat) + 90) / tile_deg).astype(np.int64), 0, rows - 1)
+    col = np.clip(np.floor((np.asarray(lon) + 180) / tile_deg).astype(np.int64), 0, cols - 1)
+    return row, col
+
+
+def _chunks(segment: np.ndarray, max_points: int):
+    """Cut a segment in chunks that share their end points."""
+    step = max_points - 1
+    for start in range(0, max(len(segment) - 1, 1), step):
+        yield segment[start:start + max_points]
+
+
+def write_index(segments, out_dir: str, kind: str = "coastline",
+                tile_deg: float = 1.0, max_points: int = 256) -> dict:
+    """Write polylines to a tiled index directory and return its metadata.
+
+    ``segments`` is any iterable of ``(n, 2)`` lat/lon arrays; it is consumed
+    once and the points are streamed to disk, so it can be a generator over
+    a file larger than memory.  ``max_points`` must be at least 2, since
+    consecutive chunks share an end point.
+    """
+    if max_points < 2:
+        raise ValueError(f"max_points debe ser al menos 2 (recibido {max_points})")
+    os.makedirs(out_dir, exist_ok=True)
+    starts, stops, boxes = [], [], []
+    n_points = 0
+    with open(os.path.join(out_dir, "points.f4"), "wb") as f:
+        for segment in segments:
+            segment = np.asarray(segment, dtype=float)
+            for chunk in _chunks(segment, max_points):
+                if len(chunk) < 2:
+                    continue
+                f.write(np.ascontiguousarray(chunk, dtype="<f4").tobytes())
+                starts.append(n_points)
+                n_points += len(chunk)
+                stops.append(n_points)
+                boxes.append((chunk[:, 0].min(), chunk[:, 0].max(),
+                              chunk[:, 1].min(), chunk[:, 1].max()))
+
+    seg_ranges = np.array([starts, stops], dtype="<i8").T.reshape(-1, 2)
+    bbox = np.array(boxes, dtype="<f4").reshape(-1, 4)
+
+    # Every segment is listed in each tile its bounding box overlaps
+    _, cols = _tile_rows_cols(tile_deg)
+    r0, c0 = _tile_index(bbox[:, 0], bbox[:, 2], tile_deg)
+    r1, c1 = _tile_index(bbox[:, 1], bbox[:, 3], tile_deg)
+    n_rows, n_cols = r1 - r0 + 1, c1 - c0 + 1
+    counts = n_rows * n_cols
+    seg_ids = np.repeat(np.arange(len(bbox)), counts)
+    local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = r0[seg_ids] + local // n_cols[seg_ids]
+    cols_ = c0[seg_ids] + local % n_cols[seg_ids]
+    keys = rows * cols + cols_
+
+    order = np.lexsort((seg_ids, keys))
+    keys, seg_ids = keys[order], seg_ids[order]
+    tile_keys, tile_starts, tile_counts = np.unique(keys, return_index=True, return_counts=True)
+    tile_ranges = np.stack([tile_starts, tile_starts + tile_counts], axis=1)
+
+    arrays = {
+        "segments": seg_ranges,
+        "bbox": bbox,
+        "tile_keys": tile_keys,
+        "tile_ranges": tile_ranges,
+        "tile_segments": seg_ids,
+    }
+    for name, data in arrays.items():
+        filename, dtype, _ = _INDEX_ARRAYS[name]
+        np.ascontiguousarray(data, dtype=dtype).tofile(os.path.join(out_dir, filename))
+
+    meta = {
+        "version": INDEX_VERSION,
+        "kind": kind,
+        "tile_deg": tile_deg,
+        "max_points": max_points,
+        "points": n_points,
+        "segments": len(bbox),
+        "tiles": len(tile_keys),
+        "tile_entries": len(seg_ids),
+    }
+    with open(os.path.join(out_dir, "index.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    logger.info("Índice %s: %d puntos, %d segmentos, %d teselas en %s",
+                kind, n_points, len(bbox), len(tile_keys), out_dir)
+    return meta
+
+
+def open_index(index_dir: str) -> dict:
+    """Open a tiled index with memory-mapped arrays.
+
+    The maps are cached per directory and per modification time and size of
+    ``index.json`` (written last by :func:`write_index`), so a long-running
+    process sees an index that was rebuilt in place.
+    """
+    stat = os.stat(os.path.join(index_dir, "index.json"))
+    return _open_index(os.path.abspath(index_dir), stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=8)
+def _open_index(index_dir: str, mtime_ns: int, size: int) -> dict:
+    with open(os.path.join(index_dir, "index.json")) as f:
+        meta = json.load(f)
+    if meta.get("version") != INDEX_VERSION:
+        raise ValueError(f"Versión de índice no soportada en {index_dir}: {meta.get('version')}")
+    index = {"meta": meta}
+    lengths = {"points": meta["points"], "segments": meta["segments"], "bbox": meta["segments"],
+               "tile_keys": meta["tiles"], "tile_ranges": meta["tiles"],
+               "tile_segments": meta["tile_entries"]}
+    for name, (filename, dtype, width) in _INDEX_ARRAYS.items():
+        shape = (lengths[name],) if width is None else (lengths[name], width)
+        if lengths[name] == 0:
+            index[name] = np.zeros(shape, dtype=dtype)
+        else:
+            index[name] = np.memmap(os.path.join(index_dir, filename), dtype=dtype,
+                                    mode="r", shape=shape)
+    return index
+
+
+def query_index(index_dir: str, box: tuple) -> list:
+    """Segments of an index whose bounding box intersects ``box``.
+
+    Only the tiles overlapping ``box`` are read, so the cost depends on the
+    area shown and not on the size of the dataset.  Consecutive chunks of a
+    segment that are both in view are joined again, so lines do not break
+    at tile edges.  Returns a list of ``(n, 2)`` float64 lat/lon arrays.
+    """
+    index = open_index(index_dir)
+    tile_deg = index["meta"]["tile_deg"]
+    lat_min, lat_max, lon_min, lon_max = box
+    (r0, r1), (c0, c1) = _tile_index([lat_min, lat_max], [lon_min, lon_max], tile_deg)
+    _, cols = _tile_rows_cols(tile_deg)
+    rows, cols_ = np.meshgrid(np.arange(r0, r1 + 1), np.arange(c0, c1 + 1), indexing="ij")
+    keys = (rows * cols + cols_).ravel()
+
+    tile_keys = index["tile_keys"]
+    if len(tile_keys) == 0:
+        return []
+    pos = np.minimum(np.searchsorted(tile_keys, keys), len(tile_keys) - 1)
+    pos = pos[np.asarray(tile_keys[pos]) == keys]
+    ranges = np.asarray(index["tile_ranges"][pos])
+    if len(ranges) == 0:
+        return []
+    ids = np.unique(np.concatenate([index["tile_segments"][a:b] for a, b in ranges]))
+
+    bbox = np.asarray(index["bbox"][ids])
+    hit = ((bbox[:, 1] >= lat_min) & (bbox[:, 0] <= lat_max)
+           & (bbox[:, 3] >= lon_min) & (bbox[:, 2] <= lon_max))
+    points = index["points"]
+    return _join_chunks([np.asarray(points[a:b], dtype=float)
+                         for a, b in index["segments"][ids[hit]]])
+
+
+def _join_chunks(pieces: list) -> list:
+    """Merge consecutive pieces where one ends at the point the next starts."""
+    joined = []
+    for piece in pieces:
+        if joined and np.array_equal(joined[-1][-1][-1], piece[0]):
+            joined[-1].append(piece[1:])
+        else:
+            joined.append([piece])
+    return [np.concatenate(parts) for parts in joined]
+
+
+def load_coastline(path: str, latitude: float, longitude: float,
+                   window: float = 1.0, tolerance: float = 0.0) -> list:
+    """Segments of a polyline dataset around the event, clipped and simplified.
+
+    ``path`` is either a CSV file or a tiled index directory built with
+    :func:`write_index`; with an index only the tiles in view are read.
+    """
+    box = view_box(latitude, longitude, window)
+    if os.path.isdir(path):
+        segments = query_index(path, box)
+        gap = np.full((1, 2), np.nan)
+        points = np.concatenate([part for seg in segments for part in (seg, gap)] or [gap])
+    else:
+        points = load_coastline_csv(path)
+    segments = clip_points(points, box)
+    segments = [simplify_line(seg, tolerance) for seg in segments]
+    logger.info("Líneas: %d segmentos, %d puntos de %s",
+                len(segments), sum(len(seg) for seg in segments), path)
+    return segments
+
+
+def geo_to_scene(lat, lon, latitude: float, longitude: float, origin) -> tuple:
+    """Map lat/lon to scene x (este) / y (norte) in km around the event.
+
+    The event at ``(latitude, longitude)`` lands on ``origin[:2]``, the
+    position used for it by ``igballs_fault.create_figure``.
+    """
+    x = origin[0] + (np.asarray(lon) - longitude) * KM_PER_DEGREE * np.cos(np.radians(latitude))
+    y = origin[1] + (np.asarray(lat) - latitude) * KM_PER_DEGREE
+    return x, y
+
+
+def with_gaps(values) -> np.ndarray:
+    """Object array with ``None`` in place of NaN, the gap marker of Plotly lines.
+
+    An object ndarray is handed to Plotly as-is, instead of being validated
+    element by element like a list.
+    """
+    values = np.asarray(values, dtype=float)
+    out = values.astype(object)
+    out[np.isnan(values)] = None
+    return out
+
+
+def join_segments(segments: list, xy) -> tuple:
+    """Concatenate segments into x/y arrays with ``None`` separators.
+
+    ``xy`` maps an ``(n, 2)`` lat/lon array to its ``(x, y)`` arrays; it is
+    applied once to all the segments joined with NaN rows.
+    """
+    if not segments:
+        return with_gaps([]), with_gaps([])
+    gap = np.full((1, 2), np.nan)
+    flat = np.concatenate([part for seg in segments for part in (gap, seg)][1:])
+    x, y = xy(flat)
+    return with_gaps(x), with_gaps(y)
+
+
+def create_coastline_trace(segments: list, latitude: float, longitude: float,
+                           origin, z: float, color: str = "black",
+                           width: float = 4, name: str = "Coastline"):
+    """Single ``Scatter3d`` with all the segments, drawn in the plane ``z``."""
+    import plotly.graph_objects as go
+
+    x, y = join_segments(
+        segments, lambda seg: geo_to_scene(seg[:, 0], seg[:, 1], latitude, longitude, origin))
+    return go.Scatter3d(
+        x=x, y=y, z=np.where(np.equal(x, None), None, z),
+        mode="lines",
+        line=dict(color=color, width=width),
+        hoverinfo="none",
+        name=name,
+    )
+
+
+# ---------------------------------------------------------------------------
+#  GML3 import
+# ---------------------------------------------------------------------------
+
+# Geometrías cuyas coordenadas se entregan con elementos <gml:pos> sueltos
+_GML_LINES = {"LineString", "LinearRing", "LineStringSegment"}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _is_lat_lon(srs_name: str) -> bool:
+    """True for the URN/URI forms of EPSG:4326, which use lat/lon axis order."""
+    srs = (srs_name or "").lower()
+    return srs.endswith("4326") and ("urn:" in srs or "opengis.net/def" in srs)
+
+
+def iter_gml_segments(gml_path: str, axis_order: str = "auto"):
+    """Stream the line geometries of a GML3 file as ``(n, 2)`` lat/lon arrays.
+
+    The file is read with incremental XML parsing and every element is
+    cleared once it has been used, so memory stays constant whatever the
+    size of the file.  ``posList``, GML2 ``coordinates`` and sequences of
+    ``pos`` are supported.  ``axis_order`` is ``"latlon"``, ``"lonlat"`` or
+    ``"auto"``, which follows the ``srsName`` of the geometry (the URN form
+    of EPSG:4326 used by marineregions is lat/lon).
+    """
+    srs_stack = [None]
+    dim_stack = [2]
+    name_stack = []
+    pos_buffer = []
+    depth = 0
+    root = None
+
+    def to_lat_lon(values, dim):
+        pairs = values[: len(values) // dim * dim].reshape(-1, dim)[:, :2]
+        lat_lon = axis_order == "latlon" or (axis_order == "auto" and _is_lat_lon(srs_stack[-1]))
+        return pairs if lat_lon else pairs[:, ::-1]
+
+    for event, elem in ET.iterparse(gml_path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            srs_stack.append(elem.get("srsName") or srs_stack[-1])
+            dim_stack.append(int(elem.get("srsDimension") or dim_stack[-1]))
+            name_stack.append(_local_name(elem.tag))
+            continue
+
+        depth -= 1
+        name = name_stack.pop()
+        parent = name_stack[-1] if name_stack else None
+        dim = dim_stack[-1]
+        segment = None
+        if name == "posList" and elem.text:
+            segment = to_lat_lon(np.array(elem.text.split(), dtype=float), dim)
+        elif name == "coordinates" and elem.text:
+            cs = elem.get("cs", ",")
+            values = elem.text.replace(cs, " ").split()
+            segment = to_lat_lon(np.array(values, dtype=float), 2)
+        elif name == "pos" and elem.text and parent in _GML_LINES:
+            # Solo los pos de la línea en curso (no los de un Point)
+            pos_buffer.append(np.array(elem.text.split(), dtype=float)[:dim])
+        elif name in _GML_LINES:
+            if pos_buffer:
+                segment = to_lat_lon(np.concatenate(pos_buffer), dim)
+            pos_buffer = []
+
+        srs_stack.pop()
+        dim_stack.pop()
+        if segment is not None and len(segment) >= 2:
+            yield segment
+
+        elem.clear()
+        if depth == 1 and root is not None:
+            root.clear()      # features ya procesados: libera sus nodos
+
+
+def main() -> None:
+    """Build a tiled index from a polyline CSV or GML3 file."""
+    parser = argparse.ArgumentParser(
+        description="Build the tiled index of a coastline or plate-boundary dataset",
+    )
+    parser.add_argument("source", help="CSV with latitud/longitud columns, or GML3 file (.gml/.xml)")
+    parser.add_argument("out_dir", help="Directory for the index")
+    parser.add_argument("--kind", default="coastline", help="Dataset kind (coastline, boundaries)")
+    parser.add_argument("--tile", type=float, default=1.0, help="Tile size in degrees")
+    parser.add_argument("--max-points", type=int, default=256, help="Maximum points per indexed segment")
+    parser.add_argument("--axis-order", default="auto", choices=["auto", "latlon", "lonlat"],
+                        help="GML axis order (auto: from srsName)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    args = parser.parse_args()
+
+    if args.max_points < 2:
+        parser.error("--max-points must be at least 2")
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(message)s")
+    if args.source.lower().endswith((".gml", ".xml")):
+        segments = iter_gml_segments(args.source, args.axis_order)
+    else:
+        segments = split_segments(load_coastline_csv(args.source))
+    meta = write_index(segments, args.out_dir, args.kind, args.tile, args.max_points)
+    print(json.dumps(meta, indent=2))
+
+
+if __name__ == "__main__":
+    main()
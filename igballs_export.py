@@ -0,0 +1,314 @@
+"""Export igballs figures to HTML in a single streaming pass."""
+
+import functools
+import hashlib
+import logging
+import os
+import base64
+import sys
+
+import numpy as np
+import plotly.io as pio
+import plotly.offline
+
+logger = logging.getLogger(__name__)
+
+# Pantalla completa y botones grandes para teléfonos
+MOBILE_STYLE = """
+        <style>
+        html, body {
+            margin: 0;
+            padding: 0;
+            height: 100%;
+            width: 100%;
+            overflow: hidden;
+        }
+
+    .plotly-graph-div {
+        height: 100% !important;
+        width: 100% !important;
+        position: absolute !important;
+        top: 0;
+        left: 0;
+    }
+
+        .modebar-btn {
+            transform: scale(1.8);
+            margin: 8px;
+        }
+        </style>
+        """
+
+HTML_HEAD = """<!doctype html>
+<html>
+<head>{style}
+    <meta charset="utf-8" />
+    <style>html, body {{height: 100%;}}</style>{head}
+</head>
+<body>
+    """
+
+HTML_TAIL = """
+</body>
+</html>"""
+
+PLOTLY_CONFIG = {"responsive": True}
+
+# Animación en el navegador (FaultScene con animation="client"): traslada los
+# bloques a lo largo del slip con Plotly.restyle a partir de layout.meta.
+# Plotly sustituye {plot_id} por el id del <div> de la figura.  Con compact,
+# gd.data conserva los {dtype, bdata} de typed_array: se decodifican aquí.
+CLIENT_ANIMATION_JS = """
+var gd = document.getElementById("{plot_id}");
+var spec = gd.layout.meta.igballs_animation;
+var TYPED = {f4: Float32Array, f8: Float64Array, i1: Int8Array, i2: Int16Array,
+             i4: Int32Array, u1: Uint8Array, u2: Uint16Array, u4: Uint32Array};
+
+function values(v) {
+    if (v && v.bdata !== undefined) {
+        var bytes = Uint8Array.from(atob(v.bdata), function (c) { return c.charCodeAt(0); });
+        v = new TYPED[v.dtype](bytes.buffer);
+    }
+    return Array.from(v);
+}
+
+var base = spec.traces.map(function (t) {
+    return ["x", "y", "z"].map(function (axis) { return values(gd.data[t][axis]); });
+});
+var step = 0, timer = null;
+
+function draw(n) {
+    var update = {x: [], y: [], z: []};
+    base.forEach(function (xyz, b) {
+        var shift = spec.signs[b] * n * spec.speed;
+        ["x", "y", "z"].forEach(function (axis, a) {
+            var d = shift * spec.slip[a];
+            update[axis].push(xyz[a].map(function (v) { return v + d; }));
+        });
+    });
+    return Plotly.restyle(gd, update, spec.traces);
+}
+
+function pause() {
+    if (timer !== null) { clearTimeout(timer); timer = null; }
+}
+
+function tick() {
+    draw(step).then(function () {
+        if (timer === null) return;
+        if (step >= spec.steps - 1) { timer = null; return; }
+        step += 1;
+        timer = setTimeout(tick, spec.duration);
+    });
+}
+
+gd.on("plotly_buttonclicked", function (event) {
+    var action = event.button.name;
+    if (action === "play" && timer === null) {
+        if (step >= spec.steps - 1) step = 0;
+        timer = setTimeout(tick, 0);
+    } else if (action === "pause") {
+        pause();
+    }
+});
+"""
+
+# Claves de trazas con un valor por vértice o por celda, y las de índices de caras
+ARRAY_KEYS = {"x", "y", "z", "u", "v", "w", "intensity", "surfacecolor", "i", "j", "k"}
+INDEX_KEYS = {"i", "j", "k"}
+
+
+@functools.lru_cache(maxsize=1)
+def _plotlyjs() -> tuple:
+    """plotly.js bundled with the installed Plotly and its short hash."""
+    js = plotly.offline.get_plotlyjs().encode("utf-8")
+    return js, hashlib.sha256(js).hexdigest()[:12]
+
+
+def write_plotlyjs_asset(asset_dir: str) -> str:
+    """Write plotly.js into ``asset_dir`` unless it is there and return the path.
+
+    The file name carries a hash of its content (``plotly-<hash>.min.js``),
+    so browsers can cache it indefinitely and a Plotly upgrade gets a new
+    name.  The file is checked on every call, so one deleted or truncated
+    during a long run is written again.
+    """
+    js, digest = _plotlyjs()
+    path = os.path.join(asset_dir, f"plotly-{digest}.min.js")
+    try:
+        present = os.path.getsize(path) == len(js)
+    except FileNotFoundError:
+        present = False
+    if not present:
+        os.makedirs(asset_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(js)
+        os.replace(tmp_path, path)
+        logger.info("plotly.js escrito en %s", path)
+    return path
+
+
+def plotlyjs_options(mode: str, html_path: str = None, asset_dir: str = None) -> dict:
+    """Keyword arguments of :func:`iter_html` for a plotly.js ``mode``.
+
+    ``"cdn"`` and ``"inline"`` are passed to Plotly.  ``"shared"`` writes
+    plotly.js into ``asset_dir`` (default: ``assets/`` next to the page) and
+    points the page to it by a path relative to ``html_path``, so the pages
+    work offline and share one cached copy.
+    """
+    if mode in ("cdn", "inline"):
+        return {"include_plotlyjs": mode if mode == "cdn" else True}
+    if mode != "shared":
+        raise ValueError(f"Modo de plotly.js desconocido: {mode!r} (cdn, inline o shared)")
+
+    page_dir = os.path.dirname(os.path.abspath(html_path)) if html_path else os.getcwd()
+    asset_dir = asset_dir or os.path.join(page_dir, "assets")
+    asset = write_plotlyjs_asset(os.path.abspath(asset_dir))
+    src = os.path.relpath(asset, page_dir).replace(os.sep, "/")
+    return {
+        "include_plotlyjs": False,
+        "head": f'\n    <script charset="utf-8" src="{src}"></script>',
+    }
+
+
+def typed_array(values: np.ndarray) -> dict:
+    """Plotly base64 typed-array spec of a NumPy array (decoded natively by plotly.js)."""
+    values = np.ascontiguousarray(values)
+    spec = {"dtype": values.dtype.str.lstrip("<>|="),
+            "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+    if values.ndim > 1:
+        spec["shape"] = ",".join(str(n) for n in values.shape)
+    return spec
+
+
+def decode_typed_array(spec: dict) -> np.ndarray:
+    """NumPy array of a Plotly base64 typed-array spec."""
+    array = np.frombuffer(base64.b64decode(spec["bdata"]), dtype=np.dtype(spec["dtype"]))
+    if spec.get("shape"):
+        array = array.reshape([int(n) for n in str(spec["shape"]).split(",")])
+    return array
+
+
+def compact_array(values, index: bool = False):
+    """Smallest exact-enough typed array for a trace array, or ``values`` as-is.
+
+    Face indices become the smallest unsigned integer type, integer values
+    in 0–255 (the polarity colours) ``uint8`` and other numbers ``float32``;
+    gaps (``None``) become NaN, which plotly.js also draws as a gap.
+    Non-numeric arrays are left untouched.
+    """
+    if isinstance(values, dict):
+        if "bdata" not in values:
+            return values
+        array = decode_typed_array(values)
+    else:
+        array = np.asarray(values)
+        if array.dtype == object:
+            try:
+                array = array.astype(float)
+            except (TypeError, ValueError):
+                return values
+    if array.size == 0 or array.dtype.kind not in "biuf":
+        return values
+    if index or array.dtype.kind in "biu" or np.array_equal(array, np.round(array)):
+        low, high = array.min(), array.max()
+        if index or low >= 0:
+            for dtype in (np.uint8, np.uint16, np.uint32):
+                if high <= np.iinfo(dtype).max:
+                    return typed_array(array.astype(dtype))
+    return typed_array(array.astype(np.float32))
+
+
+def compact_traces(traces: list) -> None:
+    """Replace the arrays of trace dicts in place by compact typed arrays."""
+    for trace in traces:
+        for key in ARRAY_KEYS.intersection(trace):
+            trace[key] = compact_array(trace[key], index=key in INDEX_KEYS)
+
+
+def compact_figure(fig) -> dict:
+    """Figure dict whose geometry is float32 and polarity/indices small integers.
+
+    The arrays of the traces and of every frame are embedded as base64
+    typed arrays, which plotly.js decodes without parsing JSON numbers.
+    """
+    data = fig.to_plotly_json() if hasattr(fig, "to_plotly_json") else dict(fig)
+    compact_traces(data.get("data", []))
+    for frame in data.get("frames", []):
+        compact_traces(frame.get("data", []))
+    return data
+
+
+def has_client_animation(fig) -> bool:
+    """Whether ``fig`` (figure or dict) animates its blocks in the browser."""
+    if isinstance(fig, dict):
+        meta = fig.get("layout", {}).get("meta")
+    else:
+        meta = fig.layout.meta
+    return isinstance(meta, dict) and "igballs_animation" in meta
+
+
+def iter_html(fig, include_plotlyjs="cdn", config=None, head: str = "", compact: bool = False):
+    """Yield the chunks of the full HTML page of ``fig``.
+
+    The page is the template above with the mobile style already in
+    ``<head>``; the figure itself is rendered once as a ``<div>`` by Plotly.
+    ``head`` is extra markup for ``<head>`` (e.g. script tags).  With
+    ``compact`` the arrays are embedded as float32/uint8 typed arrays (see
+    :func:`compact_figure`).  Figures with a client-side animation get
+    :data:`CLIENT_ANIMATION_JS` as post-script.
+    """
+    yield HTML_HEAD.format(style=MOBILE_STYLE, head=head)
+    if compact:
+        fig = compact_figure(fig)
+    yield pio.to_html(
+        fig,
+        validate=not compact,
+        include_plotlyjs=include_plotlyjs,
+        full_html=False,
+        config=PLOTLY_CONFIG if config is None else config,
+        post_script=CLIENT_ANIMATION_JS if has_client_animation(fig) else None,
+    )
+    yield HTML_TAIL
+
+
+def render_html(fig, **kwargs) -> str:
+    """Full HTML page of ``fig`` as a string (see :func:`iter_html`)."""
+    return "".join(iter_html(fig, **kwargs))
+
+
+def render_html_bytes(fig, **kwargs) -> bytes:
+    """Full HTML page of ``fig`` as UTF-8 bytes, e.g. to serve it directly."""
+    return render_html(fig, **kwargs).encode("utf-8")
+
+
+def write_html(fig, target, plotlyjs: str = "cdn", asset_dir: str = None, **kwargs) -> None:
+    """Write the HTML page of ``fig`` to a path, ``"-"`` (stdout) or a file object.
+
+    Paths are written to a temporary file in the same directory which is then
+    renamed over ``target``, so readers never see a partial page.
+    ``plotlyjs`` and ``asset_dir`` select how plotly.js is loaded (see
+    :func:`plotlyjs_options`).
+    """
+    html_path = None if target == "-" or hasattr(target, "write") else target
+    kwargs = {**plotlyjs_options(plotlyjs, html_path, asset_dir), **kwargs}
+    if target == "-":
+        target = sys.stdout
+    if hasattr(target, "write"):
+        for chunk in iter_html(fig, **kwargs):
+            target.write(chunk)
+        target.flush()
+        return
+
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in iter_html(fig, **kwargs):
+                f.write(chunk)
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.debug("HTML escrito en %s", target)
@@ -1,54 +1,154 @@
+import contextlib
+
 import numpy as np
 import plotly.graph_objects as go
 import igballs_balls 
-
-import pandas as pd
-import plotly.graph_objects as go
+import igballs_coast
+import igballs_mechanism
 
 def add_coastlines_from_csv(fig, csv_path):
     """
     Agrega líneas costeras desde un archivo CSV (latitud, longitud) a la figura 3D.
 
+    Todos los segmentos se dibujan en una sola traza, separados por None.
+
     Args:
         fig: objeto plotly.graph_objects.Figure
         csv_path: ruta al archivo CSV con columnas latitud, longitud
     """
     try:
-        df = pd.read_csv(csv_path)
-        if df.empty:
+        points = igballs_coast.load_coastline_csv(csv_path)
+        if len(points) == 0:
             print("El archivo CSV está vacío.")
             return
 
-        # Agrupar por NaNs para separar segmentos
-        mask = df['latitud'].isna()
-        segments = []
-        current = []
-
-        for i, row in df.iterrows():
-            if mask[i]:
-                if current:
-                    segments.append(current)
-                    current = []
-            else:
-                current.append((row['latitud'], row['longitud']))
-        if current:
-            segments.append(current)
-
-        # Dibujar segmentos
-        for segment in segments:
-            lats, lons = zip(*segment)
-            fig.add_trace(go.Scatter3d(
-                x=lons,
-                y=lats,
-                z=[0] * len(lats),  # z=0 para proyectar en superficie
-                mode='lines',
-                line=dict(color='black', width=4),
-                name='Coastline'
-            ))
+        segments = igballs_coast.split_segments(points)
+        lons, lats = igballs_coast.join_segments(segments, lambda seg: (seg[:, 1], seg[:, 0]))
+        fig.add_trace(go.Scatter3d(
+            x=lons,
+            y=lats,
+            z=np.where(np.equal(lats, None), None, 0),  # z=0 para proyectar en superficie
+            mode='lines',
+            line=dict(color='black', width=4),
+            name='Coastline'
+        ))
 
     except Exception as e:
         print(f"Error al cargar el archivo de líneas costeras: {e}")
 
+# Caras (triángulos) de un bloque de 8 vértices
+BLOCK_FACES = np.array([
+    [0, 1, 2], [0, 2, 3],
+    [4, 5, 6], [4, 6, 7],
+    [0, 1, 5], [0, 5, 4],
+    [1, 2, 6], [1, 6, 5],
+    [2, 3, 7], [2, 7, 6],
+    [3, 0, 4], [3, 4, 7],
+])
+
+# Estilo de los bloques, en el orden de block_vertices()
+BLOCK_STYLES = [
+    dict(color="steelblue", opacity=0.6, name="block_east"),
+    dict(color="sandybrown", opacity=0.666, name="block_west"),
+    dict(color="peru", opacity=0.7, name="block_east_upper"),
+    dict(color="peru", opacity=0.7, name="block_west_upper"),
+]
+
+# Índices de los bloques en fig.data (van primero, antes de las trazas estáticas)
+BLOCK_TRACES = [0, 1, 2, 3]
+
+
+def block_templates(strike_vector, dip_vector, normal_proj, dip_proj, block_width, height):
+    """
+    Vértices de los cuatro bloques relativos a su esquina p1 (este) o q1 (oeste).
+
+    Devuelve un arreglo (4, 8, 3) en el orden este, oeste, este superior,
+    oeste superior.
+    """
+    ##BLOCK EAST
+    p1 = np.zeros(3)
+    p2 = p1 + strike_vector
+    p3 = p2 + dip_vector
+    p4 = p1 + dip_vector
+    aux = p2 - p3
+    p7 = np.array([p3[0]+aux[0], p3[1]+aux[1], p3[2]]) + normal_proj*block_width
+    p8 = np.array([p4[0]+aux[0], p4[1]+aux[1], p4[2]]) + normal_proj*block_width
+    p5 = p8 - dip_proj * height
+    p6 = p7 - dip_proj * height
+
+    ##BLOCK EAST UPPER
+    p1u = p1 - dip_vector/3
+    p2u = p2 - dip_vector/3
+    p5u = p5 - dip_proj*height/3
+    p6u = p6 - dip_proj*height/3
+
+    ##BLOCK WEST
+    q1 = np.zeros(3)
+    q2 = q1 + strike_vector
+    q3 = q2 + dip_vector
+    q4 = q1 + dip_vector
+    q7 = q3 - normal_proj*block_width
+    q8 = q4 - normal_proj*block_width
+    q5 = q8 - dip_proj*height
+    q6 = q7 - dip_proj*height
+
+    ##BLOCK WEST UPPER
+    q1u = q1 - dip_vector/3
+    q2u = q2 - dip_vector/3
+    q5u = q5 - dip_proj*height/3
+    q6u = q6 - dip_proj*height/3
+
+    return np.array([
+        [p1, p2, p3, p4, p5, p6, p7, p8],
+        [q1, q2, q3, q4, q5, q6, q7, q8],
+        [p1u, p2u, p2, p1, p5u, p6u, p6, p5],
+        [q1u, q2u, q2, q1, q5u, q6u, q6, q5],
+    ])
+
+
+def block_directions(move_block):
+    """
+    Sentido del desplazamiento de las esquinas p1 y q1 a lo largo del slip.
+
+    Con move_block "east" ambos bloques se separan, con "west" solo se mueve
+    el bloque oeste y con cualquier otro valor ninguno se mueve.
+    Devuelve: (p_sign, q_sign)
+    """
+    if move_block == "east":
+        return 1.0, -1.0
+    if move_block == "west":
+        return 0.0, -1.0
+    return 0.0, 0.0
+
+
+def block_offsets(steps, speed, move_block):
+    """
+    Desplazamiento a lo largo del slip de las esquinas p1 y q1 en cada paso.
+
+    Devuelve: (p_offset, q_offset), cada uno de tamaño steps
+    """
+    t = np.arange(steps) * speed
+    p_sign, q_sign = block_directions(move_block)
+    return p_sign * t, q_sign * t
+
+
+def block_vertices(anchor, slip_unit, strike_vector, dip_vector, normal_proj, dip_proj,
+                   block_width, height, steps, speed, move_block):
+    """
+    Vértices de los cuatro bloques en todos los pasos de la animación.
+
+    Los bloques solo se trasladan a lo largo del slip, así que cada paso es
+    la plantilla de block_templates() más el desplazamiento de su esquina.
+    Devuelve un arreglo (steps, 4, 8, 3).
+    """
+    template = block_templates(strike_vector, dip_vector, normal_proj, dip_proj,
+                               block_width, height)
+    p_offset, q_offset = block_offsets(steps, speed, move_block)
+    offsets = np.stack([p_offset, q_offset, p_offset, q_offset], axis=1)
+    corners = anchor + offsets[..., None] * slip_unit            # (steps, 4, 3)
+    return corners[:, :, None, :] + template[None]
+
+
 def crear_cruz_direcciones(latitude, longitude, depth, cross_shift=10, cross_lat=5, cross_lon=5):
     """
     Crea las líneas NS, EW y la flecha del norte para visualización 3D.
@@ -113,6 +213,540 @@ def crear_cruz_direcciones(latitude, longitude, depth, cross_shift=10, cross_lat
     plate_b: str,
     '''
 
+# Rosa de los vientos. Escalas en grados (aprox. 1° latitud ≈ 111 km)
+CROSS_LAT = 5  # ~5.5 km
+CROSS_LON = 5  # ~5.5 km en esta latitud
+CROSS_SHIFT = 10
+
+# Piezas de la escena y las claves de las que depende cada una. Además de los
+# parámetros de FaultScene, "location", "info", "strike", "dip", "rake" y
+# "tensor" se derivan del evento y del plano nodal elegido.  Los parámetros
+# strike, dip y rake (None: los del plano) reemplazan a los del plano y solo
+# llegan a las piezas a través de las claves derivadas.
+_PLANE_OVERRIDES = {"strike", "dip", "rake"}
+_BASIS = {"location", "strike", "dip", "block_width", "height"}
+_SLIP = {"strike", "dip", "rake"}
+_BLOCKS = _BASIS | _SLIP | {"steps", "speed", "move_block", "animation"}
+_BALL = {"radius", "resolution", "invert_colors", "ball_style", "subdivisions",
+         "refine_levels", "split_nodal"}
+
+
+class FaultScene:
+    """
+    Escena 3D de un evento con sus piezas guardadas por separado.
+
+    Cada pieza (vectores base, beachball, plano de falla, flechas, rosa de los
+    vientos, capas de mapa, bloques, cuadros y layout) se calcula la primera
+    vez que se necesita y se conserva hasta que cambia un parámetro del que
+    depende (ver PIECES).  strike, dip y rake reemplazan a los del plano
+    nodal elegido (None: los del evento).  Con update(rake=...) se
+    recalculan la beachball y los cuadros del deslizamiento pero no el plano
+    ni la rosa de los vientos; con update(eye_dict=...) solo el layout.  La
+    beachball de un evento con moment_tensor sigue siendo la del tensor.
+
+    Con animation="client" la figura no lleva cuadros: los bloques van una
+    sola vez y layout.meta["igballs_animation"] describe su traslación
+    (trazas, slip, sentidos, speed, steps), que el script de
+    igballs_export.CLIENT_ANIMATION_JS reproduce en el navegador.  El
+    tamaño y el tiempo de la figura ya no dependen de steps.
+
+    Uso:
+        scene = FaultScene(event, plane="plane_1", resolution=222)
+        fig = scene.figure()
+        scene.update(plane="plane_2")   # devuelve las piezas invalidadas
+        fig2 = scene.figure()
+
+    Con profiler (igballs_profile.Profiler) se mide cada pieza calculada.
+    """
+
+    DEFAULTS = dict(
+        plane="plane_1",
+        strike=None,
+        dip=None,
+        rake=None,
+        move_block="east",
+        block_width=10,
+        height=5,
+        steps=25,
+        speed=0.333,
+        eye_dict=None,
+        radius=3.3,
+        resolution=333,
+        invert_colors=False,
+        ball_style="surface",
+        subdivisions=4,
+        refine_levels=0,
+        nodal_lines=False,
+        split_nodal=False,
+        coastline_path=None,
+        coastline_window=1.0,
+        coastline_tolerance=0.0,
+        boundaries_path=None,
+        animation="frames",
+        polarity_cache=None,
+    )
+
+    PIECES = {
+        "basis": _BASIS,
+        "slip": _SLIP,
+        "beachball": _BASIS | _SLIP | _BALL | {"tensor"},
+        "nodal_lines": _BASIS | _SLIP | {"radius", "nodal_lines", "tensor"},
+        "plane": _BASIS,
+        "arrows": _BASIS | _SLIP | {"radius", "move_block"},
+        "compass": {"location"},
+        "map": {"location", "coastline_path", "coastline_window",
+                "coastline_tolerance", "boundaries_path"},
+        "blocks": _BLOCKS,
+        "frames": _BLOCKS,
+        "layout": _BLOCKS | {"info", "eye_dict", "tensor"},
+    }
+
+    def __init__(self, event: dict, profiler=None, **params):
+        self.profiler = profiler
+        self.params = {**self.DEFAULTS, "event": event}
+        self._derived = {}
+        self._cache = {}
+        self.update(**params)
+
+    # -- Parámetros ----------------------------------------------------------
+
+    def _derive(self) -> dict:
+        """Claves derivadas del evento y del plano nodal elegido."""
+        event = self.params["event"]
+        nodal_plane = event["nodal_planes"][self.params["plane"]]
+        tensor = event.get("moment_tensor")
+        return {
+            "location": (event["latitude"], event["longitude"], event["depth"]),
+            "info": (event["title"], event["datetime"], event["magnitude"],
+                     event["plate_a"], event["plate_b"]),
+            **{key: nodal_plane[key] if self.params[key] is None else self.params[key]
+               for key in ("strike", "dip", "rake")},
+            "tensor": (tuple(tensor[key] for key in igballs_mechanism.TENSOR_KEYS)
+                       if tensor else None),
+        }
+
+    def update(self, **changes) -> set:
+        """
+        Cambia parámetros y descarta solo las piezas que dependen de ellos.
+
+        Devuelve el conjunto de piezas invalidadas.
+        """
+        unknown = set(changes) - set(self.params)
+        if unknown:
+            raise TypeError(f"Parámetros desconocidos para FaultScene: {sorted(unknown)}")
+        changed = {k for k, v in changes.items() if self.params[k] != v}
+        self.params.update(changes)
+        rederive = not self._derived or changed & ({"event", "plane"} | _PLANE_OVERRIDES)
+        # Las claves derivadas del mismo nombre deciden qué piezas cambian
+        changed -= _PLANE_OVERRIDES
+        if rederive:
+            derived = self._derive()
+            changed |= {k for k, v in derived.items() if self._derived.get(k) != v}
+            self._derived = derived
+        stale = {piece for piece, deps in self.PIECES.items() if deps & changed}
+        for piece in stale:
+            self._cache.pop(piece, None)
+        return stale
+
+    def _stage(self, name: str):
+        return self.profiler.stage(name) if self.profiler else contextlib.nullcontext()
+
+    def _piece(self, name: str):
+        if name not in self._cache:
+            with self._stage(name):
+                self._cache[name] = getattr(self, f"_build_{name}")()
+        return self._cache[name]
+
+    # -- Piezas --------------------------------------------------------------
+
+    def _build_basis(self) -> dict:
+        """Vectores base del plano de falla y puntos de referencia."""
+        latitude, longitude, depth = self._derived["location"]
+        strike_rad = np.radians(self._derived["strike"])
+        dip_rad = np.radians(self._derived["dip"])
+        origin = np.array([latitude, longitude, depth])
+
+        strike_unit = np.array([np.sin(strike_rad), np.cos(strike_rad), 0])
+        dip_unit = np.array([
+            np.cos(strike_rad) * np.cos(dip_rad),
+            -np.sin(strike_rad) * np.cos(dip_rad),
+            -np.sin(dip_rad),
+        ])
+        strike_vector = self.params["block_width"] * strike_unit
+        dip_vector = self.params["height"] * dip_unit
+        normal_vector = np.cross(strike_unit, dip_unit)
+        normal_unit = normal_vector / np.linalg.norm(normal_vector)
+
+        bb1 = origin - 0.5 * strike_vector - 0.5 * dip_vector
+        bb3 = origin + 0.5 * strike_vector - 0.5 * dip_vector
+        return dict(
+            origin=origin,
+            strike_unit=strike_unit,
+            dip_unit=dip_unit,
+            normal_vector=normal_vector,
+            normal_unit=normal_unit,
+            strike_vector=strike_vector,
+            dip_vector=dip_vector,
+            anchor=bb1,
+            center=(bb1 + bb3) / 2,
+        )
+
+    def _build_slip(self) -> np.ndarray:
+        """
+        Vector unitario de deslizamiento a partir del rake.
+
+        Es el movimiento del bloque de muro (lado +normal, bloques "east")
+        respecto al bloque colgante, es decir el opuesto del deslizamiento
+        del bloque colgante de igballs_balls.double_couple: flechas, bloques
+        y beachball siguen la misma convención.
+        """
+        basis = self._piece("basis")
+        rake_rad = np.radians(self._derived["rake"])
+        slip_vector = -np.cos(rake_rad) * basis["strike_unit"] + np.sin(rake_rad) * basis["dip_unit"]
+        return slip_vector / np.linalg.norm(slip_vector)
+
+    def _build_beachball(self) -> dict:
+        """Create beach ball"""
+        basis, p = self._piece("basis"), self.params
+        args = (basis["center"], basis["strike_unit"], basis["dip_unit"], basis["normal_unit"],
+                self._derived["rake"], p["radius"])
+        # Con tensor de momento completo la bola es la del tensor, no la del plano
+        M = igballs_mechanism.event_tensor(p["event"])
+        if p["ball_style"] == "icosphere" or p["split_nodal"]:
+            # Mesh3d sobre icosfera (o malla lat/long triangulada si se cortan
+            # las celdas de borde): muchos menos vértices para la misma nitidez
+            trace = igballs_balls.create_beach_ball_mesh(
+                *args, p["subdivisions"], p["invert_colors"], p["refine_levels"],
+                p["split_nodal"], None if p["ball_style"] == "icosphere" else p["resolution"],
+                M=M)
+        else:
+            trace = igballs_balls.create_beach_ball(*args, p["resolution"], p["invert_colors"],
+                                                   M=M, polarity_cache=p["polarity_cache"])
+        return trace.to_plotly_json()
+
+    def _build_nodal_lines(self) -> list:
+        # Los círculos máximos solo son las líneas nodales de un doble par
+        if not self.params["nodal_lines"] or self._derived["tensor"]:
+            return []
+        basis = self._piece("basis")
+        return [igballs_balls.create_nodal_lines(
+            basis["center"], basis["strike_unit"], basis["dip_unit"], basis["normal_unit"],
+            self._derived["rake"], self.params["radius"]).to_plotly_json()]
+
+    def _build_plane(self) -> dict:
+        """Create a cool fault plane"""
+        basis = self._piece("basis")
+        center = basis["center"]
+        # --- Parámetros del plano de falla ------------------------------------
+        plane_factor = 3.0            # (≥1) escala respecto a la cara original
+        plane_color  = "red"          # cambia a gusto
+        plane_opacity = 0.35
+
+        # --- Cálculo de los 4 vértices del plano (rectángulo) ------------------
+        half_s   = 0.5 * plane_factor * basis["strike_vector"]   # vector mitad‑long. (strike)
+        half_d   = 0.5 * plane_factor * basis["dip_vector"]      # vector mitad‑anch. (dip)
+
+        plane_p1 = center - half_s - half_d   # esquina inferior‑izquierda
+        plane_p2 = center + half_s - half_d   # esquina inferior‑derecha
+        plane_p3 = center + half_s + half_d   # esquina superior‑derecha
+        plane_p4 = center - half_s + half_d   # esquina superior‑izquierda
+
+        return go.Mesh3d(
+            x=[plane_p1[0], plane_p2[0], plane_p3[0], plane_p4[0]],
+            y=[plane_p1[1], plane_p2[1], plane_p3[1], plane_p4[1]],
+            z=[plane_p1[2], plane_p2[2], plane_p3[2], plane_p4[2]],
+            i=[0, 0], j=[1, 3], k=[2, 2],                # dos triángulos
+            color=plane_color,
+            opacity=plane_opacity,
+            name="Plano de falla",hoverinfo="none",
+            flatshading=True,
+        ).to_plotly_json()
+
+    def _build_arrows(self) -> list:
+        basis, slip_unit = self._piece("basis"), self._piece("slip")
+        radius, move_block = self.params["radius"], self.params["move_block"]
+        center, normal_vector = basis["center"], basis["normal_vector"]
+
+        # ---------- Parámetros ----------
+        arrow_len     = 0.7 * radius     # km   (largura del vector)
+        arrow_color   = "red"
+        arrow_offset  = 1.3 * radius     # km   (separación del plano)
+
+        # Posición de las colas (± normal)
+        tail1 = center +  normal_vector * arrow_offset
+        tail2 = center -  normal_vector * arrow_offset
+
+        if move_block.lower() == "east":
+            dir_plus, dir_minus = -slip_unit,  slip_unit
+        elif move_block.lower() == "west":
+            dir_plus, dir_minus =  slip_unit, -slip_unit
+        else:                           # ambos fijos: muestra deslizamiento relativo
+            dir_plus, dir_minus =  slip_unit, -slip_unit
+
+        u1, v1, w1 = (dir_plus  * arrow_len)
+        u2, v2, w2 = (dir_minus * arrow_len)
+
+        # --------- Flecha bloque 1  (se mueve +slip) ----------
+        arrow1 = go.Cone(
+            x=[tail1[0]], y=[tail1[1]], z=[tail1[2]],
+            u=[ u1], v=[ v1], w=[ w1],
+            anchor="tail",              # la cola está en (x,y,z)
+            sizemode="absolute",
+            sizeref=arrow_len,
+            showscale=False,
+            colorscale=[[0, arrow_color], [1, arrow_color]],
+            name="Desplazamiento 1"
+        )
+
+        # --------- Flecha bloque 2  (‑slip) ----------
+        arrow2 = go.Cone(
+            x=[tail2[0]], y=[tail2[1]], z=[tail2[2]],
+            u=[u2], v=[v2], w=[w2],
+            anchor="tail",
+            sizemode="absolute",
+            sizeref=arrow_len,
+            showscale=False,
+            colorscale=[[0, arrow_color], [1, arrow_color]],
+            name="Desplazamiento 2"
+        )
+        return [arrow1.to_plotly_json(), arrow2.to_plotly_json()]
+
+    def _build_compass(self) -> list:
+        """Create compass rose"""
+        latitude, longitude, depth = self._derived["location"]
+        return [trace.to_plotly_json() for trace in crear_cruz_direcciones(
+            latitude, longitude, depth, CROSS_SHIFT, CROSS_LAT, CROSS_LON)]
+
+    def _build_map(self) -> list:
+        # Línea costera y límites de placas (CSV o índice en teselas) en el plano
+        # de la rosa de los vientos; comparten la ventana y la tolerancia
+        latitude, longitude, depth = self._derived["location"]
+        origin = np.array([latitude, longitude, depth])
+        p = self.params
+        traces = []
+        for path, color, name in ((p["coastline_path"], "black", "Coastline"),
+                                  (p["boundaries_path"], "darkred", "Límite de placas")):
+            if path:
+                segments = igballs_coast.load_coastline(
+                    path, latitude, longitude, p["coastline_window"], p["coastline_tolerance"])
+                traces.append(igballs_coast.create_coastline_trace(
+                    segments, latitude, longitude, origin, depth + CROSS_SHIFT + 4,
+                    color=color, name=name).to_plotly_json())
+        return traces
+
+    def _build_blocks(self) -> np.ndarray:
+        """
+        Vértices de los cuatro bloques en todos los pasos: (steps, 4, 8, 3).
+
+        Con animation="client" solo el primer y el último paso: (2, 4, 8, 3).
+        """
+        basis, slip, p = self._piece("basis"), self._piece("slip"), self.params
+        # Proyección escalar del vector normal sobre cada eje
+        normal_proj = np.array([basis["normal_unit"][0], basis["normal_unit"][1], 0])
+        dip_proj = np.array([0, 0, basis["dip_unit"][2]])
+        client = p["animation"] == "client"
+        vertices = block_vertices(
+            basis["anchor"], slip, basis["strike_vector"], basis["dip_vector"],
+            normal_proj, dip_proj, p["block_width"], p["height"],
+            1 if client else p["steps"], p["speed"], p["move_block"])
+        if not client:
+            return vertices
+        # Traslación pura: el último paso es el primero más (steps-1)·speed·slip
+        signs = np.tile(block_directions(p["move_block"]), 2)
+        shift = (p["steps"] - 1) * p["speed"] * signs[:, None, None] * slip
+        return np.concatenate([vertices, vertices + shift])
+
+    def _build_frames(self) -> dict:
+        """Bloques completos del primer paso y cuadros solo con x/y/z.
+
+        Con animation="client" no hay cuadros.
+        """
+        # Una sola conversión a listas: (steps, 4, 3, 8) -> x, y, z de cada bloque
+        coords = self._piece("blocks").transpose(0, 1, 3, 2).tolist()
+        i, j, k = BLOCK_FACES.T.tolist()
+        # Los bloques completos (topología y estilo) van una sola vez en la figura
+        blocks = [
+            go.Mesh3d(x=x, y=y, z=z, i=i, j=j, k=k, hoverinfo="none", **style).to_plotly_json()
+            for (x, y, z), style in zip(coords[0], BLOCK_STYLES)
+        ]
+        # Cada cuadro solo lleva x/y/z de las trazas 0-3 (los bloques); como
+        # dicts, go.Figure los valida una sola vez al construirse
+        if self.params["animation"] == "client":
+            return dict(blocks=blocks, frames=[])
+        frames = [
+            dict(data=[dict(type="mesh3d", x=x, y=y, z=z) for x, y, z in coords[step]],
+                 traces=BLOCK_TRACES, name=f"frame{step}")
+            for step in range(len(coords))
+        ]
+        return dict(blocks=blocks, frames=frames)
+
+    def _client_animation(self) -> dict:
+        """Layout de la animación en el navegador: meta y botones sin cuadros."""
+        p = self.params
+        meta = dict(igballs_animation=dict(
+            traces=BLOCK_TRACES,
+            slip=self._piece("slip").tolist(),
+            signs=np.tile(block_directions(p["move_block"]), 2).tolist(),
+            speed=p["speed"],
+            steps=p["steps"],
+            duration=100,
+        ))
+        # method="skip": Plotly solo emite plotly_buttonclicked y el script
+        # de la página mueve los bloques
+        buttons = [
+            dict(label="▶️ Play", method="skip", name="play"),
+            dict(label="⏸️ Pausa", method="skip", name="pause"),
+        ]
+        return dict(meta=meta, buttons=buttons)
+
+    def _build_layout(self) -> dict:
+        event_title, event_datetime, event_magnitude, plate_a, plate_b = self._derived["info"]
+        latitude, longitude, depth = self._derived["location"]
+        strike_deg, dip_deg, rake_deg = (self._derived[k] for k in ("strike", "dip", "rake"))
+        eye_dict = self.params["eye_dict"]
+        tensor_text = ""
+        if self._derived["tensor"]:
+            M = igballs_mechanism.event_tensor(self.params["event"])
+            parts = igballs_mechanism.decompose(M)
+            tensor_text = (f"<b>Tensor:</b> DC {float(parts['dc']):.0f}%, "
+                           f"CLVD {float(parts['clvd']):.0f}%<br>")
+            _, P, B, T = igballs_mechanism.principal_axes(M)
+        else:
+            P, B, T = igballs_mechanism.double_couple_axes(strike_deg, dip_deg, rake_deg)
+        axes = igballs_mechanism.axes_table(P, B, T)
+        axes_text = ", ".join(
+            f"{name.upper()} {float(axes[f'{name}_trend']):.0f}°/{float(axes[f'{name}_plunge']):.0f}°"
+            for name in ("p", "t", "b"))
+
+        # Esquinas p7 / q7 del último paso, para las etiquetas de las placas
+        vertices = self._piece("blocks")
+        p7 = vertices[-1, 0, 6]
+        q7 = vertices[-1, 1, 6]
+
+        layout = go.Layout(
+            showlegend=False,
+            title=dict(
+                text=f"<b>{event_title}</b>",
+                x=0.5,
+                font=dict(size=18),
+            ),
+            scene=dict(
+                xaxis=dict(title="Longitud (°)", ),
+                yaxis=dict(title="Latitud (°)", ),
+                zaxis=dict(title="Profundidad (km)", showticklabels=False, ticks=""),
+                aspectmode="data",  # o "cube", o "manual" si quieres fijarlo
+                camera=dict(eye=eye_dict),
+                annotations=
+                [   ##POSICION DE ETIQUETAS 
+                    dict(x=p7[0], y=p7[1], z=p7[2], text=f"{plate_a}", showarrow=False, font=dict(color="black", size=16)),
+                    dict(x=q7[0], y=q7[1], z=q7[2], text=f"{plate_b}", showarrow=False, font=dict(color="black", size=16)),
+                ],
+            ),
+            annotations=
+            [
+                dict(
+                    xref="paper",
+                    yref="paper",
+                    x=0.5,
+                    y=0.95,
+                    showarrow=False,
+                    align="left",
+                    text=(
+                        f"<b>Fecha:</b> {event_datetime} <br>"
+                        f"<b>Ubicación:</b>{longitude},{latitude} <br>"
+                        f"<b>Profundidad:</b> {depth}<br>"
+                        f"<b>Magnitud:</b> {event_magnitude}<br>"
+                        f"<b>Plano:</b> Strike {strike_deg}°, Dip {dip_deg}°, Rake {rake_deg}°<br>"
+                        f"<b>Ejes (rumbo/inmersión):</b> {axes_text}<br>"
+                        f"{tensor_text}"
+                    ),
+                    font=dict(size=15),
+                    bordercolor="black",
+                    borderwidth=1,
+                    bgcolor="white",
+                    opacity=0.9,
+                )
+            ],
+            modebar=dict(
+                orientation='v',
+                bgcolor='#E9E9E9',
+                color='black',
+                activecolor='#9ED3CD'
+            ),
+            autosize=True,
+            #width=800,    # o usa una proporción de la pantalla
+            #height=600,   # puedes aumentar a 700 o más
+            margin=dict(l=10, r=10, t=33, b=10),  # márgenes pequeños para maximizar espacio
+            updatemenus=[
+                dict(
+                    type="buttons",
+                    direction="left",  # Botones en fila
+                    x=0.1,              # Posición horizontal (entre 0 y 1)
+                    y=0.0,              # Posición vertical (entre 0 y 1)
+                    xanchor="left",
+                    yanchor="bottom",
+                    pad=dict(r=10, t=10),  # Espaciado alrededor
+                    showactive=True,
+                    font=dict(size=20),   # Tamaño del texto de los botones
+                    buttons=[
+                        dict(
+                            label="▶️ Play",
+                            method="animate",
+                            args=[
+                                None,
+                                dict(
+                                    frame=dict(duration=100, redraw=True),
+                                    fromcurrent=True,
+                                    mode="immediate"
+                                )
+                            ]
+                        ),
+                        dict(
+                            label="⏸️ Pausa",
+                            method="animate",
+                            args=[[None], {"mode": "immediate", "frame": {"duration": 0}, "transition": {"duration": 0}}]
+                        ),
+                        dict(
+                            label="🔄 Reset Camera",
+                            method="relayout",
+                            args=[{"scene.camera": dict(eye=eye_dict)}]
+                        )
+                    ]
+                )
+            ],
+        )
+        layout = layout.to_plotly_json()
+        if self.params["animation"] == "client":
+            client = self._client_animation()
+            layout["meta"] = client["meta"]
+            layout["updatemenus"][0]["buttons"][:2] = client["buttons"]
+        return layout
+
+    # -- Figura --------------------------------------------------------------
+
+    def basis(self) -> dict:
+        """
+        Vectores base del plano de falla (origin, strike_unit, dip_unit,
+        normal_unit, center, ...) en el marco de la escena.
+        """
+        return dict(self._piece("basis"))
+
+    def traces(self) -> list:
+        """Trazas de la figura: los 4 bloques (0-3) y luego las estáticas."""
+        return (self._piece("frames")["blocks"]
+                + self._piece("arrows")
+                + [self._piece("beachball"), self._piece("plane")]
+                + self._piece("compass")
+                + self._piece("nodal_lines")
+                + self._piece("map"))
+
+    def figure(self) -> go.Figure:
+        """Figura nueva armada con las piezas en caché (calcula las que falten)."""
+        data, layout, frames = self.traces(), self._piece("layout"), self._piece("frames")
+        with self._stage("assemble"):
+            return go.Figure(data=data, layout=layout, frames=frames["frames"])
+
+
 def create_figure(
     event: dict,
     plane: str,
@@ -124,445 +758,99 @@ def create_figure(
     eye_dict : dict,
     radius: float,
     resolution: int,
-    invert_colors : float
+    invert_colors : float,
+    **options,
     ) -> go.Figure:
+    """
+    Figura animada de un evento en una sola llamada (ver FaultScene).
 
-    """Load parameters"""
-    event_title = event["title"]
-    event_datetime = event["datetime"]
-    event_magnitude = event["magnitude"]
-    latitude,longitude,depth = event['latitude'],event['longitude'],event['depth']
-    strike_deg,dip_deg,rake_deg = event['nodal_planes'][plane]['strike'], event['nodal_planes'][plane]['dip'],\
-                                    event['nodal_planes'][plane]['rake']
-    plate_a = event["plate_a"]
-    plate_b = event["plate_b"]
-    origin = np.array([latitude,longitude,depth])  
-    strike_rad = np.radians(strike_deg)
-    dip_rad = np.radians(dip_deg)
-    rake_rad = np.radians(rake_deg)
-
-    strike_unit = np.array([np.sin(strike_rad), np.cos(strike_rad), 0])
-    dip_unit = np.array([
-        np.cos(strike_rad) * np.cos(dip_rad),
-        -np.sin(strike_rad) * np.cos(dip_rad),
-        -np.sin(dip_rad),
-    ])
-    strike_vector = block_width * strike_unit
-    dip_vector = height * dip_unit
-    normal_vector = np.cross(strike_unit, dip_unit)
-    normal_unit = normal_vector / np.linalg.norm(normal_vector)
-
-    slip_vector = np.cos(rake_rad) * strike_unit + np.sin(rake_rad) * dip_unit
-    slip_unit = slip_vector / np.linalg.norm(slip_vector)
-
-
-    """Create static objects"""
-    """Create compass rose"""
-    # Escalas en grados (aprox. 1° latitud ≈ 111 km)
-    cross_lat = 5  # ~5.5 km
-    cross_lon = 5  # ~5.5 km en esta latitud
-    cross_shift = 10
-
-    # --- Parámetros del plano de falla ------------------------------------
-    plane_factor = 3.0            # (≥1) escala respecto a la cara original
-    plane_color  = "red"          # cambia a gusto
-    plane_opacity = 0.35
-
-
-    ns_line, ew_line, norte_flecha = crear_cruz_direcciones(latitude, longitude, depth,cross_shift, cross_lat,cross_lon)
-
-
-
-
-    """Create beach ball"""
-    bb1 = origin - 0.5 * strike_vector - 0.5 * dip_vector
-    bb3 = origin + 0.5 * strike_vector - 0.5 * dip_vector
-
-    center = (bb1 + bb3) / 2
-    beachball_plot = igballs_balls.create_beach_ball(
-        center, strike_unit, dip_unit, normal_unit, rake_deg,radius, resolution,invert_colors   )
-
-
-    """Create a cool fault plane"""
-    # --- Cálculo de los 4 vértices del plano (rectángulo) ------------------
-    half_s   = 0.5 * plane_factor * strike_vector   # vector mitad‑long. (strike)
-    half_d   = 0.5 * plane_factor * dip_vector      # vector mitad‑anch. (dip)
-
-    # Centro del plano: p1 + p3 ya lo calculaste antes en ‘center’
-    plane_p1 = center - half_s - half_d   # esquina inferior‑izquierda
-    plane_p2 = center + half_s - half_d   # esquina inferior‑derecha
-    plane_p3 = center + half_s + half_d   # esquina superior‑derecha
-    plane_p4 = center - half_s + half_d   # esquina superior‑izquierda
-
-    plane = go.Mesh3d(
-        x=[plane_p1[0], plane_p2[0], plane_p3[0], plane_p4[0]],
-        y=[plane_p1[1], plane_p2[1], plane_p3[1], plane_p4[1]],
-        z=[plane_p1[2], plane_p2[2], plane_p3[2], plane_p4[2]],
-        i=[0, 0], j=[1, 3], k=[2, 2],                # dos triángulos
-        color=plane_color,
-        opacity=plane_opacity,
-        name="Plano de falla",hoverinfo="none",
-        flatshading=True,
-)
-
-
-
-
-    # ---------- Parámetros ----------
-    arrow_len     = 0.7 * radius     # km   (largura del vector)
-    arrow_radius  = 0.5 * radius    # km   (grosor del cono)
-    arrow_color   = "red"
-    arrow_offset  = 1.3 * radius     # km   (separación del plano)
-
-    # Posición de las colas (± normal)
-    tail1 = center +  normal_vector * arrow_offset
-    tail2 = center -  normal_vector * arrow_offset
-
-    # Componentes del vector deslizamiento, escalado a arrow_len
-    slip_unit = slip_vector / np.linalg.norm(slip_vector)
-    u, v, w = (slip_unit * arrow_len)
-
-
-    if move_block.lower() == "east":
-        dir_plus, dir_minus = -slip_unit,  slip_unit
-    elif move_block.lower() == "west":
-        dir_plus, dir_minus =  slip_unit, -slip_unit
-    else:                           # ambos fijos: muestra deslizamiento relativo
-        dir_plus, dir_minus =  slip_unit, -slip_unit
-
-    u1, v1, w1 = (dir_plus  * arrow_len)
-    u2, v2, w2 = (dir_minus * arrow_len)
-
-
-
-    # --------- Flecha bloque 1  (se mueve +slip) ----------
-    arrow1 = go.Cone(
-        x=[tail1[0]], y=[tail1[1]], z=[tail1[2]],
-        u=[ u1], v=[ v1], w=[ w1],
-        anchor="tail",              # la cola está en (x,y,z)
-        sizemode="absolute",
-        sizeref=arrow_len,
-        showscale=False,
-        colorscale=[[0, arrow_color], [1, arrow_color]],
-        name="Desplazamiento 1"
-    )
+    options acepta los demás parámetros de FaultScene: ball_style,
+    subdivisions, refine_levels, nodal_lines, split_nodal, coastline_path,
+    coastline_window, coastline_tolerance, boundaries_path, animation,
+    polarity_cache (igballs_polarity.PolarityCache) y profiler.
+    """
+    return FaultScene(
+        event,
+        plane=plane,
+        move_block=move_block,
+        block_width=block_width,
+        height=height,
+        steps=steps,
+        speed=speed,
+        eye_dict=eye_dict,
+        radius=radius,
+        resolution=resolution,
+        invert_colors=invert_colors,
+        **options,
+    ).figure()
+
+
+def create_sequence_figure(
+    events: list,
+    plane: str = "plane_1",
+    min_radius: float = 1.0,
+    max_radius: float = 5.0,
+    max_subdivisions: int = 3,
+    eye_dict: dict = None,
+    invert_colors: bool = False,
+    title: str = None,
+    ) -> go.Figure:
+    """
+    Secuencia de eventos (p. ej. réplicas) con todas sus beachballs en una
+    sola traza Mesh3d.
 
-    # --------- Flecha bloque 2  (‑slip) ----------
-    arrow2 = go.Cone(
-        x=[tail2[0]], y=[tail2[1]], z=[tail2[2]],
-        u=[u2], v=[v2], w=[w2],
-        anchor="tail",
-        sizemode="absolute",
-        sizeref=arrow_len,
-        showscale=False,
-        colorscale=[[0, arrow_color], [1, arrow_color]],
-        name="Desplazamiento 2"
+    Las posiciones están en km alrededor del primer evento (x este, y norte,
+    z = -profundidad) y el radio crece con la magnitud entre min_radius y
+    max_radius.  El nivel de detalle de cada bola depende de su radio.
+    Los eventos con moment_tensor se dibujan con el tensor completo.
+    """
+    latitude, longitude = events[0]["latitude"], events[0]["longitude"]
+    lats = np.array([event["latitude"] for event in events], dtype=float)
+    lons = np.array([event["longitude"] for event in events], dtype=float)
+    x, y = igballs_coast.geo_to_scene(lats, lons, latitude, longitude, (0.0, 0.0))
+    z = -np.array([event["depth"] for event in events], dtype=float)
+    strike, dip, rake = (
+        np.array([event["nodal_planes"][plane][key] for event in events], dtype=float)
+        for key in ("strike", "dip", "rake"))
+    magnitudes = np.array([event["magnitude"] for event in events], dtype=float)
+    radii = igballs_balls.magnitude_radii(magnitudes, min_radius, max_radius)
+    # Los eventos con tensor de momento completo se dibujan con su tensor
+    M = igballs_balls.double_couples(strike, dip, rake)
+    with_tensor = [n for n, event in enumerate(events) if event.get("moment_tensor")]
+    if with_tensor:
+        components = np.array([[events[n]["moment_tensor"][key]
+                                for key in igballs_mechanism.TENSOR_KEYS] for n in with_tensor],
+                              dtype=float)
+        tensors = igballs_mechanism.use_to_enu(*components.T)
+        M[with_tensor] = tensors / np.linalg.norm(tensors, axis=(1, 2), keepdims=True)
+
+    field = igballs_balls.create_beach_ball_field(
+        np.stack([x, y, z], axis=1), strike, dip, rake, radii,
+        max_subdivisions=max_subdivisions, invert_colors=invert_colors, M=M)
+    # Un punto invisible por evento, para el texto al pasar el ratón
+    labels = go.Scatter3d(
+        x=x, y=y, z=z,
+        mode="markers",
+        marker=dict(size=2, color="black", opacity=0.3),
+        text=[f"{event['title']}<br>{event['datetime']}<br>Prof. {event['depth']} km"
+              for event in events],
+        hoverinfo="text",
+        name="Eventos",
     )
 
-
-    static_traces = [arrow1, arrow2, beachball_plot,  plane,ns_line,ew_line,norte_flecha]
-    #static_traces = []
-    faces = [
-            [0, 1, 2], [0, 2, 3],
-            [4, 5, 6], [4, 6, 7],
-            [0, 1, 5], [0, 5, 4],
-            [1, 2, 6], [1, 6, 5],
-            [2, 3, 7], [2, 7, 6],
-            [3, 0, 4], [3, 4, 7],
-        ]
-
-    # Proyección escalar del vector normal sobre cada eje
-    proj_x = np.dot(normal_unit, [1, 0, 0])
-    proj_y = np.dot(normal_unit, [0, 1, 0])
-    proj_z = np.dot(normal_unit, [0, 0, 1])
-
-    normal_proj = np.array([proj_x,proj_y,0])
-
-    dip_x = np.dot(dip_unit,[1,0,0])
-    dip_y = np.dot(dip_unit,[0,1,0])
-    dip_z = np.dot(dip_unit,[0,0,1])
-    
-    dip_proj = np.array([0,0,dip_z])
-    
-    frames = []
-    for step in range(steps):      
-
-        if step == 0:
-            p1 = origin - 0.5 * strike_vector - 0.5 * dip_vector
-            q1 = p1
-        else:
-            if move_block == "east":
-                p1 = (origin - 0.5 * strike_vector - 0.5 * dip_vector) + slip_unit * (step * speed)
-                q1 = p1 - 2*slip_unit * (step * speed)
-            elif move_block == "west":
-                q1 = p1 - slip_unit * (step * speed)
-            else:  # "none"
-                q1 = p1
-        
-        ##BLOCK EAST
-        p2 = p1 + strike_vector
-        p3 = p2 + dip_vector
-        p4 = p1 + dip_vector  
-        ##Here is the error 
-        #p7 = p3 + normal_proj*block_width*1.5
-        #p8 = p4 + normal_proj*block_width*1.5
-        #alpha = np.arccos(p1[0]/)
-        aux = p2 -p3 
-        p7 = np.array([p3[0]+aux[0], p3[1]+aux[1],p3[2]]) + normal_proj*block_width
-        p8 = np.array([p4[0]+aux[0], p4[1]+aux[1],p4[2]]) + normal_proj*block_width
-        p5 = p8 - dip_proj * height
-        p6 = p7 - dip_proj * height
-
-        vertices = np.array([p1, p2, p3, p4, p5, p6, p7, p8])
-        x, y, z = vertices.T
-        i, j, k = zip(*faces)
-
-        block_east = go.Mesh3d(
-            x=x, y=y, z=z, i=i, j=j, k=k, color="steelblue", opacity=0.6,
-            name="block_east",hoverinfo="none"
-        )
-
-        ##BLOCK EAST UPPER
-        p1u = p1 - dip_vector/3
-        p2u = p2 - dip_vector/3 
-        p3u = p2
-        p4u = p1      
-        p5u = p5 - dip_proj*height/3
-        p6u = p6 - dip_proj*height/3
-        p7u = p6
-        p8u = p5
-
-        vertices_u = np.array([p1u, p2u, p3u, p4u, p5u, p6u, p7u, p8u])
-        xu, yu, zu = vertices_u.T
-        iu, ju, ku = zip(*faces)
-
-        block_east_upper = go.Mesh3d(
-            x=xu, y=yu, z=zu, i=iu, j=ju, k=ku,
-            color="peru", opacity=0.7,
-            name="block_east_upper"
-            ,hoverinfo="none"
-        )
-
-        q2 = q1 + strike_vector
-        q3 = q2 + dip_vector
-        q4 = q1 + dip_vector
-
-        q7 = q3 - normal_proj*block_width
-        q8 = q4 - normal_proj*block_width
-        q5 = q8 - dip_proj*height
-        q6 = q7 - dip_proj*height
-
-        vertices_q = np.array([q1,q2,q3,q4,q5,q6,q7,q8])
-        xq,yq,zq = vertices_q.T
-        iq, jq, kq = zip(*faces)
-
-        block_west = go.Mesh3d(
-            x=xq, y=yq, z=zq,
-            i=iq, j=jq, k=kq,
-            color="sandybrown", opacity=0.666,
-            name="block_west",hoverinfo="none"
-        )
-
-
-        q1u = q1 - dip_vector/3
-        q2u = q2 - dip_vector/3
-        q3u = q2
-        q4u = q1
-        q5u = q5 - dip_proj*height/3
-        q6u = q6 - dip_proj*height/3
-        q7u = q6
-        q8u = q5
-
-        vertices_qu = np.array([q1u, q2u, q3u,q4u,q5u, q6u, q7u, q8u])
-        xqu, yqu,zqu = vertices_qu.T
-
-        iuq,juq,kuq = zip(*faces)
-        block_west_upper = go.Mesh3d(
-            x=xqu, y=yqu, z=zqu, i=iuq, j=juq, k=kuq,
-            color="peru", opacity=0.7,
-            name="block_west_upper",hoverinfo="none"
-        )
-
-        frames.append(
-            go.Frame(data=[block_east, block_west, 
-                           block_east_upper, 
-                           block_west_upper
-                           ], name=f"frame{step}")
-        )
-
-        # Create annotations for points p1 to p8
-        annotations_p = []
-        for i, point in enumerate([p1, p2, p3, p4, p5, p6, p7, p8], start=1):
-            annotations_p.append(dict(
-                x=point[0],
-                y=point[1],
-                z=point[2],
-                text=f'p{i}',
-                showarrow=True,
-                arrowhead=1,
-                ax=0,
-                ay=-20,
-                font=dict(color='black', size=12),
-                xanchor="center",
-                yanchor="middle"
-            ))
-
-        annotations_pu = []
-        for i, point in enumerate([p1u, p2u, p3u, p4u, p5u, p6u, p7u, p8u], start=1):
-            annotations_pu.append(dict(
-                x=point[0],
-                y=point[1],
-                z=point[2],
-                text=f'p{i}u',
-                showarrow=True,
-                arrowhead=1,
-                ax=0,
-                ay=-20,
-                font=dict(color='red', size=16),
-                xanchor="center",
-                yanchor="middle"
-            ))
-
-        annotations_q = []
-        for i, point in enumerate([q1u, q2u, q3u, q4u, q5u, q6u, q7u, q8u], start=1):
-            annotations_q.append(dict(
-                x=point[0],
-                y=point[1],
-                z=point[2],
-                text=f'q{i}u',
-                showarrow=True,
-                arrowhead=1,
-                ax=0,
-                ay=-20,
-                font=dict(color='black', size=12),
-                xanchor="center",
-                yanchor="middle"
-            ))
-    
-
-
-    initial_block_east = frames[0].data[0]
-    initial_block_west = frames[0].data[1]
-    initial_block_east_upper = frames[0].data[2]
-    initial_block_west_upper = frames[0].data[3]
-
-    layout = go.Layout(
+    fig = go.Figure(data=[field, labels])
+    fig.update_layout(
         showlegend=False,
-        title=dict(
-            text=f"<b>{event_title}</b>",
-            x=0.5,
-            font=dict(size=18),
-        ),
+        title=dict(text=f"<b>{title or events[0]['title']}</b> ({len(events)} mecanismos)",
+                   x=0.5, font=dict(size=18)),
         scene=dict(
-            xaxis=dict(title="Longitud (°)", ),
-            yaxis=dict(title="Latitud (°)", ),
-            
-            
+            xaxis=dict(title="Este (km)"),
+            yaxis=dict(title="Norte (km)"),
             zaxis=dict(title="Profundidad (km)", showticklabels=False, ticks=""),
             aspectmode="data",
             camera=dict(eye=eye_dict),
-            annotations= 
-            #annotations_p +
-            #annotations_pu +
-            [   ##POSICION DE ETIQUETAS 
-                dict(x=p7[0], y=p7[1], z=p7[2], text=f"{plate_a}", showarrow=False, font=dict(color="black", size=16)),
-                dict(x=q7[0], y=q7[1], z=q7[2], text=f"{plate_b}", showarrow=False, font=dict(color="black", size=16)),
-            ],
         ),
-        annotations= 
-                
-                [
-            dict(
-                xref="paper",
-                yref="paper",
-                x=0.5,
-                y=0.95,
-                showarrow=False,
-                align="left",
-                text=(
-                    f"<b>Fecha:</b> {event_datetime} <br>"
-                    f"<b>Ubicación:</b>{longitude},{latitude} <br>"
-                    f"<b>Profundidad:</b> {depth}<br>"
-                    f"<b>Magnitud:</b> {event_magnitude}<br>"
-                    f"<b>Plano:</b> Strike {strike_deg}°, Dip {dip_deg}°, Rake {rake_deg}°<br>"
-                ),
-                font=dict(size=15),
-                bordercolor="black",
-                borderwidth=1,
-                bgcolor="white",
-                opacity=0.9,
-            )
-        ],
+        autosize=True,
+        margin=dict(l=10, r=10, t=33, b=10),
     )
-
-
-    fig = go.Figure(
-        data= [initial_block_east, initial_block_west, 
-               initial_block_east_upper,  
-               initial_block_west_upper
-               ] + static_traces,
-        layout=layout,
-        frames=frames,
-    )
-
-    fig.update_layout(
-    modebar=dict(
-        orientation='v',
-        bgcolor='#E9E9E9',
-        color='black',
-        activecolor='#9ED3CD'
-    ),
-
-    autosize=True,
-    #width=800,    # o usa una proporción de la pantalla
-    #height=600,   # puedes aumentar a 700 o más
-    margin=dict(l=10, r=10, t=33, b=10),  # márgenes pequeños para maximizar espacio
-    scene=dict(
-        aspectmode="data"  # o "cube", o "manual" si quieres fijarlo
-    ),
-
-    updatemenus=[
-        dict(
-            type="buttons",
-            direction="left",  # Botones en fila
-            x=0.1,              # Posición horizontal (entre 0 y 1)
-            y=0.0,              # Posición vertical (entre 0 y 1)
-            xanchor="left",
-            yanchor="bottom",
-            pad=dict(r=10, t=10),  # Espaciado alrededor
-            showactive=True,
-            font=dict(size=20),   # Tamaño del texto de los botones
-            buttons=[
-                dict(
-                    label="▶️ Play",
-                    method="animate",
-                    args=[
-                        None,
-                        
-                        dict(
-                            frame=dict(duration=100, redraw=True),
-                            fromcurrent=True,
-                            mode="immediate"
-                        )
-                        
-                    ]
-                ),
-                dict(
-                    label="⏸️ Pausa",
-                    method="animate",
-                    args=[[None], {"mode": "immediate", "frame": {"duration": 0}, "transition": {"duration": 0}}]
-                ),
-                dict(
-                    label="🔄 Reset Camera",
-                    method="relayout",
-                    args=[{"scene.camera": dict(eye=eye_dict)}]
-                )
-            ]
-        )
-    ]
-
-
-)
-
-
-    return fig
\ No newline at end of file
+    return fig
@@ -0,0 +1,192 @@
+"""Moment tensors, principal axes and nodal planes of focal mechanisms.
+
+Every function works on whole catalogs at once: angles are arrays of ``N``
+values and tensors ``(N, 3, 3)`` arrays in the frame of the scene (x east,
+y north, z up).  Catalogs give the six tensor components in the USE frame of
+the GCMT convention (r up, t south, p east); :func:`use_to_enu` converts
+them.  Only NumPy is needed, so events can be completed without plotly.
+"""
+
+import numpy as np
+
+# Componentes del tensor en el JSON del evento (marco USE, cualquier escala)
+TENSOR_KEYS = ("mrr", "mtt", "mpp", "mrt", "mrp", "mtp")
+
+
+def use_to_enu(mrr, mtt, mpp, mrt, mrp, mtp):
+    """``(..., 3, 3)`` tensors in x east, y north, z up from USE components.
+
+    With east = p, north = -t and up = r the components map as
+    Mxx = Mpp, Myy = Mtt, Mzz = Mrr, Mxy = -Mtp, Mxz = Mrp, Myz = -Mrt.
+    """
+    mrr, mtt, mpp, mrt, mrp, mtp = np.broadcast_arrays(
+        *(np.asarray(c, dtype=float) for c in (mrr, mtt, mpp, mrt, mrp, mtp)))
+    M = np.empty(mrr.shape + (3, 3))
+    M[..., 0, 0] = mpp
+    M[..., 1, 1] = mtt
+    M[..., 2, 2] = mrr
+    M[..., 0, 1] = M[..., 1, 0] = -mtp
+    M[..., 0, 2] = M[..., 2, 0] = mrp
+    M[..., 1, 2] = M[..., 2, 1] = -mrt
+    return M
+
+
+def event_tensor(event: dict):
+    """Unit-norm 3×3 tensor of an event's ``moment_tensor``, or None."""
+    tensor = event.get("moment_tensor")
+    if not tensor:
+        return None
+    M = use_to_enu(*(tensor[key] for key in TENSOR_KEYS))
+    return M / np.linalg.norm(M)
+
+
+def principal_axes(M):
+    """Eigenvalues and P, B, T axes of ``(N, 3, 3)`` tensors.
+
+    One batched ``eigh`` for the whole catalog.  Returns ``(values, P, B, T)``
+    with ``values`` ``(N, 3)`` in ascending order and each axis an ``(N, 3)``
+    array of unit vectors (P: most compressive, T: most tensile).
+    """
+    values, vectors = np.linalg.eigh(np.asarray(M, dtype=float))
+    return values, vectors[..., 0], vectors[..., 1], vectors[..., 2]
+
+
+def trend_plunge(axes):
+    """Trend (degrees clockwise from north) and plunge (degrees down) of axes."""
+    axes = np.asarray(axes, dtype=float)
+    # Los ejes no tienen sentido: se toma el que apunta hacia abajo
+    axes = np.where(axes[..., 2:3] > 0, -axes, axes)
+    trend = np.degrees(np.arctan2(axes[..., 0], axes[..., 1])) % 360
+    plunge = np.degrees(np.arcsin(np.clip(-axes[..., 2], -1.0, 1.0)))
+    return trend, plunge
+
+
+def plane_angles(normal, slip):
+    """Strike, dip and rake (degrees) of planes given by normal and slip vectors.
+
+    ``slip`` is the motion of the hanging wall; the pair ``(-normal, -slip)``
+    describes the same plane, so either orientation of ``normal`` is accepted.
+    """
+    normal = np.asarray(normal, dtype=float)
+    slip = np.asarray(slip, dtype=float)
+    # Normal hacia arriba, que apunta del bloque inferior al colgante
+    down = normal[..., 2:3] < 0
+    normal = np.where(down, -normal, normal)
+    slip = np.where(down, -slip, slip)
+
+    dip = np.degrees(np.arccos(np.clip(normal[..., 2], -1.0, 1.0)))
+    strike = (np.degrees(np.arctan2(normal[..., 0], normal[..., 1])) - 90) % 360
+    strike_rad = np.radians(strike)
+    strike_vec = np.stack([np.sin(strike_rad), np.cos(strike_rad),
+                           np.zeros_like(strike_rad)], axis=-1)
+    dip_vec = np.cross(strike_vec, normal)                  # buzamiento abajo
+    rake = np.degrees(np.arctan2(-(slip*dip_vec).sum(axis=-1),
+                                 (slip*strike_vec).sum(axis=-1)))
+    return strike, dip, rake
+
+
+def plane_vectors(strike_deg, dip_deg, rake_deg):
+    """Upward normal and hanging-wall slip unit vectors of nodal planes.
+
+    Returns two ``(N, 3)`` arrays; ``s n + n s`` is the double-couple tensor
+    of ``igballs_balls.double_couples``.
+    """
+    strike = np.radians(np.asarray(strike_deg, dtype=float))
+    dip = np.radians(np.asarray(dip_deg, dtype=float))
+    rake = np.radians(np.asarray(rake_deg, dtype=float))
+    sin_s, cos_s = np.sin(strike), np.cos(strike)
+    sin_d, cos_d = np.sin(dip), np.cos(dip)
+    normal = np.stack([cos_s*sin_d, -sin_s*sin_d, cos_d], axis=-1)
+    # cos(rake)·strike - sin(rake)·(buzamiento abajo)
+    slip = np.stack([np.cos(rake)*sin_s - np.sin(rake)*cos_s*cos_d,
+                     np.cos(rake)*cos_s + np.sin(rake)*sin_s*cos_d,
+                     np.sin(rake)*sin_d], axis=-1)
+    return normal, slip
+
+
+def auxiliary_planes(strike_deg, dip_deg, rake_deg):
+    """Strike, dip and rake of the conjugate nodal planes (normal and slip swapped)."""
+    normal, slip = plane_vectors(strike_deg, dip_deg, rake_deg)
+    return plane_angles(slip, normal)
+
+
+def double_couple_axes(strike_deg, dip_deg, rake_deg):
+    """P, B and T unit vectors of double couples, without an eigen-decomposition.
+
+    ``T = (n + s)/√2``, ``P = (n - s)/√2`` and ``B = n × s``; each is an
+    ``(N, 3)`` array like the axes of :func:`principal_axes`.
+    """
+    normal, slip = plane_vectors(strike_deg, dip_deg, rake_deg)
+    return (normal - slip) / np.sqrt(2), np.cross(normal, slip), (normal + slip) / np.sqrt(2)
+
+
+def axes_table(P, B, T) -> dict:
+    """Trend and plunge of P, B and T axes as ``p_trend``, ``p_plunge``, ... arrays."""
+    table = {}
+    for name, axes in (("p", P), ("b", B), ("t", T)):
+        table[f"{name}_trend"], table[f"{name}_plunge"] = trend_plunge(axes)
+    return table
+
+
+def tensor_planes(M):
+    """Nodal planes of the best double couple of ``(N, 3, 3)`` tensors.
+
+    The fault normal and slip are ``(T ± P)/√2``; the two planes swap them.
+    Returns two ``(strike, dip, rake)`` tuples of arrays.
+    """
+    _, P, _, T = principal_axes(M)
+    normal = (T + P) / np.sqrt(2)
+    slip = (T - P) / np.sqrt(2)
+    return plane_angles(normal, slip), plane_angles(slip, normal)
+
+
+def decompose(M):
+    """Isotropic part and double-couple / CLVD percentages of tensors.
+
+    The deviatoric eigenvalues give ``ε = -λ_min / |λ_max|`` (by absolute
+    value) and the CLVD share is ``200·|ε|`` percent.  A purely isotropic
+    tensor has no deviatoric part and gets 0 % of both.  Returns a dict of
+    arrays ``isotropic`` (trace / 3, same units as ``M``), ``dc`` and
+    ``clvd``.
+    """
+    values, _, _, _ = principal_axes(M)
+    isotropic = values.mean(axis=-1)
+    deviatoric = values - isotropic[..., None]
+    order = np.argsort(np.abs(deviatoric), axis=-1)
+    smallest = np.take_along_axis(deviatoric, order[..., :1], axis=-1)[..., 0]
+    largest = np.take_along_axis(deviatoric, order[..., 2:], axis=-1)[..., 0]
+    # Parte desviadora del orden del redondeo: ε no tiene sentido
+    shear = np.abs(largest) > 1e-9 * np.abs(values).max(axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        epsilon = np.where(shear, -smallest / np.abs(largest), 0.0)
+    clvd = np.where(shear, 200 * np.abs(epsilon), 0.0)
+    return dict(isotropic=isotropic, dc=np.where(shear, 100 - clvd, 0.0), clvd=clvd)
+
+
+def _plane_dict(strike, dip, rake) -> dict:
+    return dict(strike=round(float(strike), 1), dip=round(float(dip), 1), rake=round(float(rake), 1))
+
+
+def fill_auxiliary_plane(event: dict) -> dict:
+    """Add the missing one of ``plane_1``/``plane_2`` as the conjugate of the other."""
+    planes = event.get("nodal_planes") or {}
+    missing = [name for name in ("plane_1", "plane_2") if name not in planes]
+    if len(missing) != 1:
+        return event
+    given = planes["plane_2" if missing[0] == "plane_1" else "plane_1"]
+    strike, dip, rake = auxiliary_planes(given["strike"], given["dip"], given["rake"])
+    planes[missing[0]] = _plane_dict(strike, dip, rake)
+    return event
+
+
+def fill_tensor_planes(event: dict) -> dict:
+    """Add the nodal planes of the best double couple to an event that only
+    has a ``moment_tensor``; other events are returned unchanged."""
+    if event.get("nodal_planes") or not event.get("moment_tensor"):
+        return event
+    planes = tensor_planes(event_tensor(event)[None])
+    event["nodal_planes"] = {
+        f"plane_{n}": _plane_dict(strike[0], dip[0], rake[0])
+        for n, (strike, dip, rake) in enumerate(planes, start=1)
+    }
+    return event
@@ -0,0 +1,170 @@
+"""Persistent on-disk cache of beachball polarity grids.
+
+The colour grid of a surface beachball depends only on the moment tensor
+and the ``resolution`` of the lat/long grid, so batch and ``--watch``
+re-renders of the same mechanisms can skip the sphere math.  Each grid is
+stored in its own file ``<key>.bits`` as packed bits (one bit per grid
+point, ``resolution² / 8`` bytes) and read back through a read-only memory
+map.  The key is the SHA-1 of the resolution and the six components of the
+unit-norm tensor rounded to ``QUANTUM``; mechanisms that round to the same
+key share a grid, which can only differ on points lying on a nodal line.
+``invert_colors`` is applied after the lookup, so both colourings share an
+entry.
+
+Files are written to a temporary name and renamed, so readers in other
+processes never see a partial grid.  The directory is bounded in bytes:
+the least recently used entries (by modification time, refreshed on every
+hit) are removed under an exclusive ``fcntl`` lock, so several worker
+processes can share one cache.
+"""
+
+import contextlib
+import functools
+import hashlib
+import logging
+import os
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Cambia al modificar el cálculo de la polaridad para no leer grillas viejas
+CACHE_VERSION = 1
+
+# Paso de cuantización de las componentes del tensor normalizado
+QUANTUM = 1e-4
+
+SUFFIX = ".bits"
+LOCK_NAME = ".lock"
+
+
+def polarity_key(M, resolution: int) -> str:
+    """Cache key of tensor ``M`` (any scale) on a ``resolution`` grid.
+
+    A null (or non-finite) tensor has no polarity and raises ValueError.
+    """
+    M = np.asarray(M, dtype=float)
+    norm = np.linalg.norm(M)
+    if not np.isfinite(norm) or norm == 0:
+        raise ValueError("El tensor de momento es nulo o no finito: no tiene polaridad")
+    M = M / norm
+    terms = np.round(M[np.triu_indices(3)] / QUANTUM).astype(np.int64)
+    payload = f"{CACHE_VERSION}:{int(resolution)}:" + ",".join(map(str, terms))
+    return hashlib.sha1(payload.encode("ascii")).hexdigest()
+
+
+class PolarityCache:
+    """Directory of packed polarity grids, bounded by the total size in bytes."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Tamaño estimado del directorio; se recalcula bajo el bloqueo
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, key + SUFFIX)
+
+    def get(self, key: str, resolution: int):
+        """``(resolution, resolution)`` uint8 grid (1 = dilatation) or None."""
+        n_bits = resolution * resolution
+        # Un solo open: tamaño, mapa y uso se toman del mismo archivo aunque
+        # otro proceso lo reemplace o lo elimine entre tanto (el mapa de un
+        # archivo borrado sigue siendo válido)
+        try:
+            with open(self.path(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size != (n_bits + 7) // 8:
+                    return None
+                packed = np.memmap(f, dtype=np.uint8, mode="r")
+                os.utime(f.fileno() if os.utime in os.supports_fd else self.path(key))
+        except (FileNotFoundError, ValueError):
+            return None
+        return np.unpackbits(packed, count=n_bits).reshape(resolution, resolution)
+
+    def put(self, key: str, colors: np.ndarray) -> None:
+        packed = np.packbits(np.asarray(colors, dtype=bool).ravel())
+        if packed.nbytes > self.max_bytes:
+            return
+        tmp_path = f"{self.path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(packed.tobytes())
+        os.replace(tmp_path, self.path(key))
+        if self._size is None:
+            self._size = self._scan()[0]
+        else:
+            self._size += packed.nbytes
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def colors(self, M, resolution: int, compute):
+        """Grid of ``M`` from the cache, or ``compute()`` stored for next time.
+
+        ``compute`` returns the boolean/0-1 ``(resolution, resolution)``
+        grid with 1 where the polarity is negative.
+        """
+        key = polarity_key(M, resolution)
+        colors = self.get(key, resolution)
+        if colors is not None:
+            self.hits += 1
+            return colors
+        self.misses += 1
+        colors = np.asarray(compute(), dtype=np.uint8)
+        self.put(key, colors)
+        return colors
+
+    @contextlib.contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_NAME), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _scan(self):
+        """Total size and ``(mtime, size, path)`` of every entry."""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return sum(size for _, size, _ in entries), entries
+
+    def _evict(self) -> None:
+        # Otros procesos escriben en el mismo directorio: se recuenta bajo el
+        # bloqueo y se borran las entradas usadas hace más tiempo
+        with self._locked():
+            size, entries = self._scan()
+            removed = 0
+            for _, entry_size, path in sorted(entries):
+                if size <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+                removed += 1
+            self._size = size
+        if removed:
+            logger.debug("%d grillas de polaridad eliminadas de %s", removed, self.directory)
+
+
+@functools.lru_cache(maxsize=None)
+def open_cache(directory: str, max_bytes: int) -> PolarityCache:
+    """Cache of ``directory`` shared by every figure built in this process."""
+    return PolarityCache(directory, max_bytes)
@@ -0,0 +1,114 @@
+"""Per-stage timings, allocation peaks and payload sizes of a render.
+
+A :class:`Profiler` is passed to :class:`igballs_fault.FaultScene` (and used
+by ``igballs.py --profile``) to time each stage with ``stage(name)``.
+Stages can nest; each one is reported with its inclusive wall time.
+Tracing allocations slows NumPy-heavy code several times over, so stages
+are timed untraced and the peaks come from a second run of the same stages
+inside :meth:`Profiler.memory_pass`, as in ``igballs_bench.measure``: each
+stage then reports the peak of traced allocations above the memory in use
+when it started.
+"""
+
+import contextlib
+import json
+import sys
+import time
+import tracemalloc
+
+
+def _json_size(obj) -> int:
+    return len(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+class Profiler:
+    """Collect stage records and the payload breakdown of a figure."""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self.peaks = {}
+        self.payload = None
+        self.extra = {}
+        self._stack = []
+        self._tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage ``name`` (in the memory pass,
+        record its allocation peak instead)."""
+        entry = dict(path="/".join([*(e["name"] for e in self._stack), name]),
+                     name=name, start=0, peak=0)
+        if self._tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # El pico del padre no se pierde al reiniciarlo para el hijo
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            tracemalloc.reset_peak()
+            entry["start"] = current
+        self._stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            if self._tracing:
+                peak = max(entry["peak"], tracemalloc.get_traced_memory()[1])
+                self.peaks[entry["path"]] = round((peak - entry["start"]) / 2**20, 3)
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+                tracemalloc.reset_peak()
+            else:
+                self.stages.append(dict(stage=entry["path"], seconds=round(seconds, 6)))
+
+    @contextlib.contextmanager
+    def memory_pass(self):
+        """Trace allocations while the enclosed block re-runs timed stages.
+
+        Stages inside only record their peaks, added to the timed records
+        of the same path; with ``trace_memory=False`` nothing is traced.
+        """
+        if not self.trace_memory or tracemalloc.is_tracing():
+            yield
+            return
+        tracemalloc.start()
+        self._tracing = True
+        try:
+            yield
+        finally:
+            self._tracing = False
+            tracemalloc.stop()
+
+    def measure_payload(self, fig) -> dict:
+        """Serialised bytes of the layout, each trace and each frame of ``fig``."""
+        data = json.loads(fig.to_json())
+        self.payload = dict(
+            total_bytes=_json_size(data),
+            layout_bytes=_json_size(data.get("layout", {})),
+            traces=[
+                dict(index=index, type=trace.get("type"), name=trace.get("name"),
+                     bytes=_json_size(trace))
+                for index, trace in enumerate(data.get("data", []))
+            ],
+            frames=[
+                dict(name=frame.get("name"), bytes=_json_size(frame))
+                for frame in data.get("frames", [])
+            ],
+        )
+        return self.payload
+
+    def report(self) -> dict:
+        """Stages in completion order, payload breakdown and extra fields."""
+        stages = [dict(record, peak_mb=self.peaks[record["stage"]])
+                  if record["stage"] in self.peaks else record for record in self.stages]
+        return dict(stages=stages, payload=self.payload, **self.extra)
+
+    def write(self, path: str) -> None:
+        """Write the report as JSON to ``path`` (``"-"``: stderr)."""
+        text = json.dumps(self.report(), indent=2, ensure_ascii=False)
+        if path == "-":
+            print(text, file=sys.stderr)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
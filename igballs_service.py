@@ -0,0 +1,408 @@
+"""Long-running local HTTP service that renders event pages on request.
+
+``POST /render`` takes ``{"event": {...}, "config": {...overrides}}`` and
+returns the HTML page.  Pages are cached under the SHA-256 of the
+normalised inputs (event plus the render parameters after overrides), in
+memory and on disk, each bounded in bytes with least-recently-used
+eviction.  Rendering runs in a process pool so the asyncio loop only
+parses requests and serves cached pages; concurrent requests for the same
+inputs share one render.
+
+Other endpoints: ``GET /pages/<key>`` serves a cached page and
+``GET /health`` returns the cache and pool statistics as JSON.
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+
+import igballs
+
+logger = logging.getLogger(__name__)
+
+# Cambia al modificar el render para no servir páginas viejas de la caché
+CACHE_VERSION = 1
+
+MAX_BODY = 4 * 2**20
+
+
+# Parámetros que apuntan a archivos o directorios leídos al renderizar
+DATA_PATHS = ("coastline_path", "boundaries_path")
+
+
+def data_stamp(path: str):
+    """``[mtime_ns, size]`` of a data file, or of the ``index.json`` of an index
+    directory, so that editing a map layer changes the cache key."""
+    if not path:
+        return None
+    if os.path.isdir(path):
+        path = os.path.join(path, "index.json")
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def cache_key(event: dict, params: dict) -> str:
+    """SHA-256 of the event, the render parameters and the stamps of the map
+    files they point to, as canonical JSON."""
+    payload = json.dumps(dict(version=CACHE_VERSION, event=event,
+                              params=igballs.render_params(params),
+                              data={key: data_stamp(params[key]) for key in DATA_PATHS}),
+                         sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def override_errors(params: dict, overrides: dict) -> list:
+    """Overrides whose JSON type does not match the loaded parameter.
+
+    Parameters that default to None (optional paths) take a string or
+    null; integers are accepted for float parameters but not the reverse,
+    booleans only for boolean parameters, and ``eye_dict`` must have
+    numeric ``x``, ``y`` and ``z``.
+    """
+    errors = []
+    for key, value in sorted(overrides.items()):
+        default = params[key]
+        if default is None:
+            valid, expected = value is None or isinstance(value, str), "texto o null"
+        elif isinstance(default, bool):
+            valid, expected = isinstance(value, bool), "booleano"
+        elif isinstance(default, int):
+            valid, expected = isinstance(value, int) and not isinstance(value, bool), "entero"
+        elif isinstance(default, float):
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+            expected = "número"
+        elif key == "eye_dict":
+            valid = (isinstance(value, dict) and set(value) == {"x", "y", "z"}
+                     and all(isinstance(v, (int, float)) and not isinstance(v, bool)
+                             for v in value.values()))
+            expected = "un objeto con x, y, z numéricos"
+        else:
+            valid, expected = isinstance(value, type(default)), type(default).__name__
+        if not valid:
+            errors.append(f"{key} = {value!r}: debe ser {expected}")
+    return errors
+
+
+def render_page(event: dict, params: dict) -> bytes:
+    """Worker job: full HTML page of one event."""
+    import igballs_export
+
+    fig = igballs.build_figure(event, params)
+    return igballs_export.render_html_bytes(
+        fig, compact=params["compact_arrays"],
+        **igballs_export.plotlyjs_options(params["plotlyjs"]))
+
+
+class MemoryCache:
+    """In-memory LRU of pages, bounded by the total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._pages = collections.OrderedDict()
+
+    def get(self, key: str):
+        page = self._pages.get(key)
+        if page is not None:
+            self._pages.move_to_end(key)
+        return page
+
+    def put(self, key: str, page: bytes) -> None:
+        if len(page) > self.max_bytes:
+            return
+        if key in self._pages:
+            self.size -= len(self._pages.pop(key))
+        self._pages[key] = page
+        self.size += len(page)
+        while self.size > self.max_bytes:
+            _, old = self._pages.popitem(last=False)
+            self.size -= len(old)
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+
+class DiskCache:
+    """Directory of ``<key>.html`` pages, bounded by the total size in bytes.
+
+    The modification time of a file is its last use; the oldest files are
+    removed when the directory grows over ``max_bytes``.  Pages are written
+    to a temporary file and renamed, so a reader never sees a partial page.
+    The methods run in executor threads; a lock guards the size accounting
+    and the eviction.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._sizes = {
+            entry.name[:-5]: entry.stat().st_size
+            for entry in os.scandir(directory) if entry.name.endswith(".html")
+        }
+        self.size = sum(self._sizes.values())
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.html")
+
+    def get(self, key: str):
+        with self._lock:
+            if key not in self._sizes:
+                return None
+            try:
+                with open(self.path(key), "rb") as f:
+                    page = f.read()
+                os.utime(self.path(key))
+            except FileNotFoundError:
+                self.size -= self._sizes.pop(key)
+                return None
+        return page
+
+    def put(self, key: str, page: bytes) -> None:
+        if len(page) > self.max_bytes:
+            return
+        tmp_path = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(page)
+        with self._lock:
+            os.replace(tmp_path, self.path(key))
+            self.size += len(page) - self._sizes.get(key, 0)
+            self._sizes[key] = len(page)
+            if self.size > self.max_bytes:
+                self._evict()
+
+    def _mtime(self, key: str) -> float:
+        try:
+            return os.stat(self.path(key)).st_mtime
+        except FileNotFoundError:
+            return 0.0          # borrado desde fuera: se descarta primero
+
+    def _evict(self) -> None:
+        by_age = sorted(self._sizes, key=self._mtime)
+        for key in by_age:
+            if self.size <= self.max_bytes:
+                break
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+            self.size -= self._sizes.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+
+class RenderService:
+    """Cache lookup, request coalescing and rendering over a process pool."""
+
+    def __init__(self, params: dict, workers: int, memory: MemoryCache, disk: DiskCache):
+        self.params = params
+        self.memory = memory
+        self.disk = disk
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.workers = workers
+        self.pending = {}
+        self.stats = collections.Counter()
+
+    def resolve(self, request: dict) -> tuple:
+        """Event and parameters of a request, or ValueError with the problems."""
+        event = request.get("event")
+        overrides = request.get("config") or {}
+        if not isinstance(event, dict) or not isinstance(overrides, dict):
+            raise ValueError(["'event' y 'config' deben ser objetos JSON"])
+        unknown = sorted(set(overrides) - set(self.params))
+        if unknown:
+            raise ValueError([f"parámetros desconocidos: {', '.join(unknown)}"])
+        errors = override_errors(self.params, overrides)
+        if errors:
+            raise ValueError(errors)
+        params = {**self.params, **overrides}
+        errors = igballs.validate_config(params) + igballs.validate_event(event, params["plane"])
+        if params["plotlyjs"] == "shared":
+            errors.append("plotlyjs = 'shared' no está disponible en el servicio (cdn o inline)")
+        if errors:
+            raise ValueError(errors)
+        return igballs.complete_event(event), params
+
+    async def page(self, event: dict, params: dict) -> tuple:
+        """``(key, page, source)`` with source ``memory``, ``disk`` or ``render``."""
+        key = cache_key(event, params)
+        page = self.memory.get(key)
+        if page is not None:
+            self.stats["memory_hits"] += 1
+            return key, page, "memory"
+        loop = asyncio.get_running_loop()
+        page = await loop.run_in_executor(None, self.disk.get, key)
+        if page is not None:
+            self.stats["disk_hits"] += 1
+            self.memory.put(key, page)
+            return key, page, "disk"
+
+        future = self.pending.get(key)
+        if future is None:
+            self.stats["renders"] += 1
+            future = loop.run_in_executor(self.pool, render_page, event, params)
+            self.pending[key] = future
+            try:
+                page = await future
+            finally:
+                del self.pending[key]
+            self.memory.put(key, page)
+            await loop.run_in_executor(None, self.disk.put, key, page)
+            return key, page, "render"
+        self.stats["coalesced"] += 1
+        return key, await future, "render"
+
+    async def cached(self, key: str):
+        page = self.memory.get(key)
+        if page is None:
+            page = await asyncio.get_running_loop().run_in_executor(None, self.disk.get, key)
+        return page
+
+    def health(self) -> dict:
+        return dict(
+            workers=self.workers,
+            rendering=len(self.pending),
+            memory=dict(pages=len(self.memory), bytes=self.memory.size,
+                        max_bytes=self.memory.max_bytes),
+            disk=dict(pages=len(self.disk), bytes=self.disk.size,
+                      max_bytes=self.disk.max_bytes, directory=self.disk.directory),
+            **self.stats,
+        )
+
+    # -- HTTP ----------------------------------------------------------------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        method, path = "-", "-"
+        try:
+            method, path, body = await self._read_request(reader)
+            status, headers, content = await self._dispatch(method, path, body)
+        except ValueError as exc:
+            status, headers, content = self._json(HTTPStatus.BAD_REQUEST, {"errors": [str(exc)]})
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as exc:
+            logger.exception("Error al atender la petición")
+            status, headers, content = self._json(
+                HTTPStatus.INTERNAL_SERVER_ERROR, {"errors": [f"{type(exc).__name__}: {exc}"]})
+
+        head = [f"HTTP/1.1 {status.value} {status.phrase}",
+                f"Content-Length: {len(content)}", "Connection: close"]
+        head += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + content)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+        logger.info("%s %s %d (%.3f s)", method, path, status.value, time.perf_counter() - start)
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> tuple:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ValueError("Petición HTTP mal formada")
+        method, path, _ = request_line
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        if length > MAX_BODY:
+            raise ValueError(f"Cuerpo demasiado grande (máximo {MAX_BODY} bytes)")
+        body = await reader.readexactly(length) if length else b""
+        return method, path, body
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        if method == "POST" and path == "/render":
+            try:
+                event, params = self.resolve(json.loads(body or b"{}"))
+            except json.JSONDecodeError as exc:
+                return self._json(HTTPStatus.BAD_REQUEST, {"errors": [f"JSON inválido: {exc}"]})
+            except ValueError as exc:
+                return self._json(HTTPStatus.BAD_REQUEST, {"errors": exc.args[0]})
+            key, page, source = await self.page(event, params)
+            return HTTPStatus.OK, self._page_headers(key, source), page
+        if method == "GET" and path.startswith("/pages/"):
+            key = path[len("/pages/"):].removesuffix(".html")
+            page = await self.cached(key) if len(key) == 64 and key.isalnum() else None
+            if page is None:
+                return self._json(HTTPStatus.NOT_FOUND, {"errors": [f"página {key} no está en caché"]})
+            return HTTPStatus.OK, self._page_headers(key, "cache"), page
+        if method == "GET" and path == "/health":
+            return self._json(HTTPStatus.OK, self.health())
+        return self._json(HTTPStatus.NOT_FOUND, {"errors": [f"{method} {path} no existe"]})
+
+    @staticmethod
+    def _page_headers(key: str, source: str) -> dict:
+        return {"Content-Type": "text/html; charset=utf-8", "ETag": f'"{key}"',
+                "X-Igballs-Key": key, "X-Igballs-Cache": source}
+
+    @staticmethod
+    def _json(status: HTTPStatus, obj) -> tuple:
+        return status, {"Content-Type": "application/json"}, json.dumps(obj).encode("utf-8")
+
+
+async def serve(service: RenderService, host: str, port: int) -> None:
+    server = await asyncio.start_server(service.handle, host, port)
+    logger.info("Servicio igballs en http://%s:%d (%d procesos)", host, port, service.workers)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """Start the render service with the parameters of a configuration file."""
+    parser = argparse.ArgumentParser(description="Local HTTP render service for igballs")
+    parser.add_argument("--config", default="./config/igballs.cfg",
+                        help="Configuration file with the default render parameters")
+    parser.add_argument("--host", help="Listen address (default: [SERVICE] host)")
+    parser.add_argument("--port", type=int, help="Listen port (default: [SERVICE] port)")
+    parser.add_argument("--workers", type=int, help="Render processes (default: [SERVICE] workers)")
+    parser.add_argument("--cache-dir", help="Disk cache directory (default: [SERVICE] cache_dir)")
+    parser.add_argument("--memory-mb", type=float, help="Memory cache size (default: [SERVICE] memory_mb)")
+    parser.add_argument("--disk-mb", type=float, help="Disk cache size (default: [SERVICE] disk_mb)")
+    parser.add_argument("--log-level", default="INFO", help="Logging level")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s:%(message)s")
+    params = igballs.load_config(args.config)
+    errors = igballs.validate_config(params)
+    if errors:
+        parser.error("; ".join(errors))
+
+    def option(name):
+        value = getattr(args, name)
+        return params[f"service_{name}"] if value is None else value
+
+    service = RenderService(
+        params,
+        workers=option("workers"),
+        memory=MemoryCache(int(option("memory_mb") * 2**20)),
+        disk=DiskCache(option("cache_dir"), int(option("disk_mb") * 2**20)),
+    )
+    try:
+        asyncio.run(serve(service, option("host"), option("port")))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.pool.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""Render the slip animation of a figure to GIF/MP4 without a browser.
+
+Each frame is rasterised on the CPU with Matplotlib (Agg backend) and the
+frames are split across a process pool.  GIFs are encoded with Pillow and
+MP4 with the ffmpeg binary shipped by ``imageio-ffmpeg``.  Both are optional
+dependencies, imported only when a video is requested.
+"""
+
+import base64
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Estado de cada proceso: escena base y renderizador ya construido
+_scene = None
+_renderer = None
+
+
+def _require(module: str, package: str):
+    """Import an optional dependency or explain how to install it."""
+    try:
+        return __import__(module, fromlist=["_"])
+    except ImportError as exc:
+        raise ImportError(
+            f"La exportación de video necesita '{package}': pip install {package}"
+        ) from exc
+
+
+def decode_array(value) -> np.ndarray:
+    """Plotly array value (list or base64 typed array) as a NumPy array.
+
+    Missing values (``None``) become NaN.
+    """
+    if isinstance(value, dict) and "bdata" in value:
+        data = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]))
+        shape = value.get("shape")
+        if shape:
+            data = data.reshape([int(n) for n in str(shape).split(",")])
+        return data.astype(float)
+    return np.array([np.nan if v is None else v for v in np.ravel(value)], dtype=float) \
+        .reshape(np.shape(value))
+
+
+def _strip_html(text: str) -> str:
+    return re.sub(r"<[^>]+>", "", (text or "").replace("<br>", "\n")).strip()
+
+
+def _colormap(colorscale, cmin, cmax):
+    """Matplotlib colormap and norm equivalent to a Plotly colorscale."""
+    from matplotlib.colors import LinearSegmentedColormap, Normalize
+
+    stops = [(float(pos), color) for pos, color in colorscale]
+    return LinearSegmentedColormap.from_list("plotly", stops), Normalize(cmin, cmax)
+
+
+def _eye_to_view(eye: dict) -> tuple:
+    """Plotly camera eye as Matplotlib ``(elev, azim)`` in degrees."""
+    x, y, z = (float(eye.get(k, 1.25)) for k in "xyz")
+    return np.degrees(np.arctan2(z, np.hypot(x, y))), np.degrees(np.arctan2(y, x))
+
+
+class FrameRenderer:
+    """Matplotlib version of the scene, redrawn once per animation frame.
+
+    The static traces are drawn once; for each frame only the vertices of
+    the ``mesh3d`` traces listed in the frame are replaced.
+    """
+
+    def __init__(self, scene: dict, width: int = 960, height: int = 720, dpi: int = 100):
+        matplotlib = _require("matplotlib", "matplotlib")
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+        self._poly = Poly3DCollection
+        self.scene = scene
+        self.figure = plt.figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+        self.ax = self.figure.add_subplot(projection="3d")
+        # Matplotlib ordena colecciones completas, no triángulos: se dibujan
+        # primero las mallas translúcidas y encima la beachball y las flechas
+        self.ax.computed_zorder = False
+        self.meshes = {}
+        self.points = []
+
+        for index, trace in enumerate(scene["data"]):
+            draw = getattr(self, f"_draw_{trace.get('type', 'scatter')}", None)
+            if draw is None:
+                logger.debug("Traza %s no soportada en video", trace.get("type"))
+                continue
+            draw(index, trace)
+        self._layout(scene.get("layout", {}))
+
+    # -- Trazas -------------------------------------------------------------
+
+    def _mesh_polygons(self, trace):
+        xyz = np.stack([decode_array(trace[c]) for c in "xyz"], axis=1)
+        faces = np.stack([decode_array(trace[c]).astype(int) for c in "ijk"], axis=1)
+        return xyz, xyz[faces]
+
+    def _draw_mesh3d(self, index, trace):
+        xyz, polygons = self._mesh_polygons(trace)
+        if "intensity" in trace:
+            cmap, norm = _colormap(trace.get("colorscale", [[0, "blue"], [1, "white"]]),
+                                   trace.get("cmin", 0), trace.get("cmax", 1))
+            colors = cmap(norm(decode_array(trace["intensity"])))
+        else:
+            colors = trace.get("color", "lightgray")
+        opacity = trace.get("opacity", 1.0)
+        collection = self._poly(polygons, facecolors=colors, edgecolors="none",
+                                alpha=opacity, zorder=1 if opacity < 1 else 2)
+        self.ax.add_collection3d(collection)
+        self.meshes[index] = (collection, trace)
+        self.points.append(xyz)
+
+    def _draw_surface(self, index, trace):
+        x, y, z = (decode_array(trace[c]) for c in "xyz")
+        cmap, norm = _colormap(trace.get("colorscale", [[0, "blue"], [1, "white"]]),
+                               trace.get("cmin", 0), trace.get("cmax", 1))
+        colors = cmap(norm(decode_array(trace["surfacecolor"]))) if "surfacecolor" in trace else None
+        self.ax.plot_surface(x, y, z, facecolors=colors, shade=False,
+                             rcount=min(len(x), 100), ccount=min(len(x), 100), linewidth=0,
+                             zorder=2)
+        self.points.append(np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1))
+
+    def _draw_scatter3d(self, index, trace):
+        x, y, z = (decode_array(trace[c]) for c in "xyz")
+        line = trace.get("line", {})
+        if "lines" in trace.get("mode", "lines"):
+            self.ax.plot(x, y, z, color=line.get("color", "black"),
+                         linewidth=line.get("width", 2) / 2, zorder=3)
+        for xi, yi, zi, label in zip(x, y, z, trace.get("text") or []):
+            self.ax.text(xi, yi, zi, label, ha="center", va="bottom", zorder=4)
+        self.points.append(np.stack([x, y, z], axis=1))
+
+    def _draw_cone(self, index, trace):
+        x, y, z, u, v, w = (decode_array(trace[c]) for c in "xyzuvw")
+        color = trace.get("colorscale", [[0, "red"]])[0][1]
+        self.ax.quiver(x, y, z, u, v, w, color=color, linewidth=3, arrow_length_ratio=0.4,
+                       zorder=3)
+
+    # -- Escena -------------------------------------------------------------
+
+    def _layout(self, layout):
+        scene = layout.get("scene", {})
+        ax = self.ax
+        ax.set_xlabel(_strip_html(scene.get("xaxis", {}).get("title", {}).get("text", "")))
+        ax.set_ylabel(_strip_html(scene.get("yaxis", {}).get("title", {}).get("text", "")))
+        ax.set_zlabel(_strip_html(scene.get("zaxis", {}).get("title", {}).get("text", "")))
+        ax.set_zticklabels([])
+
+        points = np.concatenate(self.points)
+        points = points[~np.isnan(points).any(axis=1)]
+        low, high = points.min(axis=0), points.max(axis=0)
+        ax.set_xlim(low[0], high[0])
+        ax.set_ylim(low[1], high[1])
+        ax.set_zlim(low[2], high[2])
+        ax.set_box_aspect(np.maximum(high - low, 1e-9))   # aspectmode="data"
+        elev, azim = _eye_to_view(scene.get("camera", {}).get("eye", {}))
+        ax.view_init(elev=elev, azim=azim)
+
+        for note in scene.get("annotations", []):
+            ax.text(note["x"], note["y"], note["z"], _strip_html(note.get("text")),
+                    ha="center", fontsize=note.get("font", {}).get("size", 12), zorder=4)
+        self.figure.suptitle(_strip_html(layout.get("title", {}).get("text", "")))
+        for note in layout.get("annotations", []):
+            self.figure.text(0.02, 0.9, _strip_html(note.get("text")), va="top", fontsize=9,
+                             bbox=dict(facecolor="white", edgecolor="black", alpha=0.9))
+
+    def render(self, frame: dict = None) -> np.ndarray:
+        """Apply ``frame`` (Plotly frame dict) and return the RGB image."""
+        if frame is not None:
+            traces = frame.get("traces", range(len(frame["data"])))
+            for index, data in zip(traces, frame["data"]):
+                if index not in self.meshes:
+                    continue
+                collection, trace = self.meshes[index]
+                _, polygons = self._mesh_polygons({**trace, **data})
+                collection.set_verts(polygons)
+        self.figure.canvas.draw()
+        return np.asarray(self.figure.canvas.buffer_rgba())[..., :3].copy()
+
+
+def _init_worker(scene: dict, size: tuple) -> None:
+    global _scene, _renderer
+    _scene = scene
+    _renderer = FrameRenderer(scene, *size)
+
+
+def _render_frame(index: int) -> np.ndarray:
+    frames = _scene.get("frames") or [None]
+    return _renderer.render(frames[index])
+
+
+def render_frames(fig, workers: int = None, width: int = 960, height: int = 720) -> list:
+    """Rasterise every animation frame of ``fig``, split across processes.
+
+    Returns the list of ``(height, width, 3)`` uint8 images in frame order.
+    """
+    scene = fig.to_dict()
+    n_frames = max(len(scene.get("frames") or []), 1)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_frames))
+    logger.info("Renderizando %d cuadros con %d procesos", n_frames, workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(scene, (width, height))) as pool:
+        chunksize = max(1, n_frames // (4 * workers))
+        return list(pool.map(_render_frame, range(n_frames), chunksize=chunksize))
+
+
+def encode_gif(images: list, path: str, fps: float = 10) -> None:
+    """Encode images as a looping GIF with Pillow."""
+    Image = _require("PIL.Image", "pillow")
+    frames = [Image.fromarray(image) for image in images]
+    frames[0].save(path, save_all=True, append_images=frames[1:],
+                   duration=int(round(1000 / fps)), loop=0, optimize=True)
+
+
+def encode_mp4(images: list, path: str, fps: float = 10) -> None:
+    """Encode images as an H.264 MP4 with the ffmpeg of ``imageio-ffmpeg``."""
+    imageio_ffmpeg = _require("imageio_ffmpeg", "imageio-ffmpeg")
+    height, width = images[0].shape[:2]
+    # yuv420p necesita dimensiones pares
+    images = [image[: height - height % 2, : width - width % 2] for image in images]
+    writer = imageio_ffmpeg.write_frames(
+        path, (width - width % 2, height - height % 2), fps=fps,
+        codec="libx264", pix_fmt_out="yuv420p", macro_block_size=1)
+    writer.send(None)
+    for image in images:
+        writer.send(np.ascontiguousarray(image))
+    writer.close()
+
+
+def export_video(fig, path: str, fps: float = 10, workers: int = None,
+                 width: int = 960, height: int = 720) -> None:
+    """Render the animation of ``fig`` to ``path`` (``.gif`` or ``.mp4``)."""
+    ext = os.path.splitext(path)[1].lower()
+    encoders = {".gif": encode_gif, ".mp4": encode_mp4}
+    if ext not in encoders:
+        raise ValueError(f"Formato de video no soportado: {ext!r} (.gif o .mp4)")
+    images = render_frames(fig, workers, width, height)
+    encoders[ext](images, path, fps)
+    logger.info("Video de %d cuadros escrito en %s", len(images), path)
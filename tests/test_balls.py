@@ -0,0 +1,45 @@
+"""Beachball geometry and polarity."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import igballs_balls  # noqa: E402
+
+
+def test_magnitude_radii_without_magnitude():
+    radii = igballs_balls.magnitude_radii([5.0, None, 7.0], 1.0, 5.0)
+    np.testing.assert_allclose(radii, [1.0, 1.0, 5.0])
+    np.testing.assert_array_equal(igballs_balls.lod_levels(radii, 4), [2, 2, 4])
+    np.testing.assert_allclose(igballs_balls.magnitude_radii([None, None], 1.0, 5.0), [5.0, 5.0])
+
+
+# Direcciones en el marco de la escena (x este, y norte, z arriba)
+NE, NW = np.array([1, 1, 0]) / np.sqrt(2), np.array([-1, 1, 0]) / np.sqrt(2)
+UP, EAST = np.array([0, 0, 1.0]), np.array([1.0, 0, 0])
+
+# (strike, dip, rake), direcciones compresivas (T) y dilatacionales (P)
+QUADRANTS = [
+    # Lateral izquierdo en un plano N-S: compresión en NE-SW, dilatación en NW-SE
+    ((0, 90, 0), [NE, -NE], [NW, -NW]),
+    # Lateral derecho: los cuadrantes se intercambian
+    ((0, 90, 180), [NW, -NW], [NE, -NE]),
+    # Inverso puro: compresión en el centro (vertical), dilatación E-O
+    ((0, 45, 90), [UP, -UP], [EAST, -EAST]),
+]
+
+
+@pytest.mark.parametrize("angles, compressional, dilatational", QUADRANTS,
+                         ids=["%d/%d/%d" % q[0] for q in QUADRANTS])
+def test_double_couple_quadrants(angles, compressional, dilatational):
+    strike, dip, rake = angles
+    vectors = igballs_balls.fault_vectors([strike], [dip])
+    _, _, M = igballs_balls.double_couple(*(v[0] for v in vectors), rake)
+    np.testing.assert_allclose(igballs_balls.double_couples([strike], [dip], [rake])[0], M,
+                               atol=1e-12)
+    assert (igballs_balls.polarity_at(M, np.array(compressional)) > 0.5).all()
+    assert (igballs_balls.polarity_at(M, np.array(dilatational)) < -0.5).all()
@@ -0,0 +1,110 @@
+"""Catalog readers: one good record per format, bad records, repeated ids."""
+
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import igballs_catalog  # noqa: E402
+
+PLANE = """<nodalPlane{n}><strike><value>{s}</value></strike><dip><value>{d}</value></dip>
+<rake><value>{r}</value></rake></nodalPlane{n}>"""
+
+QUAKEML = """<q:quakeml xmlns="http://quakeml.org/xmlns/bed/1.2"
+ xmlns:q="http://quakeml.org/xmlns/quakeml/1.2"><eventParameters publicID="smi:test">
+<event publicID="smi:test/ev1">
+ <origin><time><value>2016-04-16T23:58:36Z</value></time><latitude><value>0.35</value></latitude>
+ <longitude><value>-79.9</value></longitude><depth><value>21000</value></depth></origin>
+ <magnitude><mag><value>7.8</value></mag></magnitude>
+ <focalMechanism><nodalPlanes>""" + PLANE.format(n=1, s=26, d=23, r=118) + """</nodalPlanes>
+ </focalMechanism></event>
+<event publicID="smi:test/bad">
+ <origin><latitude><value>0.35</value></latitude><longitude><value>-79.9</value></longitude>
+ <depth><value>x</value></depth></origin>
+ <focalMechanism><nodalPlanes>""" + PLANE.format(n=1, s=26, d=23, r=118) + """</nodalPlanes>
+ </focalMechanism></event>
+<event publicID="smi:test/ev1">
+ <origin><latitude><value>38.3</value></latitude><longitude><value>142.4</value></longitude>
+ <depth><value>20000</value></depth></origin>
+ <focalMechanism><momentTensor><tensor>
+  <Mrr><value>1.73e29</value></Mrr><Mtt><value>-0.281e29</value></Mtt>
+  <Mpp><value>-1.45e29</value></Mpp><Mrt><value>2.12e29</value></Mrt>
+  <Mrp><value>4.55e29</value></Mrp><Mtp><value>-0.657e29</value></Mtp>
+ </tensor></momentTensor></focalMechanism></event>
+</eventParameters></q:quakeml>
+"""
+
+CSV = """id,lat,lon,depth,mag,strike1,dip1,rake1
+ev1,-0.3,-80,20,7.8,26,23,118
+ev2,-0.3,-80,20,x,26,23,118
+ev1,-0.4,-80,25,7.1,26,23,118
+"""
+
+PSMECA = {
+    "a": "-80 -0.3 20 26 23 118 7.8 0 0 Pedernales\n-80 -0.3 20 26 23\n",
+    "c": "-80 -0.3 20 26 23 118 173 70 78 5.9 27 0 0 Pedernales\n-80 -0.3 20 26 23 118 7.8\n",
+    "m": ("142.37 38.32 20 1.73 -0.281 -1.45 2.12 4.55 -0.657 29 0 0 Tohoku\n"
+          "142.37 38.32 20 0 0 0 0 0 0 29 0 0 Zero\n"),
+}
+
+
+def read(tmp_path, name, text, **kwargs):
+    path = tmp_path / name
+    path.write_text(text)
+    return list(igballs_catalog.iter_catalog(str(path), **kwargs))
+
+
+def plane(event, name="plane_1"):
+    return tuple(event["nodal_planes"][name][key] for key in ("strike", "dip", "rake"))
+
+
+def test_quakeml(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        events = read(tmp_path, "catalog.xml", QUAKEML)
+    assert [event["id"] for event in events] == ["ev1", "ev1-2"]
+    first, tensor = events
+    assert plane(first) == (26, 23, 118)
+    assert first["depth"] == 21 and first["magnitude"] == 7.8
+    assert first["datetime"] == "2016-04-16 23:58:36"
+    assert "plane_2" in first["nodal_planes"]
+    assert tensor["moment_tensor"]["mrr"] == 1.73e29
+    assert plane(tensor) == pytest.approx((203.4, 9.5, 88.5), abs=0.1)
+    assert "smi:test/bad" in caplog.text
+
+
+def test_csv(tmp_path, caplog):
+    with caplog.at_level(logging.WARNING):
+        events = read(tmp_path, "catalog.csv", CSV)
+    assert [event["id"] for event in events] == ["ev1", "ev1-2"]
+    assert plane(events[0]) == (26, 23, 118) and events[0]["magnitude"] == 7.8
+    assert events[1]["depth"] == 25
+    assert "catalog.csv:3" in caplog.text
+    assert "repetido ev1" in caplog.text
+
+
+@pytest.mark.parametrize("layout", ["a", "c", "m"])
+def test_psmeca(tmp_path, caplog, layout):
+    text = PSMECA[layout] * 2 if layout != "m" else PSMECA[layout] + PSMECA[layout].splitlines()[0]
+    with caplog.at_level(logging.WARNING):
+        events = read(tmp_path, "catalog.txt", text, fmt="psmeca", psmeca_layout=layout)
+    name = "Tohoku" if layout == "m" else "Pedernales"
+    assert [event["id"] for event in events] == [name, f"{name}-2"]
+    assert "catalog.txt:2" in caplog.text
+    event = events[0]
+    if layout == "m":
+        assert event["magnitude"] == pytest.approx(9.12, abs=0.01)
+        assert plane(event) == pytest.approx((203.4, 9.5, 88.5), abs=0.1)
+    else:
+        assert plane(event) == (26, 23, 118)
+        assert event["longitude"] == -80 and event["latitude"] == -0.3
+    if layout == "c":
+        assert plane(event, "plane_2") == (173, 70, 78)
+        assert event["magnitude"] == pytest.approx(7.81, abs=0.01)
+
+
+def test_unknown_psmeca_layout(tmp_path):
+    with pytest.raises(ValueError):
+        read(tmp_path, "catalog.txt", PSMECA["a"], fmt="psmeca", psmeca_layout="x")
@@ -0,0 +1,57 @@
+"""Tiled coastline index and GML import."""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import igballs_coast  # noqa: E402
+
+GML = """<gml:FeatureCollection xmlns:gml="http://www.opengis.net/gml">
+ <gml:featureMember><gml:Point><gml:pos>9 9</gml:pos></gml:Point></gml:featureMember>
+ <gml:featureMember><gml:LineString><gml:pos>1 2</gml:pos><gml:pos>3 4</gml:pos></gml:LineString>
+ </gml:featureMember>
+ <gml:featureMember><gml:LineString srsName="urn:ogc:def:crs:EPSG::4326">
+  <gml:posList>5 6 7 8</gml:posList></gml:LineString></gml:featureMember>
+ <gml:featureMember><gml:LineString srsName="EPSG:4326">
+  <gml:posList>6 5 8 7</gml:posList></gml:LineString></gml:featureMember>
+</gml:FeatureCollection>
+"""
+
+
+def line(n=50):
+    """Polyline crossing several 1° tiles."""
+    return np.stack([np.linspace(-0.9, 1.4, n), np.linspace(-80.7, -78.2, n)], axis=1)
+
+
+def test_query_joins_chunks_across_tiles(tmp_path):
+    meta = igballs_coast.write_index([line(), line()[:3] + 10], str(tmp_path), max_points=8)
+    assert meta["segments"] > 2
+    segments = igballs_coast.query_index(str(tmp_path), (-1, 2, -81, -78))
+    assert len(segments) == 1
+    np.testing.assert_allclose(segments[0], line(), atol=1e-5)
+
+
+def test_query_outside_returns_nothing(tmp_path):
+    igballs_coast.write_index([line()], str(tmp_path))
+    assert igballs_coast.query_index(str(tmp_path), (40, 41, 10, 11)) == []
+
+
+def test_rewritten_index_is_reopened(tmp_path):
+    igballs_coast.write_index([line()], str(tmp_path))
+    assert len(igballs_coast.query_index(str(tmp_path), (-1, 2, -81, -78))) == 1
+    igballs_coast.write_index([line()[:10], line()[20:30]], str(tmp_path))
+    segments = igballs_coast.query_index(str(tmp_path), (-1, 2, -81, -78))
+    assert [len(segment) for segment in segments] == [10, 10]
+
+
+def test_gml_segments(tmp_path):
+    path = tmp_path / "lines.gml"
+    path.write_text(GML)
+    segments = [s.tolist() for s in igballs_coast.iter_gml_segments(str(path))]
+    # Sin srsName lat/lon los pares se leen lon/lat; el pos del Point no se cuela
+    assert segments == [[[2, 1], [4, 3]], [[5, 6], [7, 8]], [[5, 6], [7, 8]]]
+    segments = [s.tolist() for s in igballs_coast.iter_gml_segments(str(path), "latlon")]
+    assert segments[0] == [[1, 2], [3, 4]]
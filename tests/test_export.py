@@ -0,0 +1,62 @@
+"""HTML export options."""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+import igballs_export  # noqa: E402
+import igballs_fault  # noqa: E402
+
+with open(os.path.join(HERE, "data", "event_igepn2016hnmu.json"), encoding="utf-8") as f:
+    EVENT = json.load(f)
+
+
+def test_shared_plotlyjs_rewritten_when_missing(tmp_path):
+    path = igballs_export.write_plotlyjs_asset(str(tmp_path))
+    os.remove(path)
+    assert igballs_export.write_plotlyjs_asset(str(tmp_path)) == path
+    assert os.path.getsize(path) > 0
+
+
+NODE_HARNESS = """
+var fig = JSON.parse(require("fs").readFileSync(0, "utf-8"));
+var updates = [];
+var gd = {data: fig.data, layout: fig.layout, on: function () {}};
+var document = {getElementById: function () { return gd; }};
+var Plotly = {restyle: function (gd, update) { updates.push(update); return Promise.resolve(); }};
+%s
+draw(1).then(function () {
+    process.stdout.write(JSON.stringify({base: base, update: updates[0]}));
+});
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node no disponible")
+def test_client_animation_reads_compact_arrays():
+    scene = igballs_fault.FaultScene(EVENT, plane="plane_1", move_block="east", steps=3,
+                                     speed=0.3, resolution=20, animation="client")
+    fig = scene.figure()
+    data = igballs_export.compact_figure(fig)
+    assert igballs_export.has_client_animation(data)
+    script = NODE_HARNESS % igballs_export.CLIENT_ANIMATION_JS.replace("{plot_id}", "fig")
+    out = subprocess.run(["node", "-e", script], input=json.dumps(data), capture_output=True,
+                         text=True, check=True).stdout
+    result = json.loads(out)
+
+    spec = fig.layout.meta["igballs_animation"]
+    for b, t in enumerate(spec["traces"]):
+        for a, axis in enumerate("xyz"):
+            expected = np.asarray(fig.data[t][axis], dtype=np.float32)
+            assert len(result["base"][b][a]) == len(expected) > 0
+            np.testing.assert_allclose(result["base"][b][a], expected)
+            shift = spec["signs"][b] * spec["speed"] * spec["slip"][a]
+            np.testing.assert_allclose(result["update"][axis][b], expected + shift,
+                                       rtol=1e-6, atol=1e-6)
@@ -0,0 +1,68 @@
+"""FaultScene rebuilds only the pieces that depend on a changed option."""
+
+import json
+import os
+import sys
+
+import pytest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+import igballs_fault  # noqa: E402
+
+with open(os.path.join(HERE, "data", "event_igepn2016hnmu.json"), encoding="utf-8") as f:
+    EVENT = json.load(f)
+
+PARAMS = dict(plane="plane_1", move_block="east", block_width=10, height=5, steps=3,
+              speed=0.3, eye_dict=None, radius=3.3, resolution=40, invert_colors=False)
+
+SLIP = {"slip", "beachball", "nodal_lines", "arrows", "blocks", "frames", "layout"}
+GEOMETRY = SLIP | {"basis", "plane"}
+
+CHANGES = [
+    (dict(eye_dict=dict(x=2, y=1, z=1)), {"layout"}),
+    (dict(resolution=30), {"beachball"}),
+    (dict(invert_colors=True), {"beachball"}),
+    (dict(ball_style="icosphere", subdivisions=2), {"beachball"}),
+    (dict(radius=4.0), {"beachball", "nodal_lines", "arrows"}),
+    (dict(nodal_lines=True), {"nodal_lines"}),
+    (dict(steps=5, speed=0.5), {"blocks", "frames", "layout"}),
+    (dict(move_block="west"), {"arrows", "blocks", "frames", "layout"}),
+    (dict(animation="client"), {"blocks", "frames", "layout"}),
+    (dict(block_width=12, height=6), GEOMETRY - {"slip"}),
+    (dict(rake=60), SLIP),
+    (dict(strike=10, dip=45), GEOMETRY),
+    (dict(plane="plane_2"), GEOMETRY),
+    (dict(coastline_window=2.0), {"map"}),
+]
+
+
+def figure_json(fig) -> str:
+    return fig.to_json()
+
+
+def fresh_figure(params: dict):
+    p = dict(params)
+    fixed = [p.pop(key) for key in ("plane", "move_block", "block_width", "height", "steps",
+                                    "speed", "eye_dict", "radius", "resolution", "invert_colors")]
+    return igballs_fault.create_figure(EVENT, *fixed, **p)
+
+
+@pytest.mark.parametrize("change, expected", CHANGES, ids=[",".join(c) for c, _ in CHANGES])
+def test_update_rebuilds_only_dependent_pieces(change, expected):
+    scene = igballs_fault.FaultScene(EVENT, **PARAMS)
+    scene.figure()
+    before = dict(scene._cache)
+
+    assert scene.update(**change) == expected
+    fig = scene.figure()
+    rebuilt = {name for name, piece in scene._cache.items() if piece is not before.get(name)}
+    assert rebuilt == expected
+    assert figure_json(fig) == figure_json(fresh_figure({**PARAMS, **change}))
+
+
+def test_unchanged_override_rebuilds_nothing():
+    scene = igballs_fault.FaultScene(EVENT, **PARAMS)
+    scene.figure()
+    assert scene.update(rake=EVENT["nodal_planes"]["plane_1"]["rake"]) == set()
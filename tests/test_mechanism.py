@@ -0,0 +1,116 @@
+"""Moment tensors, principal axes and nodal planes."""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import igballs_balls  # noqa: E402
+import igballs_mechanism  # noqa: E402
+
+# (strike, dip, rake) de planos nodales genéricos (Pedernales 2016 y oblicuos)
+MECHANISMS = np.array([
+    (183, 75, 84),
+    (26, 16, 113),
+    (30, 60, -45),
+    (120, 35, 150),
+    (300, 80, -170),
+], dtype=float)
+
+
+def angle_diff(a, b):
+    """Diferencia angular en grados, en [-180, 180)."""
+    return (np.asarray(a) - np.asarray(b) + 180) % 360 - 180
+
+
+def assert_planes_equal(actual, expected):
+    strike, dip, rake = actual
+    np.testing.assert_allclose(angle_diff(strike, expected[0]), 0, atol=1e-6)
+    np.testing.assert_allclose(dip, expected[1], atol=1e-6)
+    np.testing.assert_allclose(angle_diff(rake, expected[2]), 0, atol=1e-6)
+
+
+def test_double_couple_round_trip():
+    strike, dip, rake = MECHANISMS.T
+    aux = igballs_mechanism.auxiliary_planes(strike, dip, rake)
+    M = igballs_balls.double_couples(strike, dip, rake)
+
+    first, second = igballs_mechanism.tensor_planes(M)
+    # tensor_planes no conoce el plano de partida: se empareja por el buzamiento
+    given_first = np.isclose(first[1], dip)
+    assert_planes_equal([np.where(given_first, a, b) for a, b in zip(first, second)],
+                        (strike, dip, rake))
+    assert_planes_equal([np.where(given_first, b, a) for a, b in zip(first, second)], aux)
+    # El plano auxiliar del auxiliar es el de partida y da el mismo tensor
+    assert_planes_equal(igballs_mechanism.auxiliary_planes(*aux), (strike, dip, rake))
+    np.testing.assert_allclose(igballs_balls.double_couples(*aux), M, atol=1e-12)
+
+
+def test_plane_vectors_match_double_couples():
+    strike, dip, rake = MECHANISMS.T
+    normal, slip = igballs_mechanism.plane_vectors(strike, dip, rake)
+    M = slip[:, :, None]*normal[:, None, :] + normal[:, :, None]*slip[:, None, :]
+    np.testing.assert_allclose(M, igballs_balls.double_couples(strike, dip, rake), atol=1e-12)
+
+
+def axis_directions(table, name):
+    trend, plunge = table[f"{name}_trend"][0], table[f"{name}_plunge"][0]
+    # Ejes horizontales: el trend solo está definido módulo 180°
+    return (float(trend) % 180 if abs(plunge) < 1e-6 else float(trend)), float(plunge)
+
+
+# Mecanismos de libro: (strike, dip, rake) y (trend, plunge) de P, B y T;
+# trend None para ejes verticales y módulo 180° para los horizontales
+TEXTBOOK = [
+    # Inverso puro en un plano N-S: P horizontal E-O, T vertical
+    ((0, 45, 90), dict(p=(90, 0), b=(0, 0), t=(None, 90))),
+    # Normal puro: P vertical, T horizontal E-O
+    ((0, 45, -90), dict(p=(None, 90), b=(0, 0), t=(90, 0))),
+    # Lateral izquierdo en un plano N-S vertical: P NO-SE, T NE-SO, B vertical
+    ((0, 90, 0), dict(p=(135, 0), b=(None, 90), t=(45, 0))),
+]
+
+
+@pytest.mark.parametrize("angles, expected", TEXTBOOK, ids=["%d/%d/%d" % t[0] for t in TEXTBOOK])
+def test_principal_axes_of_textbook_mechanisms(angles, expected):
+    strike, dip, rake = ([a] for a in angles)
+    M = igballs_balls.double_couples(strike, dip, rake)
+    tables = [
+        igballs_mechanism.axes_table(*igballs_mechanism.double_couple_axes(strike, dip, rake)),
+        igballs_mechanism.axes_table(*igballs_mechanism.principal_axes(M)[1:]),
+    ]
+    for table in tables:
+        for name, (trend, plunge) in expected.items():
+            got_trend, got_plunge = axis_directions(table, name)
+            assert got_plunge == pytest.approx(plunge, abs=1e-6)
+            if trend is not None:
+                assert angle_diff(got_trend, trend) == pytest.approx(0, abs=1e-6)
+
+
+@pytest.mark.parametrize("M, isotropic, dc, clvd", [
+    (igballs_balls.double_couples([30], [60], [-45])[0], 0, 100, 0),
+    (np.diag([2.0, -1.0, -1.0]), 0, 0, 100),
+    (np.diag([-1.0, 0.25, 0.75]), 0, 50, 50),
+    (3.7 * np.eye(3), 3.7, 0, 0),
+    (np.eye(3) + igballs_balls.double_couples([0], [90], [0])[0], 1, 100, 0),
+], ids=["dc", "clvd", "mixed", "isotropic", "isotropic+dc"])
+def test_decompose(M, isotropic, dc, clvd):
+    parts = igballs_mechanism.decompose(np.asarray(M)[None])
+    assert parts["isotropic"][0] == pytest.approx(isotropic, abs=1e-9)
+    assert parts["dc"][0] == pytest.approx(dc, abs=1e-6)
+    assert parts["clvd"][0] == pytest.approx(clvd, abs=1e-6)
+
+
+def test_use_to_enu_tensor_planes():
+    # Mismo mecanismo desde componentes USE: Mxy = -Mtp, Mxz = Mrp, Myz = -Mrt
+    M = igballs_balls.double_couples([183], [75], [84])[0]
+    use = dict(mrr=M[2, 2], mtt=M[1, 1], mpp=M[0, 0], mrt=-M[1, 2], mrp=M[0, 2], mtp=-M[0, 1])
+    np.testing.assert_allclose(igballs_mechanism.event_tensor({"moment_tensor": use}),
+                               M / np.linalg.norm(M), atol=1e-12)
+    planes = igballs_mechanism.fill_tensor_planes({"moment_tensor": use})["nodal_planes"]
+    dips = sorted(plane["dip"] for plane in planes.values())
+    assert dips == pytest.approx(sorted([75, igballs_mechanism.auxiliary_planes(183, 75, 84)[1]]),
+                                 abs=0.1)
@@ -0,0 +1,49 @@
+"""Polarity grid cache shared by several processes."""
+
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import igballs_polarity  # noqa: E402
+
+RESOLUTION = 64
+ENTRY_BYTES = RESOLUTION * RESOLUTION // 8
+
+
+def tensor(index: int) -> np.ndarray:
+    M = np.random.default_rng(index).normal(size=(3, 3))
+    return M + M.T
+
+
+def grid(index: int) -> np.ndarray:
+    return np.random.default_rng(1000 + index).integers(0, 2, (RESOLUTION, RESOLUTION))
+
+
+def worker(directory: str, seed: int) -> int:
+    """Read/write random tensors through a small cache; count wrong grids."""
+    cache = igballs_polarity.PolarityCache(directory, 12 * ENTRY_BYTES)
+    wrong = 0
+    for index in np.random.default_rng(seed).integers(0, 30, 200):
+        colors = cache.colors(tensor(index), RESOLUTION, lambda index=index: grid(index))
+        wrong += not np.array_equal(colors, grid(index))
+    return wrong
+
+
+def test_zero_tensor_rejected():
+    with pytest.raises(ValueError):
+        igballs_polarity.polarity_key(np.zeros((3, 3)), RESOLUTION)
+
+
+def test_processes_share_a_bounded_cache(tmp_path):
+    with ProcessPoolExecutor(max_workers=6) as pool:
+        wrong = list(pool.map(worker, [str(tmp_path)] * 6, range(6)))
+    assert wrong == [0] * 6
+    assert not list(tmp_path.glob("*.tmp"))
+    # Cada proceso puede dejar una entrada escrita después de la última poda
+    size = sum(path.stat().st_size for path in tmp_path.glob("*" + igballs_polarity.SUFFIX))
+    assert size <= 12 * ENTRY_BYTES + 6 * ENTRY_BYTES
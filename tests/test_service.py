@@ -0,0 +1,31 @@
+"""Request validation and cache keys of the render service."""
+
+import os
+import sys
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+import igballs  # noqa: E402
+import igballs_service  # noqa: E402
+
+PARAMS = igballs.load_config(os.path.join(HERE, "config", "EXAMPLE.igballs.cfg"))
+
+
+def test_mistyped_overrides():
+    errors = igballs_service.override_errors(PARAMS, {
+        "resolution": "x", "nodal_lines": 1, "speed": 1, "coastline_path": None,
+        "eye_dict": {"x": 1, "y": "2", "z": 3},
+    })
+    assert [error.split(" =")[0] for error in errors] == ["eye_dict", "nodal_lines", "resolution"]
+    assert igballs_service.override_errors(PARAMS, {"eye_dict": {"x": 1, "y": 2.5, "z": -1}}) == []
+
+
+def test_cache_key_follows_map_file(tmp_path):
+    coastline = tmp_path / "coast.csv"
+    coastline.write_text("latitud,longitud\n0,0\n")
+    params = {**PARAMS, "coastline_path": str(coastline)}
+    key = igballs_service.cache_key({"id": 1}, params)
+    assert igballs_service.cache_key({"id": 1}, params) == key
+    coastline.write_text("latitud,longitud\n0,0\n1,1\n")
+    assert igballs_service.cache_key({"id": 1}, params) != key
@@ -0,0 +1,49 @@
+"""Startup of the CLI: no plotly or pandas, within the benchmark budget."""
+
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+
+import igballs_bench  # noqa: E402
+
+HEAVY_MODULES = ("plotly", "pandas")
+
+
+def imported_modules(code: str) -> set:
+    """Top-level modules loaded by a fresh interpreter running ``code``."""
+    script = code + "\nimport sys\nprint(' '.join(sorted({m.split('.')[0] for m in sys.modules})))"
+    result = subprocess.run([sys.executable, "-c", script], cwd=HERE, check=True,
+                            capture_output=True, text=True)
+    return set(result.stdout.split())
+
+
+def test_import_igballs_is_light():
+    assert not imported_modules("import igballs") & set(HEAVY_MODULES)
+
+
+def test_validate_only_is_light():
+    config = os.path.join(HERE, "config", "EXAMPLE.igballs.cfg")
+    event = os.path.join(HERE, "data", "event_igepn2016hnmu.json")
+    code = ("import sys, igballs\n"
+            f"sys.argv = ['igballs.py', '--config', {config!r}, '--event', {event!r},"
+            " '--validate-only', '--log-level', 'ERROR']\n"
+            "igballs.main()")
+    assert not imported_modules(code) & set(HEAVY_MODULES)
+
+
+def test_validate_only_within_startup_budget():
+    config = os.path.join(HERE, "config", "EXAMPLE.igballs.cfg")
+    event = os.path.join(HERE, "data", "event_igepn2016hnmu.json")
+    command = [sys.executable, os.path.join(HERE, "igballs.py"), "--config", config,
+               "--event", event, "--validate-only", "--log-level", "ERROR"]
+    # Mejor de tres, como el mínimo que registra igballs_bench
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=HERE, check=True, capture_output=True)
+        times.append(time.perf_counter() - start)
+    assert min(times) < igballs_bench.STARTUP_BUDGET